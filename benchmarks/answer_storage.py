@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+# Добавляем корневую директорию в путь Python
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCHMARKS_DIR))
+
+from benchmarks.run_benchmarks import SCALES
+
+# Таблицы, в которых лежат ответы тренировок при каждом способе хранения
+ANSWER_TABLES = ('training_answers', 'training_answer_packs')
+
+# Доля неправильных ответов в записываемых тренировках
+WRONG_ANSWER_SHARE = 0.3
+
+
+def storage_bytes(path: str) -> Dict[str, int]:
+    """Байт страниц под таблицы ответов и их индексы (dbstat после VACUUM)"""
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("VACUUM")
+        names = [row[0] for row in connection.execute(
+            f"SELECT name FROM sqlite_master WHERE tbl_name IN ({', '.join('?' * len(ANSWER_TABLES))})",
+            ANSWER_TABLES
+        )]
+        sizes = dict(connection.execute(
+            f"SELECT name, SUM(pgsize) FROM dbstat WHERE name IN ({', '.join('?' * len(names))}) GROUP BY name",
+            names
+        ).fetchall())
+        sizes['file'] = os.path.getsize(path)
+    finally:
+        connection.close()
+    return sizes
+
+
+async def write_sessions(path: str, storage: str, sessions: int, answers: int, seed: int) -> Dict:
+    """
+    Записывает завершенные тренировки так же, как бот при ANSWER_STORAGE=storage:
+    строки ответов (журнал ответов) и, для packed, упаковка при завершении в той же транзакции.
+    """
+    from sqlalchemy import select, insert
+    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    from database.models import Base, User, Word, TrainingSession, TrainingAnswer
+    from services.answer_pack_service import AnswerPackService
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    # База могла быть создана до появления training_answer_packs
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    make_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    pack_service = AnswerPackService(storage)
+    rng = random.Random(seed)
+    result = {'storage': storage}
+
+    async with make_session() as session:
+        users_result = await session.execute(select(User.id))
+        user_ids = users_result.scalars().all()
+        words_result = await session.execute(select(Word.id, Word.word).limit(5000))
+        words = words_result.all()
+
+        # Перевод уже накопленных строк (миграционный путь) - только для packed
+        started = time.perf_counter()
+        if pack_service.enabled:
+            result['packed_sessions'], result['packed_answers'] = await pack_service.pack_completed(session)
+        result['migrate_seconds'] = time.perf_counter() - started
+
+        timings: List[float] = []
+        for _ in range(sessions):
+            started_at = datetime.utcnow() - timedelta(minutes=rng.randint(5, 600))
+            sample = [rng.choice(words) for _ in range(answers)]
+            rows = []
+            for offset, (word_id, text) in enumerate(sample):
+                is_correct = rng.random() >= WRONG_ANSWER_SHARE
+                rows.append({
+                    'word_id': word_id,
+                    'user_answer': text if is_correct else text[::-1],
+                    'is_correct': is_correct,
+                    'answered_at': started_at + timedelta(milliseconds=rng.randint(2000, 15000) * (offset + 1)),
+                })
+
+            started = time.perf_counter()
+            training_session = TrainingSession(
+                user_id=rng.choice(user_ids), session_type='training_roots', words_total=answers,
+                words_correct=sum(1 for row in rows if row['is_correct']), started_at=started_at
+            )
+            session.add(training_session)
+            await session.flush()
+            await session.execute(insert(TrainingAnswer), [{**row, 'session_id': training_session.id} for row in rows])
+            await session.commit()
+
+            training_session.completed_at = rows[-1]['answered_at']
+            if pack_service.enabled:
+                await pack_service.pack_sessions(session, [training_session.id])
+            await session.commit()
+            timings.append(time.perf_counter() - started)
+
+        result['write_median_ms'] = statistics.median(timings) * 1000
+        result['write_p95_ms'] = sorted(timings)[int(0.95 * (len(timings) - 1))] * 1000
+
+    await engine.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Размер и время записи ответов: строки против упакованных записей")
+    parser.add_argument("--scale", choices=list(SCALES), default='small', help="готовый масштаб базы")
+    parser.add_argument("--db", help="исходная база (по умолчанию benchmarks/bench_<масштаб>.db)")
+    parser.add_argument("--sessions", type=int, default=500, help="записываемых тренировок")
+    parser.add_argument("--answers", type=int, default=10, help="ответов в тренировке")
+    parser.add_argument("--seed", type=int, default=1, help="зерно генератора")
+    args = parser.parse_args()
+
+    db_path = os.path.abspath(args.db or os.path.join(BENCHMARKS_DIR, f"bench_{args.scale}.db"))
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    from benchmarks.synthetic_db import generate
+
+    if not os.path.exists(db_path):
+        print(f"🏗️ Создаем синтетическую базу {db_path}: {SCALES[args.scale]}")
+        generate(db_path, seed=args.seed, **SCALES[args.scale])
+
+    answers_total = sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM training_answers").fetchone()[0]
+    print(f"📦 Исходная база: {answers_total} ответов, записываем еще {args.sessions} тренировок "
+          f"по {args.answers} ответов")
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for storage in ('rows', 'packed'):
+            copy_path = os.path.join(directory, f"{storage}.db")
+            shutil.copyfile(db_path, copy_path)
+            result = asyncio.run(write_sessions(copy_path, storage, args.sessions, args.answers, args.seed))
+            result['sizes'] = storage_bytes(copy_path)
+            results.append(result)
+
+    total_answers = answers_total + args.sessions * args.answers
+    for result in results:
+        sizes = result.pop('sizes')
+        answer_bytes = sum(size for name, size in sizes.items() if name != 'file')
+        print(f"\n💾 {result['storage']}")
+        for name, size in sorted(sizes.items()):
+            if name != 'file':
+                print(f"   {name:<34} {size / 1048576:>8.2f} МБ")
+        print(f"   всего под ответы {answer_bytes / 1048576:.2f} МБ ({answer_bytes / total_answers:.1f} байт на ответ), "
+              f"файл базы {sizes['file'] / 1048576:.2f} МБ")
+        if result['storage'] == 'packed':
+            print(f"   🔄 Упаковка существующих строк: {result['packed_answers']} ответов "
+                  f"за {result['migrate_seconds']:.1f} с")
+        print(f"   ⏱️ Запись тренировки: медиана {result['write_median_ms']:.2f} мс, "
+              f"p95 {result['write_p95_ms']:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Добавляем корневую директорию в путь Python
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCHMARKS_DIR))
+
+# Готовые масштабы синтетической базы
+SCALES = {
+    'small': {'users': 100, 'words': 1000, 'user_words': 100, 'answers': 200},
+    'medium': {'users': 1000, 'words': 5000, 'user_words': 300, 'answers': 1000},
+    'large': {'users': 10000, 'words': 20000, 'user_words': 500, 'answers': 2000},
+}
+
+# Регрессией считается замедление медианы больше чем на столько процентов
+DEFAULT_THRESHOLD = 20.0
+
+
+@dataclass
+class Benchmark:
+    """Замер: run вызывается repeat раз, setup (не замеряется) - перед каждым вызовом"""
+    name: str
+    run: Callable[..., Awaitable[Any]]
+    setup: Optional[Callable[..., Awaitable[Any]]] = None
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, setup: Optional[Callable[..., Awaitable[Any]]] = None):
+    """Регистрирует функцию замера"""
+    def decorator(run):
+        BENCHMARKS.append(Benchmark(name, run, setup))
+        return run
+    return decorator
+
+
+class BenchContext:
+    """Общие данные замеров: сессия базы, генератор случайных чисел и выборки id"""
+
+    def __init__(self, session, seed: int):
+        self.session = session
+        self.rng = random.Random(seed)
+        self.user_ids: List[int] = []
+        self.telegram_ids: Dict[int, int] = {}
+        self.dictionary_words: Dict[int, List[int]] = {}
+        self.option_words: List[Any] = []
+
+    def random_user(self) -> int:
+        return self.rng.choice(self.user_ids)
+
+
+def _register_benchmarks():
+    """Замеры горячих путей (сервисы импортируются после выбора базы в DATABASE_URL)"""
+    from sqlalchemy import insert, select, func
+    from database.models import TrainingSession, TrainingAnswer
+    from handlers.basic_handlers import generate_user_statistics
+    from services.answer_log_service import answer_log_service
+    from services.answer_pack_service import answer_pack_service
+    from services.leaderboard_service import leaderboard_service
+    from services.leveling_service import leveling_service
+    from services.notification_service import NotificationService
+    from services.word_service import WordService
+
+    @benchmark("get_training_words")
+    async def bench_get_training_words(ctx: BenchContext):
+        await WordService.get_training_words(ctx.session, ctx.random_user(), 10)
+
+    @benchmark("get_training_words_by_morpheme")
+    async def bench_get_training_words_by_morpheme(ctx: BenchContext):
+        await WordService.get_training_words_by_morpheme(ctx.session, ctx.random_user(), 'roots', 10)
+
+    @benchmark("get_learned_words_by_morpheme")
+    async def bench_get_learned_words_by_morpheme(ctx: BenchContext):
+        await WordService.get_learned_words_by_morpheme(ctx.session, ctx.random_user(), 'roots', 10)
+
+    @benchmark("update_word_progress")
+    async def bench_update_word_progress(ctx: BenchContext):
+        user_id = ctx.random_user()
+        word_id = ctx.rng.choice(ctx.dictionary_words[user_id])
+        await WordService.update_word_progress(ctx.session, user_id, word_id, ctx.rng.random() < 0.7)
+        await ctx.session.commit()
+
+    @benchmark("update_words_progress_10")
+    async def bench_update_words_progress(ctx: BenchContext):
+        user_id = ctx.random_user()
+        results = [(word_id, ctx.rng.random() < 0.7) for word_id in ctx.rng.sample(ctx.dictionary_words[user_id], 10)]
+        await WordService.update_words_progress(ctx.session, user_id, results)
+        await ctx.session.commit()
+
+    async def add_unfinished_session(ctx: BenchContext):
+        user_id = ctx.random_user()
+        training_session = TrainingSession(user_id=user_id, session_type='training_roots', words_total=10)
+        ctx.session.add(training_session)
+        await ctx.session.flush()
+        await ctx.session.execute(insert(TrainingAnswer), [
+            {'session_id': training_session.id, 'word_id': word_id, 'user_answer': '', 'is_correct': ctx.rng.random() < 0.7}
+            for word_id in ctx.rng.sample(ctx.dictionary_words[user_id], 10)
+        ])
+        await ctx.session.commit()
+
+    @benchmark("finalize_session_10", setup=add_unfinished_session)
+    async def bench_finalize_session(ctx: BenchContext):
+        await answer_log_service.finalize_sessions(ctx.session)
+
+    @benchmark("pack_session_10", setup=add_unfinished_session)
+    async def bench_pack_session(ctx: BenchContext):
+        session_id = await ctx.session.scalar(select(func.max(TrainingSession.id)))
+        await answer_pack_service.pack_sessions(ctx.session, [session_id])
+        await ctx.session.commit()
+
+    @benchmark("generate_user_statistics_all")
+    async def bench_generate_user_statistics_all(ctx: BenchContext):
+        await generate_user_statistics(ctx.telegram_ids[ctx.random_user()])
+
+    @benchmark("generate_user_statistics_7d")
+    async def bench_generate_user_statistics_7d(ctx: BenchContext):
+        await generate_user_statistics(ctx.telegram_ids[ctx.random_user()], 7)
+
+    @benchmark("get_users_for_reminder")
+    async def bench_get_users_for_reminder(ctx: BenchContext):
+        await NotificationService(bot=None).get_users_for_reminder(ctx.session)
+
+    @benchmark("get_leaderboard_all")
+    async def bench_get_leaderboard_all(ctx: BenchContext):
+        await leveling_service.get_leaderboard(ctx.session, 10, 'all')
+
+    @benchmark("get_leaderboard_week")
+    async def bench_get_leaderboard_week(ctx: BenchContext):
+        await leveling_service.get_leaderboard(ctx.session, 10, 'week')
+
+    @benchmark("leaderboard_rebuild_all")
+    async def bench_leaderboard_rebuild(ctx: BenchContext):
+        await leaderboard_service.rebuild(ctx.session, 'all')
+
+    @benchmark("create_options_100_words")
+    async def bench_create_options(ctx: BenchContext):
+        for word in ctx.option_words:
+            WordService.create_options_for_word(word)
+            WordService.create_word_puzzle(word)
+
+
+async def _prepare_context(session, seed: int) -> BenchContext:
+    from sqlalchemy import select
+    from database.models import User, UserWord, Word
+
+    ctx = BenchContext(session, seed)
+    users_result = await session.execute(select(User.id, User.telegram_id).order_by(User.id))
+    for user_id, telegram_id in users_result.all():
+        ctx.user_ids.append(user_id)
+        ctx.telegram_ids[user_id] = telegram_id
+
+    # Словари нужны только для выборки случайных пользователей: берем до 200 пользователей
+    sample = ctx.rng.sample(ctx.user_ids, min(200, len(ctx.user_ids)))
+    ctx.user_ids = sample
+    words_result = await session.execute(
+        select(UserWord.user_id, UserWord.word_id).where(UserWord.user_id.in_(sample))
+    )
+    for user_id, word_id in words_result.all():
+        ctx.dictionary_words.setdefault(user_id, []).append(word_id)
+    ctx.user_ids = [user_id for user_id in sample if len(ctx.dictionary_words.get(user_id, [])) >= 10]
+
+    option_words_result = await session.execute(
+        select(Word).where(Word.morpheme_type.in_(['spelling', 'stress', 'ne_particle', 'roots'])).limit(100)
+    )
+    ctx.option_words = option_words_result.scalars().all()
+    return ctx
+
+
+def _summary(timings: List[float]) -> Dict[str, float]:
+    timings_ms = sorted(value * 1000 for value in timings)
+    p95_index = min(len(timings_ms) - 1, int(round(0.95 * (len(timings_ms) - 1))))
+    return {
+        'runs': len(timings_ms),
+        'min_ms': round(timings_ms[0], 4),
+        'median_ms': round(statistics.median(timings_ms), 4),
+        'mean_ms': round(statistics.fmean(timings_ms), 4),
+        'p95_ms': round(timings_ms[p95_index], 4),
+    }
+
+
+async def run_benchmarks(repeat: int, warmup: int, seed: int, only: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """Выполняет зарегистрированные замеры и возвращает сводку по каждому"""
+    from database.database import engine, async_session
+
+    # Вывод SQL в консоль искажает время замеров
+    engine.sync_engine.echo = False
+
+    results = {}
+    async with async_session() as session:
+        ctx = await _prepare_context(session, seed)
+        if not ctx.user_ids:
+            raise ValueError("В базе нет пользователей со словарем из 10 и более слов")
+
+        for bench in BENCHMARKS:
+            if only and bench.name not in only:
+                continue
+
+            timings = []
+            for iteration in range(warmup + repeat):
+                if bench.setup is not None:
+                    await bench.setup(ctx)
+                started = time.perf_counter()
+                await bench.run(ctx)
+                elapsed = time.perf_counter() - started
+                if iteration >= warmup:
+                    timings.append(elapsed)
+
+            results[bench.name] = _summary(timings)
+            print(f"⏱️ {bench.name:<34} медиана {results[bench.name]['median_ms']:>9.3f} мс, "
+                  f"p95 {results[bench.name]['p95_ms']:>9.3f} мс")
+
+    await engine.dispose()
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARKS_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Сравнивает медианы с базовым прогоном, возвращает список регрессий"""
+    regressions = []
+    print(f"\n📊 Сравнение с {baseline.get('commit') or 'базовым прогоном'}:")
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            print(f"   {name:<34} новый замер")
+            continue
+        change = (result['median_ms'] - base['median_ms']) / base['median_ms'] * 100 if base['median_ms'] else 0.0
+        marker = "🔴" if change > threshold else ("🟢" if change < -threshold else "⚪")
+        print(f"{marker} {name:<34} {base['median_ms']:>9.3f} → {result['median_ms']:>9.3f} мс ({change:+.1f}%)")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры горячих путей бота на синтетической базе")
+    parser.add_argument("--scale", choices=list(SCALES), default='small', help="готовый масштаб базы")
+    parser.add_argument("--users", type=int, help="пользователей (вместо значения из --scale)")
+    parser.add_argument("--words", type=int, help="слов в каталоге")
+    parser.add_argument("--user-words", type=int, help="слов в словаре каждого пользователя")
+    parser.add_argument("--answers", type=int, help="ответов каждого пользователя")
+    parser.add_argument("--db", help="файл базы (по умолчанию benchmarks/bench_<масштаб>.db)")
+    parser.add_argument("--regenerate", action="store_true", help="пересоздать базу, даже если файл есть")
+    parser.add_argument("--repeat", type=int, default=30, help="замеров каждого сценария")
+    parser.add_argument("--warmup", type=int, default=3, help="прогревочных вызовов (не учитываются)")
+    parser.add_argument("--seed", type=int, default=1, help="зерно генератора данных и выборок")
+    parser.add_argument("--only", nargs="+", help="выполнить только эти замеры")
+    parser.add_argument("--output", help="записать результаты в JSON-файл")
+    parser.add_argument("--compare", help="JSON-файл прошлого прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="замедление медианы в процентах, считающееся регрессией")
+    args = parser.parse_args()
+
+    scale = dict(SCALES[args.scale])
+    for key in scale:
+        value = getattr(args, key)
+        if value is not None:
+            scale[key] = value
+
+    custom = any(getattr(args, key) is not None for key in scale)
+    db_path = args.db or os.path.join(BENCHMARKS_DIR, f"bench_{'custom' if custom else args.scale}.db")
+
+    # Движок базы создается при импорте database.database, поэтому база выбирается до импорта модулей бота
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.abspath(db_path)}"
+    from benchmarks.synthetic_db import generate
+
+    if args.regenerate or custom or not os.path.exists(db_path):
+        print(f"🏗️ Создаем синтетическую базу {db_path}: {scale}")
+        started = time.perf_counter()
+        counts = generate(db_path, seed=args.seed, **scale)
+        print(f"✅ База создана за {time.perf_counter() - started:.1f} с: {counts}")
+
+    _register_benchmarks()
+
+    results = asyncio.run(run_benchmarks(args.repeat, args.warmup, args.seed, args.only))
+
+    report = {
+        'commit': _git_commit(),
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': scale,
+        'repeat': args.repeat,
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"💾 Результаты записаны в {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"❌ Регрессии (> {args.threshold:.0f}%): {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ Регрессий нет")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+
+from config import MORPHEME_TYPES, REPETITION_INTERVALS
+from database.database import SCHEMA_VERSION
+from database.models import Base, User, Word, UserWord, TrainingSession, TrainingAnswer, UserDailyStats, SchemaVersion
+from services.level_table import level_table
+
+# Сколько строк вставлять одним запросом
+INSERT_CHUNK_SIZE = 5000
+
+# Ответов в одной синтетической тренировке
+ANSWERS_PER_SESSION = 10
+
+CONSONANTS = 'бвгджзклмнпрстфхцчшщ'
+VOWELS = 'аеиоуыэюя'
+
+
+def _syllables(number: int) -> str:
+    """Уникальная для номера последовательность слогов (номер в системе счисления по слогам)"""
+    syllables = [c + v for c in CONSONANTS for v in VOWELS]
+    result = ''
+    while True:
+        number, rest = divmod(number, len(syllables))
+        result = syllables[rest] + result
+        if number == 0:
+            return result
+
+
+def make_word(word_id: int, morpheme_type: str, rng: random.Random) -> Dict:
+    """Синтетическое слово с корректным для своего типа шаблоном"""
+    base = 'ра' + _syllables(word_id) + 'ть'
+    values = {
+        'id': word_id,
+        'definition': '',
+        'explanation': '',
+        'morpheme_type': morpheme_type,
+        'difficulty_level': rng.randint(1, 5),
+        'is_archived': False,
+        'hidden_letters': '',
+    }
+
+    if morpheme_type == 'spelling':
+        prefix = rng.choice(['пол', 'полу', 'кое'])
+        values['word'] = rng.choice([f"{prefix}{base}", f"{prefix} {base}", f"{prefix}-{base}"])
+        values['puzzle_pattern'] = f"({prefix}){base}"
+    elif morpheme_type == 'ne_particle':
+        values['word'] = rng.choice([f"не{base}", f"не {base}"])
+        values['puzzle_pattern'] = f"(не){base}"
+    elif morpheme_type == 'stress':
+        vowel_positions = [i for i, char in enumerate(base) if char in VOWELS]
+        first, second = rng.sample(vowel_positions, 2)
+        stressed = rng.choice([first, second])
+        values['word'] = base[:stressed] + base[stressed].upper() + base[stressed + 1:]
+        values['puzzle_pattern'] = ''.join(
+            f"({char.upper()})" if i in (first, second) else char for i, char in enumerate(base)
+        )
+    else:
+        position = rng.choice([i for i, char in enumerate(base) if char in VOWELS])
+        values['word'] = base
+        values['puzzle_pattern'] = base[:position] + '_' + base[position + 1:]
+        values['hidden_letters'] = base[position]
+
+    return values
+
+
+def _insert_chunks(connection, model, rows: Iterable[Dict]) -> int:
+    total = 0
+    chunk: List[Dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= INSERT_CHUNK_SIZE:
+            connection.execute(insert(model), chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        connection.execute(insert(model), chunk)
+        total += len(chunk)
+    return total
+
+
+def generate(path: str, users: int, words: int, user_words: int, answers: int, seed: int = 1) -> Dict[str, int]:
+    """
+    Создает синтетическую SQLite-базу со схемой бота.
+
+    users - пользователей, words - слов в каталоге,
+    user_words - слов в словаре каждого пользователя, answers - ответов каждого пользователя
+    (по ANSWERS_PER_SESSION в тренировке, тренировки за последние 60 дней).
+    Возвращает количество строк по таблицам.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    morpheme_types = list(MORPHEME_TYPES)
+    user_words = min(user_words, words)
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    counts = {}
+
+    with engine.begin() as connection:
+        # Схема создана по текущим моделям: init_db не должен считать базу устаревшей
+        connection.execute(insert(SchemaVersion).values(version=SCHEMA_VERSION))
+
+        counts['words'] = _insert_chunks(
+            connection, Word, (make_word(word_id, rng.choice(morpheme_types), rng) for word_id in range(1, words + 1))
+        )
+
+        def user_rows():
+            for user_id in range(1, users + 1):
+                experience = int(rng.paretovariate(1.2) * 200)
+                yield {
+                    'id': user_id,
+                    'telegram_id': 100000 + user_id,
+                    'first_name': f"Ученик {user_id}",
+                    'is_active': rng.random() < 0.9,
+                    'notifications_enabled': rng.random() < 0.8,
+                    'experience_points': experience,
+                    'level': level_table.level_for(experience),
+                    'current_streak': rng.randint(0, 10),
+                    'best_streak': rng.randint(10, 30),
+                    'last_training_date': (now - timedelta(days=rng.randint(0, 10))).date(),
+                    'created_at': now - timedelta(days=rng.randint(30, 365)),
+                }
+
+        counts['users'] = _insert_chunks(connection, User, user_rows())
+
+        dictionaries = {user_id: rng.sample(range(1, words + 1), user_words) for user_id in range(1, users + 1)}
+
+        def user_word_rows():
+            for user_id, word_ids in dictionaries.items():
+                for word_id in word_ids:
+                    interval_index = rng.randint(0, len(REPETITION_INTERVALS) - 1)
+                    yield {
+                        'user_id': user_id,
+                        'word_id': word_id,
+                        'mistakes_count': rng.randint(1, 5),
+                        'correct_answers_count': rng.randint(0, 5),
+                        'current_interval_index': interval_index,
+                        'next_repetition': now + timedelta(minutes=rng.randint(-3 * 1440, REPETITION_INTERVALS[interval_index])),
+                        'is_learned': rng.random() < 0.2,
+                        'created_at': now - timedelta(days=rng.randint(1, 90)),
+                        'last_reviewed': now - timedelta(minutes=rng.randint(0, 10 * 1440)),
+                    }
+
+        counts['user_words'] = _insert_chunks(connection, UserWord, user_word_rows())
+
+        sessions = []
+        answer_rows = []
+        daily: Dict[tuple, Dict] = {}
+        session_id = 0
+        for user_id, word_ids in dictionaries.items():
+            for _ in range(answers // ANSWERS_PER_SESSION):
+                session_id += 1
+                started_at = now - timedelta(days=rng.randint(0, 60), minutes=rng.randint(0, 1440))
+                results = [(rng.choice(word_ids), rng.random() < 0.7) for _ in range(ANSWERS_PER_SESSION)]
+                correct = sum(1 for _, is_correct in results if is_correct)
+                sessions.append({
+                    'id': session_id,
+                    'user_id': user_id,
+                    'session_type': f"training_{rng.choice(morpheme_types)}",
+                    'words_total': ANSWERS_PER_SESSION,
+                    'words_correct': correct,
+                    'words_incorrect': ANSWERS_PER_SESSION - correct,
+                    'started_at': started_at,
+                    'completed_at': started_at + timedelta(minutes=5),
+                })
+                for offset, (word_id, is_correct) in enumerate(results):
+                    answer_rows.append({
+                        'session_id': session_id,
+                        'word_id': word_id,
+                        'user_answer': '',
+                        'is_correct': is_correct,
+                        'answered_at': started_at + timedelta(seconds=20 * offset),
+                    })
+
+                day = daily.setdefault((user_id, started_at.date()), {
+                    'user_id': user_id, 'day': started_at.date(), 'sessions_count': 0, 'words_trained': 0,
+                    'words_correct': 0, 'words_learned': 0, 'experience_gained': 0,
+                })
+                day['sessions_count'] += 1
+                day['words_trained'] += ANSWERS_PER_SESSION
+                day['words_correct'] += correct
+                day['experience_gained'] += correct * 10
+
+            if len(answer_rows) >= INSERT_CHUNK_SIZE:
+                connection.execute(insert(TrainingSession), sessions)
+                connection.execute(insert(TrainingAnswer), answer_rows)
+                counts['training_sessions'] = counts.get('training_sessions', 0) + len(sessions)
+                counts['training_answers'] = counts.get('training_answers', 0) + len(answer_rows)
+                sessions, answer_rows = [], []
+
+        if sessions:
+            connection.execute(insert(TrainingSession), sessions)
+            connection.execute(insert(TrainingAnswer), answer_rows)
+            counts['training_sessions'] = counts.get('training_sessions', 0) + len(sessions)
+            counts['training_answers'] = counts.get('training_answers', 0) + len(answer_rows)
+
+        counts['user_daily_stats'] = _insert_chunks(connection, UserDailyStats, daily.values())
+
+    engine.dispose()
+    return counts
@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+
+# Добавляем корневую директорию в путь Python
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCHMARKS_DIR))
+
+from benchmarks.run_benchmarks import SCALES
+
+
+async def run_load(writers: int, operations: int, queued: bool) -> Dict:
+    """
+    writers одновременных обработчиков, каждый operations раз отвечает в тренировке
+    (ответ в журнал ответов) и получает опыт, как в process_answer; журнал пишется
+    фоновой задачей. queued=False - каждый сам коммитит свою транзакцию,
+    queued=True - все пишут через очередь записи
+    """
+    from sqlalchemy import select, func
+    from database.database import async_session
+    from database.models import User, TrainingSession
+    from services.answer_log_service import answer_log_service
+    from services.leveling_service import leveling_service
+    from services.write_queue_service import write_queue_service
+
+    async with async_session() as session:
+        users_result = await session.execute(select(User.telegram_id).order_by(User.id).limit(writers))
+        telegram_ids = users_result.scalars().all()
+        session_id = await session.scalar(select(func.max(TrainingSession.id)))
+
+    errors = []
+
+    async def direct(telegram_id: int):
+        async with async_session() as session:
+            user_result = await session.execute(select(User).where(User.telegram_id == telegram_id))
+            user = user_result.scalar_one()
+            await leveling_service.add_experience(session, user, 10)
+            await session.commit()
+
+    async def writer(telegram_id: int):
+        for _ in range(operations):
+            answer_log_service.log_answer(session_id, 1, '', True)
+            try:
+                if queued:
+                    await leveling_service.award_experience(telegram_id, 10)
+                else:
+                    await direct(telegram_id)
+            except Exception as e:
+                errors.append(e)
+
+    if queued:
+        write_queue_service.start()
+    answer_log_service.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(telegram_id) for telegram_id in telegram_ids))
+    try:
+        await answer_log_service.stop()
+    except Exception as e:
+        errors.append(e)
+    elapsed = time.perf_counter() - started
+    if queued:
+        await write_queue_service.stop()
+
+    done = len(telegram_ids) * operations - len(errors)
+    return {
+        'seconds': elapsed,
+        'done': done,
+        'errors': len(errors),
+        'locked': sum(1 for error in errors if 'locked' in str(error)),
+        'per_second': done / elapsed,
+        'metrics': write_queue_service.get_metrics() if queued else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пропускная способность записи (опыт и журнал ответов): свои коммиты против очереди записи")
+    parser.add_argument("--scale", choices=list(SCALES), default='small', help="готовый масштаб базы")
+    parser.add_argument("--db", help="исходная база (по умолчанию benchmarks/bench_<масштаб>.db)")
+    parser.add_argument("--writers", type=int, default=50, help="одновременных обработчиков")
+    parser.add_argument("--operations", type=int, default=20, help="ответов с начислением опыта на обработчика")
+    parser.add_argument("--mode", choices=['direct', 'queued'], help="один режим (по умолчанию оба)")
+    args = parser.parse_args()
+
+    db_path = os.path.abspath(args.db or os.path.join(BENCHMARKS_DIR, f"bench_{args.scale}.db"))
+    if not os.path.exists(db_path):
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+        from benchmarks.synthetic_db import generate
+        print(f"🏗️ Создаем синтетическую базу {db_path}: {SCALES[args.scale]}")
+        generate(db_path, seed=1, **SCALES[args.scale])
+
+    # Каждый режим - в отдельном процессе на своей копии базы: движок создается при импорте
+    if args.mode is None:
+        for mode in ('direct', 'queued'):
+            command = [sys.executable, os.path.abspath(__file__), "--db", db_path, "--mode", mode,
+                       "--writers", str(args.writers), "--operations", str(args.operations)]
+            if subprocess.run(command).returncode != 0:
+                sys.exit(1)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        copy_path = os.path.join(directory, "bench.db")
+        shutil.copyfile(db_path, copy_path)
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{copy_path}"
+        os.environ["WRITE_QUEUE"] = "on"
+
+        from database.database import engine
+        # Вывод SQL в консоль искажает время замеров
+        engine.sync_engine.echo = False
+
+        async def run():
+            try:
+                return await run_load(args.writers, args.operations, args.mode == 'queued')
+            finally:
+                await engine.dispose()
+
+        result = asyncio.run(run())
+
+    print(f"\n✍️ {args.mode}: {args.writers} обработчиков × {args.operations} ответов с начислением опыта")
+    print(f"   ⏱️ {result['seconds']:.2f} с, {result['per_second']:.0f} записей/с")
+    print(f"   ❌ Ошибок: {result['errors']} (database is locked: {result['locked']})")
+    if result['metrics']:
+        print(f"   📦 Коммитов: {result['metrics']['batches']}, в среднем {result['metrics']['avg_batch']:.1f} "
+              f"намерений за раз")
+
+
+if __name__ == "__main__":
+    main()
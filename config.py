@@ -10,6 +10,19 @@ ADMIN_ID = os.getenv("ADMIN_ID", "")
 # База данных
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///vocabulary_bot.db")
 
+# База для тяжелых чтений (статистика, админ-отчеты): реплика PostgreSQL или тот же файл SQLite
+# (тогда база переводится в WAL и читается отдельным пулом соединений). Пусто - все через DATABASE_URL
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
+# Допустимое отставание реплики, с: при большем отставании чтения идут в основную базу
+DATABASE_READ_MAX_LAG_SECONDS = float(os.getenv("DATABASE_READ_MAX_LAG_SECONDS", "5"))
+
+# Устаревшая схема базы при запуске: auto - применить миграции (utils/migrate.py upgrade),
+# manual - остановить запуск, пока миграции не применены вручную
+DATABASE_MIGRATE = os.getenv("DATABASE_MIGRATE", "auto")
+
+# Очередь записи с групповым коммитом (services/write_queue_service.py): on, off или auto - только для SQLite
+WRITE_QUEUE = os.getenv("WRITE_QUEUE", "auto")
+
 # Настройки тренировки
 WORDS_PER_TRAINING = 25
 
@@ -36,5 +49,50 @@ REPETITION_INTERVALS = [
     44640      # 31 день
 ]
 
+# Алгоритм интервальных повторений: ladder (интервалы выше), sm2 или fsrs
+REPETITION_ALGORITHM = os.getenv("REPETITION_ALGORITHM", "ladder")
+
+# Слово считается выученным после стольких правильных ответов
+LEARNED_CORRECT_ANSWERS = 5
+
 # Настройки уведомлений
-NOTIFICATION_HOURS = [9, 14, 19]  # Время отправки напоминаний 
\ No newline at end of file
+NOTIFICATION_HOURS = [9, 14, 19]  # Время отправки напоминаний 
+
+# Брошенные тренировки
+TRAINING_IDLE_TTL_MINUTES = int(os.getenv("TRAINING_IDLE_TTL_MINUTES", "30"))  # без ответов дольше - тренировка завершается
+TRAINING_REAPER_INTERVAL_MINUTES = 5  # как часто искать брошенные тренировки
+
+# Допустимое время холодного запуска (python main.py --check-startup)
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "5"))
+
+# Профилирование обработчиков (0 - выключено)
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))  # доля профилируемых обновлений
+PROFILING_INTERVAL_MS = 5  # период снятия стека
+PROFILING_DUMP_DIR = os.getenv("PROFILING_DUMP_DIR", "profiles")  # куда сохранять дамп по сигналу SIGUSR1
+
+# Профилирование SQL-запросов
+QUERY_SLOW_MS = float(os.getenv("QUERY_SLOW_MS", "100"))  # запросы дольше пишутся в журнал
+QUERY_STATS_WINDOW_MINUTES = 60  # статистика по запросам хранится за последние 1-2 таких интервала
+
+# Запись обезличенной трассы входящих обновлений для utils/replay_trace.py (пусто - выключено)
+TRACE_RECORD_PATH = os.getenv("TRACE_RECORD_PATH", "")  # например traces/updates.jsonl.gz
+
+# Резервные копии SQLite (utils/backup.py, /backup)
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+BACKUP_INTERVAL_HOURS = float(os.getenv("BACKUP_INTERVAL_HOURS", "24"))  # 0 - без копий по расписанию
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "7"))  # сколько последних снимков хранить
+
+# Архив старых ответов тренировок (utils/archive_answers.py)
+ANSWER_ARCHIVE_DIR = os.getenv("ANSWER_ARCHIVE_DIR", "archive")
+ANSWER_RETENTION_DAYS = int(os.getenv("ANSWER_RETENTION_DAYS", "0"))  # старше - в архив по ночам, 0 - не архивировать
+
+# Хранение ответов завершенных тренировок: rows - строки training_answers,
+# packed - одна упакованная запись на тренировку (services/answer_pack_service.py)
+ANSWER_STORAGE = os.getenv("ANSWER_STORAGE", "rows")
+
+# Ограничения исходящих запросов к Telegram Bot API
+TELEGRAM_GLOBAL_RATE = 30  # сообщений в секунду на всего бота
+TELEGRAM_GLOBAL_BURST = 30
+TELEGRAM_CHAT_RATE = 1  # сообщений в секунду в один чат
+TELEGRAM_CHAT_BURST = 3  # допустимая пачка сообщений в один чат
+TELEGRAM_MAX_RETRIES = 3  # повторов после RetryAfter (429)
@@ -1,17 +1,116 @@
-from sqlalchemy import create_engine
+import logging
+import time
+from typing import Optional
+from sqlalchemy import create_engine, event, inspect, select, func, insert, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from database.models import Base
-from config import DATABASE_URL
+from sqlalchemy.dialects import postgresql, sqlite
+from database.models import Base, SchemaVersion, User
+from config import DATABASE_URL, DATABASE_READ_URL, DATABASE_READ_MAX_LAG_SECONDS, DATABASE_MIGRATE
 
 # Асинхронный движок базы данных
 engine = create_async_engine(DATABASE_URL, echo=True)
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, info={'role': 'write'})
 
-async def init_db():
-    """Инициализация базы данных"""
+# Движок только для чтения (DATABASE_READ_URL): реплика или отдельный пул соединений SQLite
+read_engine = create_async_engine(DATABASE_READ_URL, echo=True) if DATABASE_READ_URL else None
+read_session = sessionmaker(read_engine or engine, class_=AsyncSession, expire_on_commit=False, info={'role': 'read'})
+
+logger = logging.getLogger(__name__)
+
+# Как часто перепроверять отставание реплики, с
+READ_LAG_CHECK_SECONDS = 1.0
+
+# Отставание реплики PostgreSQL: 0, если все полученные изменения применены
+# (иначе простаивающая основная база выглядела бы как отстающая реплика)
+POSTGRES_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_read_lag = {'checked_at': float('-inf'), 'seconds': 0.0}
+
+def _set_sqlite_wal(dbapi_connection, connection_record):
+    # В режиме WAL читатели не блокируют писателя и видят последний закоммиченный снимок
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
+def _set_sqlite_query_only(dbapi_connection, connection_record):
+    # Пул чтения может подключиться к файлу раньше основного движка
+    _set_sqlite_wal(dbapi_connection, connection_record)
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+if read_engine is not None and read_engine.dialect.name == 'sqlite':
+    event.listen(engine.sync_engine, "connect", _set_sqlite_wal)
+    event.listen(read_engine.sync_engine, "connect", _set_sqlite_query_only)
+
+# Версия схемы базы: увеличивается при каждом изменении моделей
+# вместе с новой миграцией в database/migrations.py
+SCHEMA_VERSION = 13
+
+# Версия, с которой учитываются миграции: ее получает база, созданная до таблицы schema_version
+BASELINE_SCHEMA_VERSION = 1
+
+def _read_schema_version(connection) -> Optional[int]:
+    """Текущая версия схемы в базе (None - таблицы версий еще нет)"""
+    if not inspect(connection).has_table(SchemaVersion.__tablename__):
+        return None
+    return connection.execute(select(func.max(SchemaVersion.version))).scalar()
+
+async def get_schema_version() -> Optional[int]:
+    """Возвращает версию схемы, записанную в базе"""
+    async with engine.connect() as conn:
+        return await conn.run_sync(_read_schema_version)
+
+def create_schema(connection) -> int:
+    """
+    Создает недостающие таблицы и возвращает версию схемы базы.
+    Пустая база сразу получает текущую схему и версию SCHEMA_VERSION.
+    Существующая база без учета версий получает BASELINE_SCHEMA_VERSION:
+    create_all добавляет только недостающие таблицы, а столбцы и индексы
+    досоздают миграции (utils/migrate.py).
+    """
+    version = _read_schema_version(connection)
+    has_data = inspect(connection).has_table(User.__tablename__)
+    
+    Base.metadata.create_all(connection)
+    
+    if version is None:
+        version = BASELINE_SCHEMA_VERSION if has_data else SCHEMA_VERSION
+        connection.execute(insert(SchemaVersion).values(version=version))
+    return version
+
+async def init_db() -> bool:
+    """
+    Инициализация базы данных. Если версия схемы в базе не ниже SCHEMA_VERSION,
+    DDL не выполняется (один быстрый запрос вместо проверки каждой таблицы).
+    Устаревшая схема обновляется миграциями (DATABASE_MIGRATE=auto), а при
+    DATABASE_MIGRATE=manual запуск останавливается с RuntimeError: код с новыми
+    моделями не должен работать со старыми таблицами.
+    Возвращает True, если таблицы создавались или обновлялись.
+    """
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        version = await conn.run_sync(_read_schema_version)
+        if version is not None and version >= SCHEMA_VERSION:
+            return False
+        
+        version = await conn.run_sync(create_schema)
+    
+    if version < SCHEMA_VERSION:
+        if DATABASE_MIGRATE != 'auto':
+            raise RuntimeError(f"Версия схемы базы {version}, требуется {SCHEMA_VERSION}: "
+                               f"выполните python utils/migrate.py upgrade")
+        
+        # Миграции импортируют этот модуль, поэтому импорт здесь, а не в начале файла
+        from database.migrations import upgrade
+        
+        logger.info(f"Версия схемы базы {version}, требуется {SCHEMA_VERSION}: применяем миграции")
+        applied = await upgrade(on_migration=lambda item: logger.info(f"Миграция {item.version}: {item.description}"))
+        logger.info(f"Применено миграций: {len(applied)}")
+    return True
 
 async def get_session():
     """Получение сессии базы данных"""
@@ -19,4 +118,44 @@ async def get_session():
         try:
             yield session
         finally:
-            await session.close() 
\ No newline at end of file
+            await session.close()
+
+async def get_read_lag() -> float:
+    """
+    Отставание базы чтения от основной в секундах (перепроверяется не чаще READ_LAG_CHECK_SECONDS).
+    Пул SQLite читает тот же файл и не отстает. Недоступная реплика считается бесконечно отстающей.
+    """
+    if read_engine is None or read_engine.dialect.name != 'postgresql':
+        return 0.0
+    
+    now = time.monotonic()
+    if now - _read_lag['checked_at'] >= READ_LAG_CHECK_SECONDS:
+        try:
+            async with read_engine.connect() as conn:
+                _read_lag['seconds'] = float((await conn.execute(POSTGRES_REPLICA_LAG_SQL)).scalar() or 0)
+        except Exception as e:
+            logger.warning(f"Реплика для чтения недоступна, чтения идут в основную базу: {e}")
+            _read_lag['seconds'] = float('inf')
+        _read_lag['checked_at'] = now
+    return _read_lag['seconds']
+
+async def get_read_session(max_lag: float = DATABASE_READ_MAX_LAG_SECONDS):
+    """
+    Сессия для тяжелых чтений (статистика, отчеты): база чтения, если она отстает
+    не больше max_lag секунд, иначе основная база. Только для чтения: изменения через нее не вносятся.
+    """
+    factory = read_session if await get_read_lag() <= max_lag else async_session
+    async with factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+def dialect_insert(session: AsyncSession):
+    """
+    Возвращает insert() текущего диалекта (SQLite или PostgreSQL),
+    у которого есть on_conflict_do_update / on_conflict_do_nothing
+    """
+    if session.bind.dialect.name == 'postgresql':
+        return postgresql.insert
+    return sqlite.insert
@@ -0,0 +1,309 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Index, bindparam, delete, func, inspect, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from database.database import engine, SCHEMA_VERSION, create_schema
+from database.models import AnswerArchiveSegment, MigrationCheckpoint, SchemaVersion, TrainingAnswer, TrainingAnswerPack, TrainingSession, User, UserWord, Word
+
+logger = logging.getLogger(__name__)
+
+# Строк в одной пачке пакетного шага (одна транзакция и одна контрольная точка)
+MIGRATION_BATCH_SIZE = 5000
+
+# Отчет о ходе пакетного шага: (шаг, обработано строк, строк в секунду)
+ProgressCallback = Callable[[str, int, float], None]
+
+
+def _log_progress(step: str, rows_done: int, rows_per_second: float):
+    logger.info(f"{step}: {rows_done} строк ({rows_per_second:.0f} строк/с)")
+
+
+class MigrationContext:
+    """
+    Операции, доступные миграции. Схемные операции идемпотентны (повторный запуск
+    прерванной миграции ничего не ломает), пакетные шаги продолжаются с контрольной точки.
+    """
+
+    def __init__(self, connection: AsyncConnection, version: int, batch_size: int, progress: ProgressCallback):
+        self.connection = connection
+        self.version = version
+        self.batch_size = batch_size
+        self.progress = progress
+
+    async def has_column(self, table: str, column: str) -> bool:
+        columns = await self.connection.run_sync(lambda conn: inspect(conn).get_columns(table))
+        return any(existing['name'] == column for existing in columns)
+
+    async def add_column(self, table: str, column: str, ddl: str) -> bool:
+        """Добавляет столбец, если его еще нет. Возвращает True, если столбец добавлен"""
+        if await self.has_column(table, column):
+            return False
+        await self.connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        await self.connection.commit()
+        return True
+
+    async def create_table(self, model):
+        """Создает таблицу модели, если ее еще нет"""
+        await self.connection.run_sync(lambda conn: model.__table__.create(conn, checkfirst=True))
+        await self.connection.commit()
+
+    async def create_index(self, index: Index):
+        """Создает индекс из моделей, если его еще нет"""
+        await self.connection.run_sync(lambda conn: index.create(conn, checkfirst=True))
+        await self.connection.commit()
+
+    async def _load_checkpoint(self, step: str) -> Tuple[int, int]:
+        result = await self.connection.execute(
+            select(MigrationCheckpoint.last_id, MigrationCheckpoint.rows_done).where(
+                MigrationCheckpoint.version == self.version,
+                MigrationCheckpoint.step == step
+            )
+        )
+        row = result.first()
+        if row is None:
+            await self.connection.execute(insert(MigrationCheckpoint).values(
+                version=self.version, step=step, last_id=0, rows_done=0
+            ))
+            return 0, 0
+        return row.last_id, row.rows_done
+
+    async def batches(self, step: str, id_column,
+                      process_batch: Callable[[AsyncConnection, int, int], Awaitable[None]]) -> int:
+        """
+        Пакетный шаг данных: обходит таблицу по первичному ключу (keyset) пачками
+        по batch_size и вызывает process_batch(connection, после id, до id включительно).
+        Пачка и контрольная точка фиксируются одной транзакцией, поэтому прерванный
+        шаг продолжается со следующей пачки, а в памяти держится только одна пачка id.
+        Возвращает количество строк, обработанных шагом за все запуски.
+        """
+        last_id, rows_done = await self._load_checkpoint(step)
+        if last_id:
+            logger.info(f"{step}: продолжаем с id {last_id} ({rows_done} строк уже обработано)")
+
+        started = time.perf_counter()
+        rows_now = 0
+        while True:
+            ids_result = await self.connection.execute(
+                select(id_column).where(id_column > last_id).order_by(id_column).limit(self.batch_size)
+            )
+            ids = ids_result.scalars().all()
+            if not ids:
+                break
+
+            await process_batch(self.connection, last_id, ids[-1])
+
+            last_id = ids[-1]
+            rows_done += len(ids)
+            rows_now += len(ids)
+            await self.connection.execute(
+                update(MigrationCheckpoint).where(
+                    MigrationCheckpoint.version == self.version,
+                    MigrationCheckpoint.step == step
+                ).values(last_id=last_id, rows_done=rows_done, updated_at=datetime.utcnow())
+            )
+            await self.connection.commit()
+            self.progress(step, rows_done, rows_now / max(time.perf_counter() - started, 1e-9))
+
+        await self.connection.commit()
+        return rows_done
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[MigrationContext], Awaitable[None]]
+
+
+# Миграции по возрастанию версий; последняя версия равна SCHEMA_VERSION
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Регистрирует миграцию схемы до версии version"""
+    def decorator(func: Callable[[MigrationContext], Awaitable[None]]):
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+    return decorator
+
+
+def _model_index(model, name: str) -> Index:
+    return next(index for index in model.__table__.indexes if index.name == name)
+
+
+@migration(2, "Пояснение и тип морфемы у слов")
+async def words_morpheme_type(ctx: MigrationContext):
+    await ctx.add_column('words', 'explanation', "TEXT")
+    await ctx.add_column('words', 'morpheme_type', "VARCHAR(50) NOT NULL DEFAULT 'roots'")
+
+    async def fill_defaults(connection: AsyncConnection, after_id: int, to_id: int):
+        in_batch = (Word.id > after_id, Word.id <= to_id)
+        await connection.execute(update(Word).where(
+            *in_batch, (Word.morpheme_type.is_(None)) | (Word.morpheme_type == '')
+        ).values(morpheme_type='roots'))
+        await connection.execute(update(Word).where(*in_batch, Word.explanation.is_(None)).values(explanation=''))
+
+    await ctx.batches("words: значения по умолчанию", Word.id, fill_defaults)
+
+
+@migration(3, "Счетчик правильных ответов в словаре")
+async def user_words_correct_answers(ctx: MigrationContext):
+    await ctx.add_column('user_words', 'correct_answers_count', "INTEGER NOT NULL DEFAULT 0")
+
+    # Правильные ответы пользователя на слово из истории тренировок: через IN по тренировкам
+    # пользователя, чтобы ответы искались по индексу session_id, а не перебором
+    user_sessions = select(TrainingSession.id).where(TrainingSession.user_id == UserWord.user_id).correlate(UserWord)
+    correct_in_history = select(func.count(TrainingAnswer.id)).where(
+        TrainingAnswer.session_id.in_(user_sessions),
+        TrainingAnswer.word_id == UserWord.word_id,
+        TrainingAnswer.is_correct == True
+    ).scalar_subquery()
+
+    async def recount(connection: AsyncConnection, after_id: int, to_id: int):
+        in_batch = (UserWord.id > after_id, UserWord.id <= to_id)
+        await connection.execute(update(UserWord).where(
+            *in_batch, (UserWord.correct_answers_count.is_(None)) | (UserWord.correct_answers_count == 0)
+        ).values(correct_answers_count=correct_in_history))
+        # Слово выучено после 5 правильных ответов
+        await connection.execute(update(UserWord).where(
+            *in_batch, UserWord.correct_answers_count >= 5, UserWord.is_learned == False
+        ).values(is_learned=True))
+
+    # Без индекса каждый подсчет перебирал бы все ответы (индекс входит и в миграцию 10)
+    await ctx.create_index(_model_index(TrainingAnswer, 'ix_training_answers_session_id'))
+    await ctx.batches("user_words: правильные ответы из истории", UserWord.id, recount)
+
+
+@migration(4, "Опыт и уровень пользователей")
+async def users_leveling(ctx: MigrationContext):
+    from services.level_table import level_table
+
+    await ctx.add_column('users', 'experience_points', "INTEGER DEFAULT 0")
+    await ctx.add_column('users', 'level', "INTEGER DEFAULT 1")
+
+    async def relevel(connection: AsyncConnection, after_id: int, to_id: int):
+        result = await connection.execute(
+            select(User.id, User.experience_points, User.level).where(User.id > after_id, User.id <= to_id)
+        )
+        rows = result.all()
+        experience = np.array([row.experience_points or 0 for row in rows], dtype=np.int64)
+        levels = level_table.levels_for(experience)
+        changed = [
+            {'b_id': row.id, 'b_experience': int(points), 'b_level': int(level)}
+            for row, points, level in zip(rows, experience, levels)
+            if row.experience_points is None or row.level != level
+        ]
+        if changed:
+            await connection.execute(
+                update(User.__table__).where(User.__table__.c.id == bindparam('b_id')).values(
+                    experience_points=bindparam('b_experience'), level=bindparam('b_level')
+                ),
+                changed
+            )
+
+    await ctx.batches("users: уровни по опыту", User.id, relevel)
+
+
+@migration(5, "Стрик дней подряд")
+async def users_streak(ctx: MigrationContext):
+    await ctx.add_column('users', 'current_streak', "INTEGER DEFAULT 0")
+    await ctx.add_column('users', 'best_streak', "INTEGER DEFAULT 0")
+    await ctx.add_column('users', 'last_training_date', "DATE")
+
+
+@migration(6, "Состояние алгоритма повторений")
+async def user_words_scheduler_state(ctx: MigrationContext):
+    await ctx.add_column('user_words', 'stability', "REAL")
+    await ctx.add_column('user_words', 'difficulty', "REAL")
+
+
+@migration(7, "Индекс рейтинга и опыт в дневной сводке")
+async def leaderboard_index(ctx: MigrationContext):
+    await ctx.create_index(_model_index(User, 'ix_users_leaderboard'))
+    await ctx.add_column('user_daily_stats', 'experience_gained', "INTEGER DEFAULT 0")
+
+
+@migration(8, "Индекс постраничного просмотра словаря")
+async def dictionary_index(ctx: MigrationContext):
+    await ctx.create_index(_model_index(UserWord, 'ix_user_words_user_next_repetition'))
+
+
+@migration(9, "Архивирование слов")
+async def words_archive(ctx: MigrationContext):
+    await ctx.add_column('words', 'is_archived', "BOOLEAN DEFAULT FALSE")
+
+
+@migration(10, "Индекс ответов по тренировке")
+async def training_answers_session_index(ctx: MigrationContext):
+    await ctx.create_index(_model_index(TrainingAnswer, 'ix_training_answers_session_id'))
+
+
+@migration(11, "Архив старых ответов тренировок")
+async def answer_archive_segments(ctx: MigrationContext):
+    await ctx.create_table(AnswerArchiveSegment)
+
+
+@migration(12, "Компактное хранение ответов тренировок")
+async def training_answer_packs(ctx: MigrationContext):
+    await ctx.create_table(TrainingAnswerPack)
+
+
+@migration(13, "Время изменения слов")
+async def words_updated_at(ctx: MigrationContext):
+    await ctx.add_column('words', 'updated_at', "DATETIME")
+
+
+def pending_migrations(version: Optional[int]) -> List[Migration]:
+    """Миграции, которые еще не применены к базе с версией version"""
+    return [item for item in MIGRATIONS if version is None or item.version > version]
+
+
+async def get_checkpoints() -> List[MigrationCheckpoint]:
+    """Незавершенные пакетные шаги (остаются после прерванной миграции)"""
+    async with engine.connect() as conn:
+        if not await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(MigrationCheckpoint.__tablename__)):
+            return []
+        result = await conn.execute(select(MigrationCheckpoint).order_by(MigrationCheckpoint.version))
+        return result.all()
+
+
+async def upgrade(target: Optional[int] = None, batch_size: int = MIGRATION_BATCH_SIZE,
+                  progress: ProgressCallback = _log_progress,
+                  on_migration: Optional[Callable[[Migration], None]] = None) -> List[Migration]:
+    """
+    Применяет миграции до версии target (по умолчанию до SCHEMA_VERSION).
+    Каждая миграция после завершения записывается в schema_version, ее контрольные
+    точки удаляются. Прерванная миграция при следующем запуске выполняется заново:
+    схемные шаги пропускают уже сделанное, пакетные продолжают с контрольной точки.
+    Возвращает примененные миграции.
+    """
+    if MIGRATIONS[-1].version != SCHEMA_VERSION:
+        raise RuntimeError(f"Последняя миграция {MIGRATIONS[-1].version} не совпадает с SCHEMA_VERSION {SCHEMA_VERSION}")
+    target = SCHEMA_VERSION if target is None else target
+
+    applied = []
+    async with engine.connect() as conn:
+        # Новые таблицы (в том числе контрольных точек) создаются без миграций
+        version = await conn.run_sync(create_schema)
+        await conn.commit()
+
+        for item in pending_migrations(version):
+            if item.version > target:
+                break
+            if on_migration is not None:
+                on_migration(item)
+
+            await item.apply(MigrationContext(conn, item.version, batch_size, progress))
+
+            await conn.execute(delete(MigrationCheckpoint).where(MigrationCheckpoint.version == item.version))
+            await conn.execute(insert(SchemaVersion).values(version=item.version))
+            await conn.commit()
+            applied.append(item)
+
+    return applied
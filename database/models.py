@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Date
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Date, Float, UniqueConstraint, Index, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -22,6 +22,9 @@ class User(Base):
     last_training_date = Column(Date)  # Дата последней завершенной тренировки
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Индекс для рейтинга: ORDER BY level DESC, experience_points DESC
+    __table_args__ = (Index('ix_users_leaderboard', level.desc(), experience_points.desc()),)
+    
     # Связи
     user_words = relationship("UserWord", back_populates="user")
     training_sessions = relationship("TrainingSession", back_populates="user")
@@ -37,7 +40,11 @@ class Word(Base):
     difficulty_level = Column(Integer, default=1)  # 1-5
     puzzle_pattern = Column(String(255), nullable=False)  # Шаблон с пропусками (например: "ап_льс_н")
     hidden_letters = Column(String(100), nullable=False)  # Скрытые буквы (например: "еи")
+    is_archived = Column(Boolean, default=False)  # Слово убрано из тренировок, история ответов сохранена
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Время последнего изменения: задается явно при каждом изменении слова,
+    # по нему поиск замечает правки каталога из других процессов
+    updated_at = Column(DateTime, default=datetime.utcnow)
     
     # Связи
     user_words = relationship("UserWord", back_populates="word")
@@ -51,11 +58,16 @@ class UserWord(Base):
     mistakes_count = Column(Integer, default=1)
     correct_answers_count = Column(Integer, default=0)  # Счетчик правильных ответов
     current_interval_index = Column(Integer, default=0)
+    stability = Column(Float)  # Состояние алгоритма повторений (SM-2: интервал, FSRS: стабильность)
+    difficulty = Column(Float)  # Состояние алгоритма повторений (SM-2: EF, FSRS: сложность)
     next_repetition = Column(DateTime, nullable=False)
     is_learned = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_reviewed = Column(DateTime)
     
+    # Индекс для постраничного просмотра словаря: WHERE user_id = ? ORDER BY next_repetition, id
+    __table_args__ = (Index('ix_user_words_user_next_repetition', user_id, next_repetition, id),)
+    
     # Связи
     user = relationship("User", back_populates="user_words")
     word = relationship("Word", back_populates="user_words")
@@ -86,6 +98,60 @@ class TrainingAnswer(Base):
     is_correct = Column(Boolean)
     answered_at = Column(DateTime, default=datetime.utcnow)
     
+    # Ответы читаются по тренировке: завершение, восстановление сессий, проверка целостности
+    __table_args__ = (Index('ix_training_answers_session_id', session_id),)
+    
     # Связи
     session = relationship("TrainingSession", back_populates="answers")
-    word = relationship("Word") 
\ No newline at end of file
+    word = relationship("Word")
+
+class UserDailyStats(Base):
+    __tablename__ = 'user_daily_stats'
+    __table_args__ = (UniqueConstraint('user_id', 'day', name='uq_user_daily_stats_user_day'),)
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    day = Column(Date, nullable=False)  # День (UTC) завершения тренировок
+    sessions_count = Column(Integer, default=0)  # Завершенных тренировок
+    words_trained = Column(Integer, default=0)  # Слов в этих тренировках
+    words_correct = Column(Integer, default=0)  # Правильных ответов
+    words_learned = Column(Integer, default=0)  # Слов, ставших выученными
+    experience_gained = Column(Integer, default=0)  # Полученный за день опыт (для недельного и месячного рейтинга)
+
+class SchemaVersion(Base):
+    __tablename__ = 'schema_version'
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)  # Версия схемы (SCHEMA_VERSION в database/database.py)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+class MigrationCheckpoint(Base):
+    __tablename__ = 'migration_checkpoints'
+    __table_args__ = (UniqueConstraint('version', 'step', name='uq_migration_checkpoints_version_step'),)
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)  # Версия миграции (database/migrations.py)
+    step = Column(String(100), nullable=False)  # Пакетный шаг миграции
+    last_id = Column(Integer, nullable=False, default=0)  # Последний обработанный id (keyset)
+    rows_done = Column(Integer, nullable=False, default=0)  # Обработано строк
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class AnswerArchiveSegment(Base):
+    __tablename__ = 'answer_archive_segments'
+    
+    id = Column(Integer, primary_key=True)
+    month = Column(String(7), nullable=False, index=True)  # Месяц ответов (YYYY-MM) = файл архива
+    offset = Column(Integer, nullable=False)  # Смещение блока в файле месяца
+    length = Column(Integer, nullable=False)  # Размер блока в байтах
+    rows = Column(Integer, nullable=False)  # Ответов в блоке
+    min_answered_at = Column(DateTime, nullable=False)
+    max_answered_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class TrainingAnswerPack(Base):
+    __tablename__ = 'training_answer_packs'
+    
+    session_id = Column(Integer, ForeignKey('training_sessions.id'), primary_key=True)
+    answers_count = Column(Integer, nullable=False)
+    correct_count = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)  # Ответы тренировки (services/answer_pack_service.py)
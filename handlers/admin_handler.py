@@ -1,13 +1,32 @@
+import html
+import os
+import re
+import tempfile
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.filters import Command
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, BufferedInputFile, FSInputFile
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from sqlalchemy import select, func, delete
-from database.database import get_session
+from database.database import get_session, get_read_session
 from database.models import Word, User, UserWord, TrainingSession
 from services.word_service import WordService
-from config import ADMIN_ID, MORPHEME_TYPES
+from services.send_queue_service import send_queue_service, MAX_MESSAGE_LENGTH
+from services.write_queue_service import write_queue_service
+from services.forecast_service import forecast_service
+from services.leveling_service import leveling_service
+from services.word_import_service import word_import_service, detect_format, IMPORT_COLUMNS
+from services.export_service import export_service, available_formats, EXPORT_QUERIES
+from services.word_deletion_service import word_deletion_service
+from services.session_reaper_service import session_reaper_service
+from services.profiling_service import profiling_service
+from services.query_profiler_service import query_profiler_service
+from services.backup_service import backup_service
+from services.word_search_service import (
+    word_search_service, MATCH_EXACT, MATCH_PREFIX, MATCH_SUBSTRING, MATCH_FUZZY
+)
+from handlers.training_handler import training_data
+from config import ADMIN_ID, MORPHEME_TYPES, TRAINING_IDLE_TTL_MINUTES
 
 router = Router()
 
@@ -18,11 +37,21 @@ class AdminStates(StatesGroup):
     waiting_for_pattern = State()
     waiting_for_hidden_letters = State()
     waiting_for_word_to_delete = State()
+    waiting_for_import_file = State()
 
 def is_admin(user_id: int) -> bool:
     """Проверяет, является ли пользователь администратором"""
     return str(user_id) == ADMIN_ID
 
+async def add_catalog_word(new_word: Word):
+    """Сохраняет новое слово каталога через очередь записи"""
+    async def intent(session):
+        session.add(new_word)
+        await session.flush()
+
+    await write_queue_service.submit(intent)
+    word_search_service.invalidate()
+
 @router.message(Command("admin"))
 async def admin_panel(message: Message):
     """Админ-панель управления ботом"""
@@ -32,7 +61,7 @@ async def admin_panel(message: Message):
     
     async for session in get_session():
         # Статистика
-        total_words_query = select(func.count(Word.id))
+        total_words_query = select(func.count(Word.id)).where(Word.is_archived == False)
         total_words_result = await session.execute(total_words_query)
         total_words = total_words_result.scalar()
         
@@ -50,7 +79,18 @@ async def admin_panel(message: Message):
             f"/list_words - Список всех слов\n"
             f"/delete_word - Удалить слово\n"
             f"/word_stats - Подробная статистика слов\n"
-            f"/user_stats - Статистика пользователей"
+            f"/user_stats - Статистика пользователей\n"
+            f"/queue_stats - Очередь отправки сообщений\n"
+            f"/forecast - Прогноз нагрузки повторений\n"
+            f"/relevel - Пересчитать уровни пользователей\n"
+            f"/import_words - Загрузить слова из файла\n"
+            f"/export - Выгрузить таблицу в файл\n"
+            f"/find_word - Поиск слов\n"
+            f"/delete_words - Удалить несколько слов\n"
+            f"/reap_sessions - Завершить брошенные тренировки\n"
+            f"/profile - Профилирование обработчиков\n"
+            f"/slow_queries - Самые затратные SQL-запросы\n"
+            f"/backup - Резервная копия базы"
         )
         
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -252,9 +292,7 @@ async def process_pattern(message: Message, state: FSMContext):
                 hidden_letters="",  # Для типов с выбором вариантов не используется
                 difficulty_level=1  # Устанавливаем уровень 1 по умолчанию
             )
-            session.add(new_word)
-            await session.commit()
-            await session.refresh(new_word)
+            await add_catalog_word(new_word)
             
             success_text = (
                 f"✅ <b>Слово успешно добавлено!</b>\n\n"
@@ -318,9 +356,7 @@ async def process_hidden_letters(message: Message, state: FSMContext):
             hidden_letters=data['hidden_letters'],
             difficulty_level=1  # Устанавливаем уровень 1 по умолчанию
         )
-        session.add(new_word)
-        await session.commit()
-        await session.refresh(new_word)
+        await add_catalog_word(new_word)
         
         success_text = (
             f"✅ <b>Слово успешно добавлено!</b>\n\n"
@@ -372,7 +408,7 @@ async def admin_panel_callback(callback: CallbackQuery):
     """Отображение админ-панели через callback"""
     async for session in get_session():
         # Статистика
-        total_words_query = select(func.count(Word.id))
+        total_words_query = select(func.count(Word.id)).where(Word.is_archived == False)
         total_words_result = await session.execute(total_words_query)
         total_words = total_words_result.scalar()
         
@@ -390,7 +426,18 @@ async def admin_panel_callback(callback: CallbackQuery):
             f"/list_words - Список всех слов\n"
             f"/delete_word - Удалить слово\n"
             f"/word_stats - Подробная статистика слов\n"
-            f"/user_stats - Статистика пользователей"
+            f"/user_stats - Статистика пользователей\n"
+            f"/queue_stats - Очередь отправки сообщений\n"
+            f"/forecast - Прогноз нагрузки повторений\n"
+            f"/relevel - Пересчитать уровни пользователей\n"
+            f"/import_words - Загрузить слова из файла\n"
+            f"/export - Выгрузить таблицу в файл\n"
+            f"/find_word - Поиск слов\n"
+            f"/delete_words - Удалить несколько слов\n"
+            f"/reap_sessions - Завершить брошенные тренировки\n"
+            f"/profile - Профилирование обработчиков\n"
+            f"/slow_queries - Самые затратные SQL-запросы\n"
+            f"/backup - Резервная копия базы"
         )
         
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -410,7 +457,7 @@ async def list_words(message: Message):
         await message.answer("❌ У вас нет прав администратора.")
         return
     
-    async for session in get_session():
+    async for session in get_read_session():
         words_query = select(Word).order_by(Word.id)
         words_result = await session.execute(words_query)
         words = words_result.scalars().all()
@@ -437,7 +484,7 @@ async def list_words(message: Message):
 
 async def get_user_statistics():
     """Получает статистику всех пользователей"""
-    async for session in get_session():
+    async for session in get_read_session():
         stats_text = (
             "📊 <b>Статистика пользователей:</b>\n\n"
             "💡 <i>Слово считается выученным после:</i>\n"
@@ -514,18 +561,602 @@ async def word_stats(message: Message):
         await message.answer("❌ У вас нет прав администратора.")
         return
     
-    async for session in get_session():
+    async for session in get_read_session():
         # Статистика по типам морфем
         stats_text = "📊 <b>Статистика слов по типам морфем:</b>\n\n"
         
         for morpheme_key, morpheme_name in MORPHEME_TYPES.items():
-            count_query = select(func.count(Word.id)).where(Word.morpheme_type == morpheme_key)
+            count_query = select(func.count(Word.id)).where(
+                Word.morpheme_type == morpheme_key,
+                Word.is_archived == False
+            )
             count_result = await session.execute(count_query)
             count = count_result.scalar()
             stats_text += f"🔤 <b>{morpheme_name}:</b> {count} слов\n"
         
         await message.answer(stats_text, parse_mode="HTML")
 
+@router.message(Command("queue_stats"))
+async def queue_stats(message: Message):
+    """Метрики очереди исходящих сообщений"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав администратора.")
+        return
+    
+    metrics = send_queue_service.get_metrics()
+    
+    stats_text = (
+        f"📮 <b>Очередь отправки сообщений:</b>\n\n"
+        f"📥 В очереди сейчас: <b>{metrics['queue_depth']}</b>\n"
+        f"💬 Активных чатов: <b>{metrics['active_chats']}</b>\n"
+        f"📈 Максимальная глубина: <b>{metrics['max_queue_depth']}</b>\n\n"
+        f"✅ Отправлено запросов: <b>{metrics['sent']}</b>\n"
+        f"🔗 Склеено сообщений: <b>{metrics['coalesced']}</b>\n"
+        f"🔁 Повторов после 429: <b>{metrics['retries']}</b>\n"
+        f"❌ Ошибок отправки: <b>{metrics['failed']}</b>"
+    )
+    
+    if write_queue_service.enabled:
+        write_metrics = write_queue_service.get_metrics()
+        stats_text += (
+            f"\n\n💾 <b>Очередь записи в базу:</b>\n\n"
+            f"📥 В очереди сейчас: <b>{write_metrics['queue_depth']}</b>\n"
+            f"✍️ Намерений записано: <b>{write_metrics['intents']}</b>\n"
+            f"📦 Коммитов: <b>{write_metrics['batches']}</b> "
+            f"(в среднем {write_metrics['avg_batch']:.1f}, максимум {write_metrics['max_batch']} за раз)\n"
+            f"🔁 Пачек с повтором по одному: <b>{write_metrics['retried_batches']}</b>\n"
+            f"❌ Ошибок записи: <b>{write_metrics['failed']}</b>"
+        )
+    
+    await message.answer(stats_text, parse_mode="HTML")
+
+@router.message(Command("reap_sessions"))
+async def reap_sessions(message: Message, command: CommandObject):
+    """Завершает брошенные тренировки: /reap_sessions [минут без ответов]"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав администратора.")
+        return
+    
+    ttl_minutes = TRAINING_IDLE_TTL_MINUTES
+    if command.args:
+        if not command.args.strip().isdigit() or int(command.args.strip()) < 1:
+            await message.answer("❌ Укажите время простоя в минутах. Например: /reap_sessions 60")
+            return
+        ttl_minutes = int(command.args.strip())
+    
+    async for session in get_session():
+        result = await session_reaper_service.reap(session, training_data, ttl_minutes=ttl_minutes)
+    
+    totals = session_reaper_service.totals
+    await message.answer(
+        f"🧹 <b>Брошенные тренировки</b> (без ответов дольше {ttl_minutes} мин.):\n\n"
+        f"💾 Освобождено из памяти: <b>{result.released}</b>\n"
+        f"✅ Завершено с ответами: <b>{result.finalized}</b>\n"
+        f"🗑️ Удалено без ответов: <b>{result.discarded}</b>\n\n"
+        f"🏃 Идет тренировок сейчас: <b>{len(training_data)}</b>\n"
+        f"📈 Всего с запуска: освобождено {totals.released}, завершено {totals.finalized}, "
+        f"удалено {totals.discarded}",
+        parse_mode="HTML"
+    )
+
+@router.message(Command("profile"))
+async def profile_handlers(message: Message, command: CommandObject):
+    """Профилирование обработчиков: /profile [on [доля] | off | reset | dump]"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав администратора.")
+        return
+    
+    args = (command.args or "").split()
+    action = args[0].lower() if args else ""
+    
+    if action == "on":
+        sample_rate = 0.1
+        if len(args) > 1:
+            try:
+                sample_rate = float(args[1].replace(',', '.'))
+            except ValueError:
+                sample_rate = -1
+            if not 0 < sample_rate <= 1:
+                await message.answer("❌ Доля обновлений должна быть от 0 до 1. Например: /profile on 0.05")
+                return
+        profiling_service.start(sample_rate)
+        await message.answer(f"✅ Профилирование включено: {sample_rate:.0%} обновлений")
+        return
+    
+    if action == "off":
+        profiling_service.stop()
+        await message.answer("⏹️ Профилирование выключено, собранные данные сохранены")
+        return
+    
+    if action == "reset":
+        profiling_service.reset()
+        await message.answer("🧹 Данные профилирования сброшены")
+        return
+    
+    if action == "dump":
+        if not profiling_service.get_sample_count():
+            await message.answer("📭 Сэмплов пока нет.")
+            return
+        file_name = f"profile_{profiling_service.started_at.strftime('%Y%m%d_%H%M')}.folded"
+        await message.answer_document(
+            BufferedInputFile(profiling_service.folded_stacks().encode('utf-8'), filename=file_name),
+            caption="🔥 Folded stacks для flamegraph.pl или speedscope.app"
+        )
+        return
+    
+    if action:
+        await message.answer("❌ Используйте: /profile [on [доля] | off | reset | dump]")
+        return
+    
+    status = f"{profiling_service.sample_rate:.0%} обновлений" if profiling_service.enabled else "выключено"
+    stats_text = (
+        f"🔬 <b>Профилирование:</b> {status}\n"
+        f"🕐 Данные с {profiling_service.started_at.strftime('%d.%m %H:%M')} UTC, "
+        f"сэмплов: {profiling_service.get_sample_count()}\n"
+    )
+    
+    timings = profiling_service.get_timings()
+    hot_functions = profiling_service.hot_functions()
+    ordered = sorted(timings.items(), key=lambda item: -item[1]['avg_ms'] * item[1]['calls'])
+    for index, (name, timing) in enumerate(ordered):
+        entry = (
+            f"\n<b>{name}</b>: {timing['calls']} вызовов, "
+            f"среднее {timing['avg_ms']:.1f} мс, максимум {timing['max_ms']:.1f} мс\n"
+        )
+        for function, own_samples, total_samples in hot_functions.get(name, []):
+            entry += f"  • <code>{html.escape(function)}</code> {own_samples} / {total_samples}\n"
+        
+        # Обработчик целиком или никак: обрезка HTML ломает разметку
+        more_text = f"\n… и еще обработчиков: {len(ordered) - index} (полные стеки: /profile dump)"
+        if len(stats_text) + len(entry) + len(more_text) > MAX_MESSAGE_LENGTH:
+            stats_text += more_text
+            break
+        stats_text += entry
+    
+    if not timings:
+        stats_text += "\nДанных пока нет. Включите: /profile on 0.1"
+    
+    await message.answer(stats_text, parse_mode="HTML")
+
+@router.message(Command("slow_queries"))
+async def slow_queries(message: Message, command: CommandObject):
+    """Топ SQL-запросов: /slow_queries [количество] [total | avg | max | count] или /slow_queries reset"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав администратора.")
+        return
+    
+    limit = 10
+    order_by = 'total'
+    for arg in (command.args or "").lower().split():
+        if arg == 'reset':
+            query_profiler_service.reset()
+            await message.answer("🧹 Статистика SQL-запросов сброшена")
+            return
+        if arg.isdigit() and 1 <= int(arg) <= 50:
+            limit = int(arg)
+        elif arg in ('total', 'avg', 'max', 'count'):
+            order_by = arg
+        else:
+            await message.answer("❌ Используйте: /slow_queries [1-50] [total | avg | max | count] или /slow_queries reset")
+            return
+    
+    top = query_profiler_service.top(limit, order_by)
+    if not top:
+        await message.answer("📭 Запросов пока не было.")
+        return
+    
+    # Полный текст отпечатков - в файле, в сообщении только начало
+    report_lines = ["total_ms\tcount\tavg_ms\tp95_ms\tmax_ms\thandlers\tquery"]
+    stats_text = f"🐢 <b>SQL-запросы</b> (сортировка: {order_by}, порог журнала {query_profiler_service.slow_ms:.0f} мс):\n\n"
+    more_text = "\n… остальные запросы - в файле"
+    message_full = False
+    for index, item in enumerate(top, 1):
+        handlers = ", ".join(f"{name} ({count})" for name, count in item['handlers'])
+        entry = (
+            f"{index}. <b>{item['total_ms']:.0f} мс</b> всего, {item['count']} раз, "
+            f"сред. {item['avg_ms']:.1f} / p95 ≤{item['p95_ms']:g} / макс. {item['max_ms']:.1f} мс\n"
+            f"   👤 {html.escape(handlers)}\n"
+            f"   <code>{html.escape(item['fingerprint'][:150])}</code>\n"
+        )
+        # Запросы, не поместившиеся в сообщение, остаются только в файле (обрезка HTML ломает разметку)
+        if not message_full and len(stats_text) + len(entry) + len(more_text) > MAX_MESSAGE_LENGTH:
+            stats_text += more_text
+            message_full = True
+        if not message_full:
+            stats_text += entry
+        report_lines.append(
+            f"{item['total_ms']:.1f}\t{item['count']}\t{item['avg_ms']:.2f}\t{item['p95_ms']:g}\t"
+            f"{item['max_ms']:.2f}\t{handlers}\t{item['fingerprint']}"
+        )
+    
+    await message.answer(stats_text, parse_mode="HTML")
+    await message.answer_document(
+        BufferedInputFile(("\n".join(report_lines) + "\n").encode('utf-8'), filename="slow_queries.tsv")
+    )
+
+@router.message(Command("backup"))
+async def backup_database(message: Message):
+    """Снимает резервную копию базы и показывает последние снимки"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав администратора.")
+        return
+    
+    if not backup_service.available:
+        await message.answer("❌ Резервное копирование поддерживается только для SQLite.")
+        return
+    
+    await message.answer("💾 Снимаю резервную копию базы...")
+    try:
+        result = await backup_service.create_backup()
+    except Exception as e:
+        await message.answer(f"❌ Ошибка резервного копирования: {html.escape(str(e))}", parse_mode="HTML")
+        return
+    
+    snapshots = "\n".join(f"• {html.escape(os.path.basename(path))}" for path in backup_service.list_snapshots())
+    await message.answer(
+        f"✅ <b>Резервная копия готова</b> за {result.seconds:.1f} с\n\n"
+        f"📄 База: {result.database_bytes / 1048576:.1f} МБ ({result.pages} страниц), "
+        f"снимок: {result.snapshot_bytes / 1048576:.1f} МБ\n"
+        f"🔍 integrity_check: ok\n\n"
+        f"📦 <b>Снимки</b> (хранится {backup_service.keep}):\n{snapshots}",
+        parse_mode="HTML"
+    )
+
+@router.message(Command("forecast"))
+async def forecast_reviews(message: Message, command: CommandObject):
+    """Прогноз количества повторений на ближайшие дни: /forecast [дней]"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав администратора.")
+        return
+    
+    days = 1
+    if command.args:
+        if not command.args.strip().isdigit() or not 1 <= int(command.args.strip()) <= 30:
+            await message.answer("❌ Укажите количество дней от 1 до 30. Например: /forecast 7")
+            return
+        days = int(command.args.strip())
+    
+    async for session in get_session():
+        forecast = await forecast_service.forecast(session, days)
+    
+    hourly = forecast.hourly
+    peak_hour = int(hourly.argmax()) if hourly.sum() else 0
+    
+    forecast_text = (
+        f"🔮 <b>Прогноз повторений на {days} дн.</b>\n\n"
+        f"📚 Слов в изучении: <b>{forecast.words_total}</b>\n"
+        f"🔁 Всего повторений: <b>{int(hourly.sum())}</b>\n"
+        f"👥 Пользователей с повторениями: <b>{len(forecast.user_ids)}</b>\n"
+        f"⏰ Пиковый час: <b>+{peak_hour} ч.</b> ({int(hourly[peak_hour])} повторений)\n\n"
+    )
+    
+    if days == 1:
+        forecast_text += "<b>По часам (UTC):</b>\n"
+        for hour in range(len(hourly)):
+            hour_start = (forecast.start.hour + hour) % 24
+            forecast_text += f"<code>{hour_start:02d}:00</code> {int(hourly[hour])}\n"
+    else:
+        forecast_text += "<b>По дням:</b>\n"
+        for day, count in enumerate(forecast.daily, 1):
+            forecast_text += f"📅 День {day}: <b>{int(count)}</b>\n"
+    
+    top_users = forecast.top_users(5)
+    if top_users:
+        forecast_text += "\n<b>Самая большая нагрузка (ID пользователя):</b>\n"
+        for user_id, count in top_users:
+            forecast_text += f"👤 {user_id}: <b>{count}</b>\n"
+    
+    await message.answer(forecast_text, parse_mode="HTML")
+
+@router.message(Command("relevel"))
+async def relevel_users(message: Message, command: CommandObject):
+    """Пересчитывает уровни всех пользователей по текущей кривой: /relevel [check]"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав администратора.")
+        return
+    
+    dry_run = (command.args or "").strip() == "check"
+    
+    async for session in get_session():
+        checked, changed = await leveling_service.relevel_users(session, dry_run=dry_run)
+    
+    if dry_run:
+        result_text = (
+            f"🔍 <b>Проверка уровней</b>\n\n"
+            f"👥 Проверено пользователей: <b>{checked}</b>\n"
+            f"✏️ Уровень изменится у: <b>{changed}</b>\n\n"
+            f"Для пересчета выполните /relevel"
+        )
+    else:
+        result_text = (
+            f"✅ <b>Уровни пересчитаны</b>\n\n"
+            f"👥 Проверено пользователей: <b>{checked}</b>\n"
+            f"✏️ Изменено уровней: <b>{changed}</b>"
+        )
+    
+    await message.answer(result_text, parse_mode="HTML")
+
+@router.message(Command("import_words"))
+async def start_import_words(message: Message, command: CommandObject, state: FSMContext):
+    """Начало пакетной загрузки слов из файла: /import_words [update]"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав администратора.")
+        return
+    
+    update_existing = (command.args or "").strip() == "update"
+    await state.update_data(import_update_existing=update_existing)
+    
+    await message.answer(
+        "📥 <b>Загрузка слов из файла</b>\n\n"
+        "Отправьте файл CSV, TSV (.tsv, .txt) или JSONL.\n"
+        f"Столбцы: <code>{', '.join(IMPORT_COLUMNS)}</code>\n"
+        "Обязательны word, morpheme_type и puzzle_pattern.\n"
+        "Скрытые буквы можно не указывать - они будут взяты из шаблона.\n\n"
+        + ("♻️ Существующие слова будут обновлены." if update_existing
+           else "ℹ️ Существующие слова будут пропущены. Для обновления используйте /import_words update"),
+        parse_mode="HTML"
+    )
+    await state.set_state(AdminStates.waiting_for_import_file)
+
+@router.message(AdminStates.waiting_for_import_file, F.document)
+async def process_import_file(message: Message, state: FSMContext):
+    """Загружает присланный файл со словами"""
+    if not is_admin(message.from_user.id):
+        return
+    
+    file_name = message.document.file_name or ""
+    file_format = detect_format(file_name)
+    if file_format is None:
+        await message.answer("❌ Поддерживаются файлы .csv, .tsv, .txt и .jsonl")
+        return
+    
+    data = await state.get_data()
+    await state.clear()
+    
+    await message.answer("⏳ Загружаю слова...")
+    
+    # Файл сохраняется на диск и читается построчно, а не целиком в память
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, f"import.{file_format}")
+        await message.bot.download(message.document, destination=path)
+        
+        async for session in get_session():
+            try:
+                report = await word_import_service.import_file(
+                    session, path, file_format, update_existing=data.get('import_update_existing', False)
+                )
+            except (UnicodeDecodeError, ValueError) as e:
+                await message.answer(f"❌ Не удалось прочитать файл: {e}")
+                return
+    
+    report_text = (
+        f"✅ <b>Загрузка завершена</b>\n\n"
+        f"📄 Строк в файле: <b>{report.total}</b>\n"
+        f"➕ Добавлено слов: <b>{report.inserted}</b>\n"
+    )
+    if report.updated:
+        report_text += f"♻️ Обновлено: <b>{report.updated}</b>\n"
+    if report.skipped:
+        report_text += f"⏭ Уже были в базе: <b>{report.skipped}</b>\n"
+    report_text += f"❌ Ошибок: <b>{len(report.errors)}</b>"
+    
+    await message.answer(report_text, parse_mode="HTML")
+    
+    if report.errors:
+        await message.answer_document(
+            BufferedInputFile(report.format_errors().encode("utf-8"), filename="import_errors.tsv"),
+            caption="📋 Ошибки по строкам файла"
+        )
+
+@router.message(AdminStates.waiting_for_import_file)
+async def process_import_not_file(message: Message, state: FSMContext):
+    """Ожидали файл, а пришло что-то другое - отменяем загрузку"""
+    await state.clear()
+    await message.answer("❌ Загрузка отменена: ожидался файл со словами. Чтобы начать заново, используйте /import_words")
+
+@router.message(Command("export"))
+async def export_table(message: Message, command: CommandObject):
+    """Выгрузка таблицы в файл: /export таблица [формат]"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав администратора.")
+        return
+    
+    args = (command.args or "").split()
+    formats = available_formats()
+    
+    if not args or args[0] not in EXPORT_QUERIES or (len(args) > 1 and args[1] not in formats):
+        await message.answer(
+            "📤 <b>Выгрузка данных</b>\n\n"
+            "Использование: <code>/export таблица [формат]</code>\n"
+            f"Таблицы: <code>{', '.join(EXPORT_QUERIES)}</code>\n"
+            f"Форматы: <code>{', '.join(formats)}</code> (по умолчанию csv)\n\n"
+            "<i>Пример: /export words jsonl</i>",
+            parse_mode="HTML"
+        )
+        return
+    
+    table = args[0]
+    file_format = args[1] if len(args) > 1 else 'csv'
+    
+    await message.answer("⏳ Готовлю выгрузку...")
+    
+    # Файл пишется на диск порциями и отправляется прямо с диска
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = export_service.file_name(table, file_format, compress=True)
+        path = os.path.join(temp_dir, file_name)
+        
+        async for session in get_session():
+            rows_total = await export_service.export_table(session, table, path, file_format, compress=True)
+        
+        await message.answer_document(
+            FSInputFile(path, filename=file_name),
+            caption=f"📤 {table}: {rows_total} строк"
+        )
+
+@router.message(Command("find_word"))
+async def find_word(message: Message, command: CommandObject):
+    """Поиск слов в каталоге: /find_word запрос"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав администратора.")
+        return
+    
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer(
+            "🔎 Использование: <code>/find_word запрос</code>\n"
+            "Ищет по началу слова, по части слова и с учетом опечаток.",
+            parse_mode="HTML"
+        )
+        return
+    
+    async for session in get_session():
+        results = await word_search_service.search(session, query, limit=10)
+    
+    if not results:
+        await message.answer(f"🔎 По запросу «{html.escape(query)}» ничего не найдено.")
+        return
+    
+    match_icons = {
+        MATCH_EXACT: "🎯",
+        MATCH_PREFIX: "▶️",
+        MATCH_SUBSTRING: "🔤",
+        MATCH_FUZZY: "≈",
+    }
+    
+    results_text = f"🔎 <b>Результаты поиска «{html.escape(query)}»:</b>\n\n"
+    for i, result in enumerate(results, 1):
+        morpheme_name = MORPHEME_TYPES.get(result.morpheme_type, "Неизвестно")
+        results_text += f"{i}. {match_icons[result.match]} <b>{html.escape(result.word)}</b> ({morpheme_name})\n"
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=f"🗑️ {result.word}", callback_data=f"ask_delete_{result.word_id}")]
+        for result in results
+    ])
+    
+    await message.answer(results_text, parse_mode="HTML", reply_markup=keyboard)
+
+@router.message(Command("delete_words"))
+async def start_bulk_delete(message: Message, command: CommandObject, state: FSMContext):
+    """Удаление нескольких слов сразу: /delete_words слово1, слово2, ... (или по одному в строке)"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав администратора.")
+        return
+    
+    words_text = [text.strip() for text in re.split(r'[,;\n]', command.args or "") if text.strip()]
+    if not words_text:
+        await message.answer(
+            "🗑️ Использование: <code>/delete_words слово1, слово2, ...</code>\n"
+            "Слова можно перечислить через запятую или по одному в строке.",
+            parse_mode="HTML"
+        )
+        return
+    
+    async for session in get_session():
+        word_ids = []
+        not_found = []
+        for text in words_text:
+            word_id = await word_search_service.find_exact(session, text)
+            if word_id is None:
+                not_found.append(text)
+            elif word_id not in word_ids:
+                word_ids.append(word_id)
+        
+        if not word_ids:
+            await message.answer("❌ Ни одно из слов не найдено в базе данных.")
+            return
+        
+        references = await word_deletion_service.count_references(session, word_ids)
+    
+    await state.update_data(bulk_delete_word_ids=word_ids)
+    
+    confirmation_text = (
+        f"🗑️ <b>Подтвердите удаление слов:</b> {len(word_ids)}\n\n"
+        f"📚 Записей в личных словарях: {references['user_words']}\n"
+        f"📊 Ответов тренировок: {references['training_answers']}\n"
+    )
+    if references['archived_answers']:
+        confirmation_text += (
+            f"🗄️ Ответов в архиве ответов: {references['archived_answers']}\n"
+            f"⚠️ Архив ответов не изменяется, поэтому слова будут перенесены в архив, а не удалены\n"
+        )
+    if not_found:
+        confirmation_text += f"\n⚠️ Не найдены ({len(not_found)}): {', '.join(not_found[:20])}\n"
+    confirmation_text += f"\n❗ <b>Внимание:</b> Удаление нельзя отменить, архив - можно!"
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="✅ Да, удалить", callback_data="bulk_delete_confirm")],
+        [InlineKeyboardButton(text="📦 В архив (сохранить историю)", callback_data="bulk_delete_archive")],
+        [InlineKeyboardButton(text="❌ Отмена", callback_data="admin_panel")]
+    ])
+    
+    await message.answer(confirmation_text, parse_mode="HTML", reply_markup=keyboard)
+
+@router.callback_query(F.data.in_(["bulk_delete_confirm", "bulk_delete_archive"]))
+async def confirm_bulk_delete(callback: CallbackQuery, state: FSMContext):
+    """Подтверждение удаления нескольких слов"""
+    if not is_admin(callback.from_user.id):
+        await callback.answer("❌ У вас нет прав администратора.")
+        return
+    
+    data = await state.get_data()
+    word_ids = data.get('bulk_delete_word_ids')
+    if not word_ids:
+        await callback.answer("❌ Список слов устарел, выполните /delete_words заново")
+        return
+    
+    await state.update_data(bulk_delete_word_ids=None)
+    archive = callback.data == "bulk_delete_archive"
+    
+    async for session in get_session():
+        result = await word_deletion_service.delete_words(session, word_ids, archive=archive)
+    
+    if result.archived:
+        result_text = (
+            f"📦 <b>Слова перенесены в архив:</b> {result.words}\n\n"
+            f"🗑️ Удалено из личных словарей: {result.user_words}\n"
+            f"📊 История ответов сохранена"
+        )
+        if not archive:
+            result_text += "\n\n⚠️ На слова ссылаются ответы в архиве ответов, поэтому они не удалены"
+    else:
+        result_text = (
+            f"✅ <b>Удалено слов:</b> {result.words}\n\n"
+            f"🗑️ Удалено из личных словарей: {result.user_words}\n"
+            f"📊 Удалено ответов тренировок: {result.training_answers}"
+        )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🔙 Админ-панель", callback_data="admin_panel")]
+    ])
+    
+    await callback.message.edit_text(result_text, parse_mode="HTML", reply_markup=keyboard)
+    await callback.answer()
+
+@router.message(Command("restore_word"))
+async def restore_word(message: Message, command: CommandObject):
+    """Возвращает архивное слово в каталог: /restore_word слово"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав администратора.")
+        return
+    
+    word_text = (command.args or "").strip()
+    if not word_text:
+        await message.answer("📦 Использование: <code>/restore_word слово</code>", parse_mode="HTML")
+        return
+    
+    async for session in get_session():
+        word_query = select(Word).where(Word.word == word_text, Word.is_archived == True)
+        word_result = await session.execute(word_query)
+        word = word_result.scalar_one_or_none()
+        
+        if not word:
+            await message.answer(f"❌ Слово '{word_text}' не найдено в архиве.")
+            return
+        
+        await word_deletion_service.restore_words(session, [word.id])
+    
+    await message.answer(f"✅ Слово <b>{word_text}</b> возвращено в каталог.", parse_mode="HTML")
+
 @router.callback_query(F.data.in_(["admin_list_words", "admin_delete_word", "admin_stats", "admin_user_stats", "admin_word_stats"]))
 async def handle_admin_callbacks(callback: CallbackQuery, state: FSMContext):
     """Обработка админских коллбеков"""
@@ -548,7 +1179,7 @@ async def handle_admin_callbacks(callback: CallbackQuery, state: FSMContext):
 
 async def list_words_callback(callback: CallbackQuery):
     """Список слов через callback"""
-    async for session in get_session():
+    async for session in get_read_session():
         words_query = select(Word).order_by(Word.id)
         words_result = await session.execute(words_query)
         words = words_result.scalars().all()
@@ -608,12 +1239,15 @@ async def user_stats_callback(callback: CallbackQuery):
 
 async def word_stats_callback(callback: CallbackQuery):
     """Статистика слов через callback"""
-    async for session in get_session():
+    async for session in get_read_session():
         # Статистика по типам морфем
         stats_text = "📊 <b>Статистика слов по типам морфем:</b>\n\n"
         
         for morpheme_key, morpheme_name in MORPHEME_TYPES.items():
-            count_query = select(func.count(Word.id)).where(Word.morpheme_type == morpheme_key)
+            count_query = select(func.count(Word.id)).where(
+                Word.morpheme_type == morpheme_key,
+                Word.is_archived == False
+            )
             count_result = await session.execute(count_query)
             count = count_result.scalar()
             stats_text += f"🔤 <b>{morpheme_name}:</b> {count} слов\n"
@@ -665,56 +1299,88 @@ async def process_word_deletion(message: Message, state: FSMContext):
         return
     
     async for session in get_session():
-        # Сначала ищем точное совпадение (с ударениями)
-        word_query = select(Word).where(Word.word == word_text)
-        word_result = await session.execute(word_query)
-        word = word_result.scalar_one_or_none()
+        # Точное совпадение: сначала с ударениями, затем без учета регистра и е/ё
+        word_id = await word_search_service.find_exact(session, word_text)
+        word = await session.get(Word, word_id) if word_id else None
         
-        # Если не найдено точное совпадение, ищем без учета регистра (для совместимости)
         if not word:
-            word_query_lower = select(Word).where(Word.word.ilike(word_text))
-            word_result_lower = await session.execute(word_query_lower)
-            word = word_result_lower.scalar_one_or_none()
-        
-        if not word:
-            await message.answer(f"❌ Слово '{word_text}' не найдено в базе данных.")
+            # Предлагаем похожие слова из поиска
+            results = await word_search_service.search(session, word_text, limit=5)
+            if not results:
+                await message.answer(f"❌ Слово '{word_text}' не найдено в базе данных.")
+                return
+            
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text=f"🗑️ {result.word}", callback_data=f"ask_delete_{result.word_id}")]
+                for result in results
+            ] + [[InlineKeyboardButton(text="❌ Отмена", callback_data="admin_panel")]])
+            
+            await message.answer(
+                f"❌ Слово '{word_text}' не найдено. Возможно, вы имели в виду:",
+                reply_markup=keyboard
+            )
+            await state.clear()
             return
         
-        # Показываем информацию о слове и просим подтверждение
-        morpheme_name = MORPHEME_TYPES.get(word.morpheme_type, "Неизвестно")
-        confirmation_text = (
-            f"🗑️ <b>Подтвердите удаление:</b>\n\n"
-            f"📝 Слово: <b>{word.word}</b>\n"
-            f"🔤 Тип морфемы: <b>{morpheme_name}</b>\n"
-            f"🧩 Шаблон: <code>{word.puzzle_pattern.upper()}</code>\n"
-        )
-        
-        if word.explanation:
-            confirmation_text += f"💡 Пояснение: <b>{word.explanation}</b>\n"
-        
-        confirmation_text += f"\n❗ <b>Внимание:</b> Это действие нельзя отменить!"
-        
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="✅ Да, удалить", callback_data=f"confirm_delete_{word.id}")],
-            [InlineKeyboardButton(text="❌ Отмена", callback_data="admin_panel")]
-        ])
-        
+        confirmation_text, keyboard = build_delete_confirmation(word)
         await message.answer(confirmation_text, parse_mode="HTML", reply_markup=keyboard)
         await state.clear()
 
-@router.callback_query(F.data.startswith("confirm_delete_"))
+def build_delete_confirmation(word: Word):
+    """Текст и клавиатура подтверждения удаления слова"""
+    morpheme_name = MORPHEME_TYPES.get(word.morpheme_type, "Неизвестно")
+    confirmation_text = (
+        f"🗑️ <b>Подтвердите удаление:</b>\n\n"
+        f"📝 Слово: <b>{word.word}</b>\n"
+        f"🔤 Тип морфемы: <b>{morpheme_name}</b>\n"
+        f"🧩 Шаблон: <code>{word.puzzle_pattern.upper()}</code>\n"
+    )
+    
+    if word.explanation:
+        confirmation_text += f"💡 Пояснение: <b>{word.explanation}</b>\n"
+    
+    confirmation_text += f"\n❗ <b>Внимание:</b> Это действие нельзя отменить!"
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="✅ Да, удалить", callback_data=f"confirm_delete_{word.id}")],
+        [InlineKeyboardButton(text="📦 В архив (сохранить историю)", callback_data=f"confirm_archive_{word.id}")],
+        [InlineKeyboardButton(text="❌ Отмена", callback_data="admin_panel")]
+    ])
+    return confirmation_text, keyboard
+
+@router.callback_query(F.data.startswith("ask_delete_"))
+async def ask_word_deletion(callback: CallbackQuery):
+    """Подтверждение удаления слова, выбранного из результатов поиска"""
+    if not is_admin(callback.from_user.id):
+        await callback.answer("❌ У вас нет прав администратора.")
+        return
+    
+    word_id = int(callback.data.replace("ask_delete_", ""))
+    
+    async for session in get_session():
+        word = await session.get(Word, word_id)
+    
+    if not word:
+        await callback.message.edit_text("❌ Слово не найдено.")
+        await callback.answer()
+        return
+    
+    confirmation_text, keyboard = build_delete_confirmation(word)
+    await callback.message.edit_text(confirmation_text, parse_mode="HTML", reply_markup=keyboard)
+    await callback.answer()
+
+@router.callback_query(F.data.startswith("confirm_delete_") | F.data.startswith("confirm_archive_"))
 async def confirm_word_deletion(callback: CallbackQuery):
-    """Подтверждение удаления слова"""
+    """Подтверждение удаления (или архивации) слова"""
     if not is_admin(callback.from_user.id):
         await callback.answer("❌ У вас нет прав администратора.")
         return
     
-    word_id = int(callback.data.replace("confirm_delete_", ""))
+    archive = callback.data.startswith("confirm_archive_")
+    word_id = int(callback.data.replace("confirm_archive_", "").replace("confirm_delete_", ""))
     
     async for session in get_session():
-        word_query = select(Word).where(Word.id == word_id)
-        word_result = await session.execute(word_query)
-        word = word_result.scalar_one_or_none()
+        word = await session.get(Word, word_id)
         
         if not word:
             await callback.message.edit_text("❌ Слово не найдено.")
@@ -722,24 +1388,26 @@ async def confirm_word_deletion(callback: CallbackQuery):
         
         word_name = word.word
         
-        # Удаляем связанные записи из user_words
-        from database.models import UserWord
-        user_words_query = select(UserWord).where(UserWord.word_id == word_id)
-        user_words_result = await session.execute(user_words_query)
-        user_words = user_words_result.scalars().all()
+        # Связанные записи удаляются одним запросом на таблицу
+        result = await word_deletion_service.delete_words(session, [word_id], archive=archive)
         
-        for user_word in user_words:
-            await session.delete(user_word)
-        
-        # Удаляем само слово
-        await session.delete(word)
-        await session.commit()
-        
-        success_text = (
-            f"✅ <b>Слово успешно удалено!</b>\n\n"
-            f"📝 Удалено: <b>{word_name}</b>\n"
-            f"🗑️ Также удалены все связанные записи из личных словарей пользователей"
-        )
+        if result.archived:
+            success_text = (
+                f"📦 <b>Слово перенесено в архив!</b>\n\n"
+                f"📝 Слово: <b>{word_name}</b>\n"
+                f"🗑️ Удалено из личных словарей: {result.user_words}\n"
+                f"📊 История ответов сохранена\n\n"
+                f"Вернуть слово: /restore_word {word_name}"
+            )
+            if not archive:
+                success_text += "\n\n⚠️ На слово ссылаются ответы в архиве ответов, поэтому оно не удалено"
+        else:
+            success_text = (
+                f"✅ <b>Слово успешно удалено!</b>\n\n"
+                f"📝 Удалено: <b>{word_name}</b>\n"
+                f"🗑️ Удалено из личных словарей: {result.user_words}\n"
+                f"📊 Удалено ответов тренировок: {result.training_answers}"
+            )
         
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="🔙 Админ-панель", callback_data="admin_panel")]
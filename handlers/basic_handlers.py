@@ -1,9 +1,14 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.filters import Command
+from aiogram.exceptions import TelegramBadRequest
 from sqlalchemy import select, func
-from database.database import get_session
-from database.models import User, UserWord, TrainingSession, Word
+from database.database import get_session, get_read_session
+from database.models import User, UserWord
+from services.daily_stats_service import daily_stats_service
+from services.write_queue_service import write_queue_service
+from services.dictionary_service import dictionary_service, DICTIONARY_PAGE_SIZE, DICTIONARY_STATUSES
+from config import MORPHEME_TYPES
 from datetime import datetime, timedelta
 
 router = Router()
@@ -18,7 +23,8 @@ async def generate_user_statistics(user_id: int, days: int = None):
     Returns:
         tuple: (stats_text, period_name)
     """
-    async for session in get_session():
+    # Отчет только читает: идет в базу чтения, если она настроена (DATABASE_READ_URL)
+    async for session in get_read_session():
         # Получаем пользователя
         user_query = select(User).where(User.telegram_id == user_id)
         user_result = await session.execute(user_query)
@@ -28,11 +34,10 @@ async def generate_user_statistics(user_id: int, days: int = None):
             return "❌ Пользователь не найден.", ""
         
         # Определяем период для фильтрации
-        period_filter = None
+        period_start = None
         period_name = ""
         if days is not None:
             period_start = datetime.utcnow() - timedelta(days=days)
-            period_filter = TrainingSession.created_at >= period_start
             period_name = f"за {days} дн."
         else:
             period_name = "за все время"
@@ -57,37 +62,19 @@ async def generate_user_statistics(user_id: int, days: int = None):
         ready_words_result = await session.execute(ready_words_query)
         ready_words = ready_words_result.scalar()
         
-        # Статистика по тренировкам за выбранный период
-        training_conditions = [
-            TrainingSession.user_id == user.id,
-            TrainingSession.completed_at.isnot(None)
-        ]
-        
-        if period_filter is not None:
-            training_conditions.append(period_filter)
-        
-        total_sessions_query = select(func.count(TrainingSession.id)).where(*training_conditions)
-        total_sessions_result = await session.execute(total_sessions_query)
-        total_sessions = total_sessions_result.scalar()
-        
-        total_correct_query = select(func.sum(TrainingSession.words_correct)).where(*training_conditions)
-        total_correct_result = await session.execute(total_correct_query)
-        total_correct = total_correct_result.scalar() or 0
+        # Статистика по тренировкам за выбранный период - сумма по дневной сводке (не больше 30 строк)
+        period_totals = await daily_stats_service.get_period_totals(
+            session,
+            user.id,
+            period_start.date() if period_start is not None else None
+        )
         
-        total_words_trained_query = select(func.sum(TrainingSession.words_total)).where(*training_conditions)
-        total_words_trained_result = await session.execute(total_words_trained_query)
-        total_words_trained = total_words_trained_result.scalar() or 0
+        total_sessions = period_totals['sessions_count']
+        total_correct = period_totals['words_correct']
+        total_words_trained = period_totals['words_trained']
         
         # Статистика по словам, выученным за период
-        learned_in_period = 0
-        if period_filter is not None:
-            learned_in_period_query = select(func.count(UserWord.id)).where(
-                UserWord.user_id == user.id,
-                UserWord.is_learned == True,
-                UserWord.learned_at >= period_start
-            )
-            learned_in_period_result = await session.execute(learned_in_period_query)
-            learned_in_period = learned_in_period_result.scalar()
+        learned_in_period = period_totals['words_learned'] if period_start is not None else 0
         
         # Вычисляем процент точности
         accuracy = (total_correct / total_words_trained * 100) if total_words_trained > 0 else 0
@@ -149,8 +136,11 @@ async def cmd_start(message: Message):
                 first_name=message.from_user.first_name,
                 last_name=message.from_user.last_name
             )
-            session.add(new_user)
-            await session.commit()
+            
+            async def register(write_session):
+                write_session.add(new_user)
+            
+            await write_queue_service.submit(register)
             
             welcome_text = (
                 f"👋 Добро пожаловать, {message.from_user.first_name}!\n\n"
@@ -180,6 +170,117 @@ async def cmd_start(message: Message):
     
     await message.answer(welcome_text, parse_mode="HTML", reply_markup=keyboard)
 
+def format_word_status(user_word: UserWord, now: datetime) -> str:
+    """Статус слова в личном словаре"""
+    if user_word.is_learned:
+        return "✅ Выучено"
+    if user_word.next_repetition <= now:
+        return "🔴 Готово к повторению"
+    
+    time_left = user_word.next_repetition - now
+    if time_left.days > 0:
+        return f"⏰ Через {time_left.days} дней"
+    elif time_left.seconds > 3600:
+        hours = time_left.seconds // 3600
+        return f"⏰ Через {hours} часов"
+    else:
+        minutes = time_left.seconds // 60
+        return f"⏰ Через {minutes} минут"
+
+def dictionary_callback_data(status: str, morpheme_type: str = None, direction: str = "f",
+                             cursor: int = 0, page: int = 1) -> str:
+    """
+    callback_data страницы словаря: dict:статус:тип:направление:курсор:страница
+    направление: f - первая страница, n - после курсора, p - перед курсором
+    """
+    return f"dict:{status}:{morpheme_type or '-'}:{direction}:{cursor}:{page}"
+
+async def build_dictionary_view(session, user: User, status: str = 'all', morpheme_type: str = None,
+                                after_id: int = None, before_id: int = None, page: int = 1):
+    """Формирует текст и клавиатуру страницы личного словаря
+    
+    Returns:
+        tuple: (dictionary_text, keyboard)
+    """
+    now = datetime.utcnow()
+    total = await dictionary_service.count_words(session, user.id, status, morpheme_type, now=now)
+    dictionary_page = await dictionary_service.get_page(
+        session, user.id, status, morpheme_type, after_id=after_id, before_id=before_id, now=now
+    )
+    
+    filtered = status != 'all' or morpheme_type is not None
+    
+    if not dictionary_page.entries and not filtered:
+        dictionary_text = (
+            "📚 <b>Ваш личный словарь пуст!</b>\n\n"
+            "Слова появятся здесь после первых ошибок в тренировках.\n"
+            "Начните тренировку, чтобы пополнить словарь!"
+        )
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🎯 Начать тренировку", callback_data="start_training")],
+            [InlineKeyboardButton(text="📊 Статистика", callback_data="statistics")]
+        ])
+        return dictionary_text, keyboard
+    
+    dictionary_text = f"📚 <b>Ваш личный словарь</b>\n"
+    if filtered:
+        dictionary_text += f"🔎 {DICTIONARY_STATUSES[status]}"
+        if morpheme_type:
+            dictionary_text += f", {MORPHEME_TYPES.get(morpheme_type, morpheme_type)}"
+        dictionary_text += "\n"
+    
+    # Дошли до начала словаря - это первая страница, даже если словарь менялся во время листания
+    if not dictionary_page.has_prev:
+        page = 1
+    
+    pages_total = max((total + DICTIONARY_PAGE_SIZE - 1) // DICTIONARY_PAGE_SIZE, 1)
+    dictionary_text += f"Слов: {total}, страница {page} из {pages_total}\n\n"
+    
+    if not dictionary_page.entries:
+        dictionary_text += "Нет слов, подходящих под фильтр.\n"
+    
+    first_number = (page - 1) * DICTIONARY_PAGE_SIZE + 1
+    for i, (user_word, word) in enumerate(dictionary_page.entries, first_number):
+        dictionary_text += (
+            f"{i}. <b>{word.word}</b> (ошибок: {user_word.mistakes_count})\n"
+            f"   {format_word_status(user_word, now)}\n\n"
+        )
+    
+    # Листание страниц
+    navigation = []
+    if dictionary_page.has_prev and dictionary_page.entries:
+        navigation.append(InlineKeyboardButton(
+            text="⬅️ Назад",
+            callback_data=dictionary_callback_data(status, morpheme_type, "p", dictionary_page.first_id, max(page - 1, 1))
+        ))
+    if dictionary_page.has_next and dictionary_page.entries:
+        navigation.append(InlineKeyboardButton(
+            text="Вперед ➡️",
+            callback_data=dictionary_callback_data(status, morpheme_type, "n", dictionary_page.last_id, page + 1)
+        ))
+    
+    # Фильтры по статусу (текущий отмечен точкой)
+    status_buttons = [
+        InlineKeyboardButton(
+            text=f"• {name}" if key == status else name,
+            callback_data=dictionary_callback_data(key, morpheme_type)
+        )
+        for key, name in DICTIONARY_STATUSES.items()
+    ]
+    
+    inline_keyboard = []
+    if navigation:
+        inline_keyboard.append(navigation)
+    inline_keyboard += [
+        status_buttons[:2],
+        status_buttons[2:],
+        [InlineKeyboardButton(text="🔤 Тип слов", callback_data=f"dict_types:{status}")],
+        [InlineKeyboardButton(text="🎯 Начать тренировку", callback_data="start_training")],
+        [InlineKeyboardButton(text="📊 Статистика", callback_data="statistics")]
+    ]
+    
+    return dictionary_text, InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+
 @router.message(F.text == "📚 Мой словарь")
 async def show_dictionary(message: Message):
     """Показывает личный словарь пользователя"""
@@ -195,54 +296,7 @@ async def show_dictionary(message: Message):
             await message.answer("❌ Пользователь не найден. Используйте /start для регистрации.")
             return
         
-        # Получаем слова пользователя
-        user_words_query = select(UserWord, Word).join(Word).where(
-            UserWord.user_id == user.id
-        ).order_by(UserWord.next_repetition)
-        
-        user_words_result = await session.execute(user_words_query)
-        user_words = user_words_result.all()
-        
-        if not user_words:
-            dictionary_text = (
-                "📚 <b>Ваш личный словарь пуст!</b>\n\n"
-                "Слова появятся здесь после первых ошибок в тренировках.\n"
-                "Начните тренировку, чтобы пополнить словарь!"
-            )
-        else:
-            dictionary_text = f"📚 <b>Ваш личный словарь</b>\n\n"
-            
-            for i, (user_word, word) in enumerate(user_words[:20], 1):
-                # Определяем статус
-                now = datetime.utcnow()
-                if user_word.is_learned:
-                    status = "✅ Выучено"
-                elif user_word.next_repetition <= now:
-                    status = "🔴 Готово к повторению"
-                else:
-                    time_left = user_word.next_repetition - now
-                    if time_left.days > 0:
-                        status = f"⏰ Через {time_left.days} дней"
-                    elif time_left.seconds > 3600:
-                        hours = time_left.seconds // 3600
-                        status = f"⏰ Через {hours} часов"
-                    else:
-                        minutes = time_left.seconds // 60
-                        status = f"⏰ Через {minutes} минут"
-                
-                dictionary_text += (
-                    f"{i}. <b>{word.word}</b> (ошибок: {user_word.mistakes_count})\n"
-                    f"   {status}\n\n"
-                )
-            
-            if len(user_words) > 20:
-                dictionary_text += f"... и еще {len(user_words) - 20} слов\n\n"
-        
-        # Добавляем кнопки
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🎯 Начать тренировку", callback_data="start_training")],
-            [InlineKeyboardButton(text="📊 Статистика", callback_data="statistics")]
-        ])
+        dictionary_text, keyboard = await build_dictionary_view(session, user)
         
         await message.answer(dictionary_text, parse_mode="HTML", reply_markup=keyboard)
 
@@ -361,8 +415,14 @@ async def toggle_notifications(callback: CallbackQuery):
         user_result = await session.execute(user_query)
         user = user_result.scalar_one()
         
-        user.notifications_enabled = not user.notifications_enabled
-        await session.commit()
+        async def toggle(write_session) -> bool:
+            write_result = await write_session.execute(select(User).where(User.telegram_id == user_id))
+            write_user = write_result.scalar_one()
+            write_user.notifications_enabled = not write_user.notifications_enabled
+            return write_user.notifications_enabled
+        
+        # Пишет очередь записи, здесь только показываем новое значение
+        user.notifications_enabled = await write_queue_service.submit(toggle)
         
         status = "включены" if user.notifications_enabled else "отключены"
         
@@ -397,6 +457,68 @@ async def handle_inline_callbacks(callback: CallbackQuery):
     
     await callback.answer()
 
+async def edit_dictionary_message(callback: CallbackQuery, text: str, keyboard: InlineKeyboardMarkup):
+    """Заменяет сообщение словаря; повторное нажатие той же кнопки ничего не меняет и ошибкой не считается"""
+    try:
+        await callback.message.edit_text(text, parse_mode="HTML", reply_markup=keyboard)
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+
+@router.callback_query(F.data.startswith("dict:"))
+async def dictionary_page_callback(callback: CallbackQuery):
+    """Листание и фильтры личного словаря"""
+    try:
+        _, status, morpheme_type, direction, cursor, page = callback.data.split(":")
+        cursor, page = int(cursor), int(page)
+    except ValueError:
+        await callback.answer("❌ Некорректные данные")
+        return
+    
+    if status not in DICTIONARY_STATUSES:
+        await callback.answer("❌ Некорректные данные")
+        return
+    
+    morpheme_type = None if morpheme_type == "-" else morpheme_type
+    after_id = cursor if direction == "n" else None
+    before_id = cursor if direction == "p" else None
+    
+    async for session in get_session():
+        user_query = select(User).where(User.telegram_id == callback.from_user.id)
+        user_result = await session.execute(user_query)
+        user = user_result.scalar_one_or_none()
+        
+        if not user:
+            await callback.answer("❌ Пользователь не найден")
+            return
+        
+        dictionary_text, keyboard = await build_dictionary_view(
+            session, user, status, morpheme_type, after_id=after_id, before_id=before_id, page=page
+        )
+    
+    await edit_dictionary_message(callback, dictionary_text, keyboard)
+    await callback.answer()
+
+@router.callback_query(F.data.startswith("dict_types:"))
+async def dictionary_types_callback(callback: CallbackQuery):
+    """Выбор типа слов для фильтра личного словаря"""
+    status = callback.data.split(":", 1)[1]
+    if status not in DICTIONARY_STATUSES:
+        status = 'all'
+    
+    inline_keyboard = [
+        [InlineKeyboardButton(text=name, callback_data=dictionary_callback_data(status, key))]
+        for key, name in MORPHEME_TYPES.items()
+    ]
+    inline_keyboard.append([
+        InlineKeyboardButton(text="📚 Все типы", callback_data=dictionary_callback_data(status))
+    ])
+    
+    await edit_dictionary_message(
+        callback, "🔤 <b>Выберите тип слов:</b>", InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+    )
+    await callback.answer()
+
 async def show_dictionary_callback(callback: CallbackQuery):
     """Показывает личный словарь пользователя для колбэка"""
     user_id = callback.from_user.id
@@ -411,54 +533,7 @@ async def show_dictionary_callback(callback: CallbackQuery):
             await callback.message.answer("❌ Пользователь не найден. Используйте /start для регистрации.")
             return
         
-        # Получаем слова пользователя
-        user_words_query = select(UserWord, Word).join(Word).where(
-            UserWord.user_id == user.id
-        ).order_by(UserWord.next_repetition)
-        
-        user_words_result = await session.execute(user_words_query)
-        user_words = user_words_result.all()
-        
-        if not user_words:
-            dictionary_text = (
-                "📚 <b>Ваш личный словарь пуст!</b>\n\n"
-                "Слова появятся здесь после первых ошибок в тренировках.\n"
-                "Начните тренировку, чтобы пополнить словарь!"
-            )
-        else:
-            dictionary_text = f"📚 <b>Ваш личный словарь</b>\n\n"
-            
-            for i, (user_word, word) in enumerate(user_words[:20], 1):
-                # Определяем статус
-                now = datetime.utcnow()
-                if user_word.is_learned:
-                    status = "✅ Выучено"
-                elif user_word.next_repetition <= now:
-                    status = "🔴 Готово к повторению"
-                else:
-                    time_left = user_word.next_repetition - now
-                    if time_left.days > 0:
-                        status = f"⏰ Через {time_left.days} дней"
-                    elif time_left.seconds > 3600:
-                        hours = time_left.seconds // 3600
-                        status = f"⏰ Через {hours} часов"
-                    else:
-                        minutes = time_left.seconds // 60
-                        status = f"⏰ Через {minutes} минут"
-                
-                dictionary_text += (
-                    f"{i}. <b>{word.word}</b> (ошибок: {user_word.mistakes_count})\n"
-                    f"   {status}\n\n"
-                )
-            
-            if len(user_words) > 20:
-                dictionary_text += f"... и еще {len(user_words) - 20} слов\n\n"
-        
-        # Добавляем кнопки
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🎯 Начать тренировку", callback_data="start_training")],
-            [InlineKeyboardButton(text="📊 Статистика", callback_data="statistics")]
-        ])
+        dictionary_text, keyboard = await build_dictionary_view(session, user)
         
         await callback.message.answer(dictionary_text, parse_mode="HTML", reply_markup=keyboard)
 
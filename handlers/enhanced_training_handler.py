@@ -492,31 +492,25 @@ async def process_answer(message: Message, state: FSMContext):
     if is_correct:
         data['correct_answers'] += 1
         
-        # Начисляем опыт за правильный ответ
-        async for session in get_session():
-            user_query = select(User).where(User.telegram_id == user_id)
-            user_result = await session.execute(user_query)
-            user = user_result.scalar_one_or_none()
-            
-            if user:
-                # Рассчитываем награду опыта
-                difficulty = getattr(current_word, 'difficulty_level', 1)
-                streak = data['correct_answers'] - 1  # Текущая серия правильных ответов
-                experience_reward = leveling_service.calculate_experience_reward(difficulty, streak)
-                
-                # Добавляем опыт и проверяем повышение уровня
-                level_up, new_level = await leveling_service.add_experience(session, user, experience_reward)
-                
-                # Уведомление о повышении уровня
-                if level_up:
-                    level_name = leveling_service.get_level_name(new_level)
-                    await message.answer(
-                        f"🎉 <b>Поздравляем!</b>\n\n"
-                        f"🆙 Вы достигли нового уровня!\n"
-                        f"🏆 <b>Уровень {new_level}:</b> {level_name}\n"
-                        f"⭐ +{experience_reward} опыта",
-                        parse_mode="HTML"
-                    )
+        # Рассчитываем награду опыта
+        difficulty = getattr(current_word, 'difficulty_level', 1)
+        streak = data['correct_answers'] - 1  # Текущая серия правильных ответов
+        experience_reward = leveling_service.calculate_experience_reward(difficulty, streak)
+        
+        # Начисляем опыт через очередь записи и проверяем повышение уровня
+        outcome = await leveling_service.award_experience(user_id, experience_reward)
+        
+        # Уведомление о повышении уровня
+        if outcome is not None and outcome[0]:
+            new_level = outcome[1]
+            level_name = leveling_service.get_level_name(new_level)
+            await message.answer(
+                f"🎉 <b>Поздравляем!</b>\n\n"
+                f"🆙 Вы достигли нового уровня!\n"
+                f"🏆 <b>Уровень {new_level}:</b> {level_name}\n"
+                f"⭐ +{experience_reward} опыта",
+                parse_mode="HTML"
+            )
     else:
         data['incorrect_words'].append(current_word)
         await message.answer(f"❌ Неправильно. Правильный ответ: <b>{correct_answer}</b>", parse_mode="HTML")
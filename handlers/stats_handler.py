@@ -33,33 +33,49 @@ async def show_user_stats(message: Message):
         
         await message.answer(stats_text, parse_mode="HTML", reply_markup=keyboard)
 
+LEADERBOARD_TITLES = {
+    'all': "🏆 <b>Топ игроков</b>",
+    'week': "📅 <b>Топ игроков за неделю</b>",
+    'month': "🗓 <b>Топ игроков за месяц</b>",
+}
+
+LEADERBOARD_BUTTONS = [
+    ('all', "🏆 Все время", "show_leaderboard"),
+    ('week', "📅 Неделя", "show_leaderboard_week"),
+    ('month', "🗓 Месяц", "show_leaderboard_month"),
+]
+
 @router.message(F.text == "🏆 Рейтинг")
 async def show_leaderboard_command(message: Message):
     """Показывает топ игроков по команде из меню"""
-    await show_leaderboard_internal(message)
+    await show_leaderboard_internal(message, message.from_user.id)
 
-@router.callback_query(F.data == "show_leaderboard")
+@router.callback_query(F.data.in_([callback_data for _, _, callback_data in LEADERBOARD_BUTTONS]))
 async def show_leaderboard_callback(callback):
     """Показывает топ игроков по callback"""
     await callback.answer()
-    await show_leaderboard_internal(callback.message)
+    period = next(period for period, _, callback_data in LEADERBOARD_BUTTONS if callback_data == callback.data)
+    await show_leaderboard_internal(callback.message, callback.from_user.id, period)
 
-async def show_leaderboard_internal(message: Message):
+async def show_leaderboard_internal(message: Message, current_user_id: int, period: str = 'all'):
     """Внутренняя функция для показа топа игроков"""
     async for session in get_session():
         # Получаем топ игроков
-        leaderboard = await leveling_service.get_leaderboard(session, limit=10)
+        leaderboard = await leveling_service.get_leaderboard(session, limit=10, period=period)
         
-        if not leaderboard:
+        if not leaderboard and period == 'all':
             await message.answer("📊 Рейтинг пока пуст. Станьте первым!")
             return
         
         # Формируем сообщение с рейтингом
-        leaderboard_text = "🏆 <b>Топ игроков</b>\n\n"
+        leaderboard_text = f"{LEADERBOARD_TITLES[period]}\n\n"
+        
+        if not leaderboard:
+            leaderboard_text += "За этот период еще никто не получил опыт. Станьте первым!\n\n"
         
         medals = ["🥇", "🥈", "🥉"]
         
-        for i, (user, level_name) in enumerate(leaderboard, 1):
+        for i, (user, level_name, score) in enumerate(leaderboard, 1):
             # Получаем медаль или номер места
             if i <= 3:
                 place_icon = medals[i-1]
@@ -74,13 +90,14 @@ async def show_leaderboard_internal(message: Message):
             leaderboard_text += (
                 f"{place_icon} <b>{user_name}</b>\n"
                 f"    🏆 Уровень {user.level}: {level_name}\n"
-                f"    ⭐ {user.experience_points} опыта\n\n"
             )
+            if period == 'all':
+                leaderboard_text += f"    ⭐ {user.experience_points} опыта\n\n"
+            else:
+                leaderboard_text += f"    ⭐ +{score} опыта за период\n\n"
         
         # Добавляем информацию о текущем пользователе, если он не в топе
-        current_user_id = message.from_user.id if hasattr(message, 'from_user') else message.message.from_user.id
-        
-        user_in_top = any(user.telegram_id == current_user_id for user, _ in leaderboard)
+        user_in_top = any(user.telegram_id == current_user_id for user, _, _ in leaderboard)
         
         if not user_in_top:
             user_query = select(User).where(User.telegram_id == current_user_id)
@@ -89,15 +106,25 @@ async def show_leaderboard_internal(message: Message):
             
             if current_user:
                 current_level_name = leveling_service.get_level_name(current_user.level)
+                rank, score, total = await leveling_service.get_user_rank(session, current_user, period)
                 leaderboard_text += (
                     f"━━━━━━━━━━━━━━━━━━━━\n"
-                    f"📍 <b>Ваше место:</b>\n"
+                    f"📍 <b>Ваше место:</b> {rank} из {total}\n"
                     f"🏆 Уровень {current_user.level}: {current_level_name}\n"
-                    f"⭐ {current_user.experience_points} опыта"
                 )
+                if period == 'all':
+                    leaderboard_text += f"⭐ {current_user.experience_points} опыта"
+                else:
+                    leaderboard_text += f"⭐ +{score} опыта за период"
         
         # Создаем клавиатуру
+        period_buttons = [
+            InlineKeyboardButton(text=text, callback_data=callback_data)
+            for button_period, text, callback_data in LEADERBOARD_BUTTONS
+            if button_period != period
+        ]
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            period_buttons,
             [InlineKeyboardButton(text="📊 Моя статистика", callback_data="show_my_stats")],
             [InlineKeyboardButton(text="🎯 Начать тренировку", callback_data="start_training")]
         ])
@@ -4,10 +4,13 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from sqlalchemy import select
 from database.database import get_session
-from database.models import User, TrainingSession, TrainingAnswer
+from database.models import User, TrainingSession
 from services.word_service import WordService
 from services.support_phrases_service import support_phrases_service
 from services.leveling_service import leveling_service
+from services.answer_log_service import answer_log_service
+from services.write_queue_service import write_queue_service
+from services.training_results_service import training_results_service
 from typing import Dict, List
 from aiogram.filters import Command
 from config import MORPHEME_TYPES
@@ -23,6 +26,17 @@ class TrainingStates(StatesGroup):
 # Словарь для хранения данных тренировки (в продакшене лучше использовать Redis)
 training_data: Dict[int, Dict] = {}
 
+async def create_training_session(session, user_id: int, session_type: str, words_total: int) -> int:
+    """Намерение записи новой тренировки (коммитит очередь записи), возвращает id тренировки"""
+    training_session = TrainingSession(
+        user_id=user_id,
+        session_type=session_type,
+        words_total=words_total
+    )
+    session.add(training_session)
+    await session.flush()
+    return training_session.id
+
 @router.message(F.text == "🎯 Начать тренировку")
 async def start_training(message: Message, state: FSMContext):
     """Начало тренировки - выбор типа морфемы"""
@@ -85,14 +99,10 @@ async def process_quick_training(callback: CallbackQuery, state: FSMContext):
         
         # Создаем сессию тренировки
         session_type = 'quick_training_mixed'
-        training_session = TrainingSession(
-            user_id=user.id,
-            session_type=session_type,
-            words_total=len(words)
+        user_db_id = user.id
+        training_session_id = await write_queue_service.submit(
+            lambda write_session: create_training_session(write_session, user_db_id, session_type, len(words))
         )
-        session.add(training_session)
-        await session.commit()
-        await session.refresh(training_session)
         
         # Подготавливаем данные тренировки
         training_data[user_id] = {
@@ -102,7 +112,8 @@ async def process_quick_training(callback: CallbackQuery, state: FSMContext):
             'incorrect_words': [],
             'answers': [],
             'training_type_name': training_type_name,
-            'session_id': training_session.id
+            'session_id': training_session_id,
+            'last_activity': datetime.utcnow()
         }
         
         await send_next_word_callback(callback, user_id, state)
@@ -303,18 +314,14 @@ async def process_morpheme_choice(callback: CallbackQuery, state: FSMContext):
         
         # Создаем сессию тренировки
         session_type = f'training_{training_mode}_{morpheme_type}' if training_mode == "learned" else f'training_{morpheme_type}'
-        training_session = TrainingSession(
-            user_id=user.id,
-            session_type=session_type,
-            words_total=len(words)
+        user_db_id = user.id
+        training_session_id = await write_queue_service.submit(
+            lambda write_session: create_training_session(write_session, user_db_id, session_type, len(words))
         )
-        session.add(training_session)
-        await session.commit()
-        await session.refresh(training_session)
         
         # Подготавливаем данные тренировки
         training_data[user_id] = {
-            'session_id': training_session.id,
+            'session_id': training_session_id,
             'words': words,
             'current_word_index': 0,
             'correct_answers': 0,
@@ -322,7 +329,8 @@ async def process_morpheme_choice(callback: CallbackQuery, state: FSMContext):
             'answers': [],
             'morpheme_type': morpheme_type,
             'training_type_name': training_type_name,
-            'training_mode': training_mode  # Добавляем информацию о режиме
+            'training_mode': training_mode,  # Добавляем информацию о режиме
+            'last_activity': datetime.utcnow()
         }
         
         await send_next_word_callback(callback, user_id, state)
@@ -455,6 +463,8 @@ async def process_spelling_choice(callback: CallbackQuery, state: FSMContext):
         'is_correct': is_correct
     }
     data['answers'].append(answer_data)
+    answer_log_service.log_answer(data['session_id'], current_word.id, answer_data['user_answer'], is_correct)
+    data['last_activity'] = datetime.utcnow()
     
     if is_correct:
         data['correct_answers'] += 1
@@ -594,35 +604,31 @@ async def process_answer(message: Message, state: FSMContext):
         'is_correct': is_correct
     }
     data['answers'].append(answer_data)
+    answer_log_service.log_answer(data['session_id'], current_word.id, answer_data['user_answer'], is_correct)
+    data['last_activity'] = datetime.utcnow()
     
     if is_correct:
         data['correct_answers'] += 1
         
-        # Начисляем опыт за правильный ответ
-        async for session in get_session():
-            user_query = select(User).where(User.telegram_id == user_id)
-            user_result = await session.execute(user_query)
-            user = user_result.scalar_one_or_none()
-            
-            if user:
-                # Рассчитываем награду опыта
-                difficulty = getattr(current_word, 'difficulty_level', 1)
-                streak = data['correct_answers'] - 1  # Текущая серия правильных ответов
-                experience_reward = leveling_service.calculate_experience_reward(difficulty, streak)
-                
-                # Добавляем опыт и проверяем повышение уровня
-                level_up, new_level = await leveling_service.add_experience(session, user, experience_reward)
-                
-                # Уведомление о повышении уровня
-                if level_up:
-                    level_name = leveling_service.get_level_name(new_level)
-                    await message.answer(
-                        f"🎉 <b>Поздравляем!</b>\n\n"
-                        f"🆙 Вы достигли нового уровня!\n"
-                        f"🏆 <b>Уровень {new_level}:</b> {level_name}\n"
-                        f"⭐ +{experience_reward} опыта",
-                        parse_mode="HTML"
-                    )
+        # Рассчитываем награду опыта
+        difficulty = getattr(current_word, 'difficulty_level', 1)
+        streak = data['correct_answers'] - 1  # Текущая серия правильных ответов
+        experience_reward = leveling_service.calculate_experience_reward(difficulty, streak)
+        
+        # Начисляем опыт через очередь записи и проверяем повышение уровня
+        outcome = await leveling_service.award_experience(user_id, experience_reward)
+        
+        # Уведомление о повышении уровня
+        if outcome is not None and outcome[0]:
+            new_level = outcome[1]
+            level_name = leveling_service.get_level_name(new_level)
+            await message.answer(
+                f"🎉 <b>Поздравляем!</b>\n\n"
+                f"🆙 Вы достигли нового уровня!\n"
+                f"🏆 <b>Уровень {new_level}:</b> {level_name}\n"
+                f"⭐ +{experience_reward} опыта",
+                parse_mode="HTML"
+            )
     else:
         data['incorrect_words'].append(current_word)
         await message.answer(f"❌ Неправильно. Правильный ответ: <b>{correct_answer}</b>", parse_mode="HTML")
@@ -643,51 +649,13 @@ async def finish_training(message: Message, user_id: int):
         return
     
     data = training_data[user_id]
-    new_streak = 0
-    is_new_record = False
     
-    async for session in get_session():
-        # Обновляем сессию тренировки
-        session_query = select(TrainingSession).where(TrainingSession.id == data['session_id'])
-        training_session_result = await session.execute(session_query)
-        training_session = training_session_result.scalar_one()
-        
-        training_session.words_correct = data['correct_answers']
-        training_session.words_incorrect = len(data['incorrect_words'])
-        training_session.completed_at = datetime.utcnow()
-        
-        # Сохраняем все ответы
-        for answer_data in data['answers']:
-            training_answer = TrainingAnswer(
-                session_id=training_session.id,
-                word_id=answer_data['word'].id,
-                user_answer=answer_data['user_answer'],
-                is_correct=answer_data['is_correct']
-            )
-            session.add(training_answer)
-            
-            # Обновляем прогресс только для обычных тренировок (не для тренировок выученных слов)
-            if data.get('training_mode', 'new') != 'learned':
-                await WordService.update_word_progress(
-                    session, 
-                    training_session.user_id, 
-                    answer_data['word'].id, 
-                    answer_data['is_correct']
-                )
-        
-        # Получаем пользователя и добавляем неправильные слова в личный словарь
-        user_query = select(User).where(User.telegram_id == user_id)
-        user_result = await session.execute(user_query)
-        user = user_result.scalar_one()
-        
-        if data.get('training_mode', 'new') != 'learned' and data['incorrect_words']:
-            for incorrect_word in data['incorrect_words']:
-                await WordService.add_word_to_user_dictionary(session, user.id, incorrect_word.id)
-        
-        # Обновляем стрик пользователя
-        new_streak, is_new_record = await leveling_service.update_streak(session, user)
-        
-        await session.commit()
+    # Ответы уже в журнале, дописываем в базу те, что еще ждут группового коммита
+    await answer_log_service.flush()
+    
+    new_streak, is_new_record = await write_queue_service.submit(
+        lambda session: training_results_service.save_training_results(session, data)
+    )
     
     # Формируем результат тренировки
     accuracy = (data['correct_answers'] / len(data['words'])) * 100
@@ -767,51 +735,13 @@ async def finish_training_callback(callback: CallbackQuery, user_id: int):
         return
     
     data = training_data[user_id]
-    new_streak = 0
-    is_new_record = False
     
-    async for session in get_session():
-        # Обновляем сессию тренировки
-        session_query = select(TrainingSession).where(TrainingSession.id == data['session_id'])
-        training_session_result = await session.execute(session_query)
-        training_session = training_session_result.scalar_one()
-        
-        training_session.words_correct = data['correct_answers']
-        training_session.words_incorrect = len(data['incorrect_words'])
-        training_session.completed_at = datetime.utcnow()
-        
-        # Сохраняем все ответы
-        for answer_data in data['answers']:
-            training_answer = TrainingAnswer(
-                session_id=training_session.id,
-                word_id=answer_data['word'].id,
-                user_answer=answer_data['user_answer'],
-                is_correct=answer_data['is_correct']
-            )
-            session.add(training_answer)
-            
-            # Обновляем прогресс только для обычных тренировок (не для тренировок выученных слов)
-            if data.get('training_mode', 'new') != 'learned':
-                await WordService.update_word_progress(
-                    session, 
-                    training_session.user_id, 
-                    answer_data['word'].id, 
-                    answer_data['is_correct']
-                )
-        
-        # Получаем пользователя и добавляем неправильные слова в личный словарь
-        user_query = select(User).where(User.telegram_id == user_id)
-        user_result = await session.execute(user_query)
-        user = user_result.scalar_one()
-        
-        if data.get('training_mode', 'new') != 'learned' and data['incorrect_words']:
-            for incorrect_word in data['incorrect_words']:
-                await WordService.add_word_to_user_dictionary(session, user.id, incorrect_word.id)
-        
-        # Обновляем стрик пользователя
-        new_streak, is_new_record = await leveling_service.update_streak(session, user)
-        
-        await session.commit()
+    # Ответы уже в журнале, дописываем в базу те, что еще ждут группового коммита
+    await answer_log_service.flush()
+    
+    new_streak, is_new_record = await write_queue_service.submit(
+        lambda session: training_results_service.save_training_results(session, data)
+    )
     
     # Формируем результат тренировки
     accuracy = (data['correct_answers'] / len(data['words'])) * 100
@@ -980,18 +910,16 @@ async def start_error_training(callback: CallbackQuery, state: FSMContext):
             return
         
         # Создаем новую сессию тренировки для ошибок
-        error_training_session = TrainingSession(
-            user_id=user.id,
-            session_type='error_training',
-            words_total=len(incorrect_words)
+        user_db_id = user.id
+        error_training_session_id = await write_queue_service.submit(
+            lambda write_session: create_training_session(
+                write_session, user_db_id, 'error_training', len(incorrect_words)
+            )
         )
-        session.add(error_training_session)
-        await session.commit()
-        await session.refresh(error_training_session)
         
         # Подготавливаем данные тренировки на ошибках
         training_data[user_id] = {
-            'session_id': error_training_session.id,
+            'session_id': error_training_session_id,
             'words': incorrect_words,
             'current_word_index': 0,
             'correct_answers': 0,
@@ -999,7 +927,8 @@ async def start_error_training(callback: CallbackQuery, state: FSMContext):
             'answers': [],
             'morpheme_type': 'error_training',
             'training_type_name': 'Тренировка на ошибках',
-            'training_mode': 'error'
+            'training_mode': 'error',
+            'last_activity': datetime.utcnow()
         }
         
         await send_next_word_callback(callback, user_id, state)
@@ -1,16 +1,25 @@
+import argparse
 import asyncio
+import importlib
 import logging
+import os
+import signal
+import subprocess
+import sys
+import time
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.types import BotCommand, ReplyKeyboardMarkup, KeyboardButton
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
-from config import BOT_TOKEN, NOTIFICATION_HOURS
-from database.database import init_db, get_session
-from handlers import training_handler, basic_handlers, admin_handler, stats_handler
-from services.notification_service import NotificationService
+from config import (
+    BOT_TOKEN, NOTIFICATION_HOURS, TRAINING_REAPER_INTERVAL_MINUTES, TRACE_RECORD_PATH, STARTUP_BUDGET_SECONDS,
+    BACKUP_INTERVAL_HOURS, ANSWER_RETENTION_DAYS
+)
+from database.database import engine, read_engine, init_db, get_session
 
 # Настройка логирования
 logging.basicConfig(
@@ -19,12 +28,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Модули с обработчиками: импортируются при запуске бота, а не при импорте main
+ROUTER_MODULES = (
+    "handlers.basic_handlers",
+    "handlers.training_handler",
+    "handlers.admin_handler",
+    "handlers.stats_handler",
+)
+
+# Сервисы импортируются в функциях, где используются (резервные копии, архив и трасса - только
+# при включенной настройке), чтобы импорт main не тянул их за собой
+
+# Сервисы, которые create_bot(), startup() и setup_scheduler() импортируют при любых настройках
+STARTUP_SERVICES = (
+    "services.answer_log_service",
+    "services.write_queue_service",
+    "services.profiling_service",
+    "services.query_profiler_service",
+    "services.send_queue_service",
+    "services.notification_service",
+)
+
+# Сторонние библиотеки, время импорта которых показывает --check-startup
+STARTUP_LIBRARIES = ("aiogram", "sqlalchemy", "apscheduler", "numpy")
+
 # Глобальные переменные
-bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+bot = None
 dp = Dispatcher()
 scheduler = AsyncIOScheduler()
 notification_service = None
 
+def create_bot() -> Bot:
+    """Создает бота (при импорте main бот не создается, токен нужен только для запуска)"""
+    from services.send_queue_service import send_queue_service
+    
+    new_bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    # Все исходящие запросы идут через очередь с ограничением частоты
+    new_bot.session.middleware(send_queue_service)
+    return new_bot
+
+def load_routers() -> list:
+    """Импортирует модули обработчиков и возвращает их роутеры"""
+    return [importlib.import_module(module_name).router for module_name in ROUTER_MODULES]
+
 async def set_bot_commands():
     """Устанавливает команды бота"""
     commands = [
@@ -64,8 +110,40 @@ async def send_notifications():
     except Exception as e:
         logger.error(f"Ошибка при отправке напоминаний: {e}")
 
+async def reap_idle_trainings():
+    """Завершает брошенные тренировки и освобождает их данные"""
+    from handlers.training_handler import training_data
+    from services.session_reaper_service import session_reaper_service
+    
+    try:
+        async for session in get_session():
+            await session_reaper_service.reap(session, training_data)
+    except Exception as e:
+        logger.error(f"Ошибка при завершении брошенных тренировок: {e}")
+
+async def backup_database():
+    """Снимает резервную копию базы"""
+    from services.backup_service import backup_service
+    
+    try:
+        await backup_service.create_backup()
+    except Exception as e:
+        logger.error(f"Ошибка резервного копирования базы: {e}")
+
+async def archive_old_answers():
+    """Переносит старые ответы тренировок в архив"""
+    from services.answer_archive_service import answer_archive_service
+    
+    try:
+        async for session in get_session():
+            await answer_archive_service.archive(session)
+    except Exception as e:
+        logger.error(f"Ошибка архивирования ответов: {e}")
+
 async def setup_scheduler():
     """Настройка планировщика задач"""
+    from services.notification_service import NotificationService
+    
     global notification_service
     notification_service = NotificationService(bot)
     
@@ -79,16 +157,71 @@ async def setup_scheduler():
         )
         logger.info(f"Планировщик: напоминания будут отправляться в {hour}:00")
     
+    scheduler.add_job(
+        reap_idle_trainings,
+        trigger=IntervalTrigger(minutes=TRAINING_REAPER_INTERVAL_MINUTES),
+        id="training_reaper",
+        replace_existing=True
+    )
+    
+    if BACKUP_INTERVAL_HOURS > 0:
+        from services.backup_service import backup_service
+        if backup_service.available:
+            scheduler.add_job(
+                backup_database,
+                trigger=IntervalTrigger(hours=BACKUP_INTERVAL_HOURS),
+                id="database_backup",
+                replace_existing=True
+            )
+            logger.info(f"Планировщик: резервная копия базы каждые {BACKUP_INTERVAL_HOURS:g} ч.")
+    
+    if ANSWER_RETENTION_DAYS > 0:
+        scheduler.add_job(
+            archive_old_answers,
+            trigger=CronTrigger(hour=4, minute=30),
+            id="answer_archive",
+            replace_existing=True
+        )
+        logger.info(f"Планировщик: ответы старше {ANSWER_RETENTION_DAYS} дн. переносятся в архив в 4:30")
+    
     scheduler.start()
     logger.info("Планировщик задач запущен")
 
 async def startup():
     """Функция запуска бота"""
+    from services.answer_log_service import answer_log_service
+    from services.write_queue_service import write_queue_service
+    from services.profiling_service import profiling_service
+    from services.query_profiler_service import query_profiler_service
+    
     logger.info("Запуск бота...")
     
-    # Инициализация базы данных
-    await init_db()
-    logger.info("База данных инициализирована")
+    # Замер времени SQL-запросов (медленные пишутся в журнал)
+    query_profiler_service.install(engine)
+    if read_engine is not None:
+        query_profiler_service.install(read_engine)
+    
+    # Инициализация базы данных (DDL только при смене версии схемы)
+    if await init_db():
+        logger.info("Схема базы данных создана или обновлена")
+    else:
+        logger.info("Схема базы данных актуальна")
+    
+    # Завершаем тренировки, прерванные прошлым перезапуском, и запускаем журнал ответов
+    async for session in get_session():
+        recovered = await answer_log_service.recover_sessions(session)
+    if recovered:
+        logger.info(f"Восстановлено прерванных тренировок: {recovered}")
+    answer_log_service.start()
+    
+    # Единственный писатель с групповым коммитом (по умолчанию для SQLite)
+    write_queue_service.start()
+    if write_queue_service.enabled:
+        logger.info("Очередь записи с групповым коммитом запущена")
+    
+    if profiling_service.enabled:
+        profiling_service.start()
+        logger.info(f"Профилирование включено: {profiling_service.sample_rate:.0%} обновлений")
     
     # Установка команд бота
     await set_bot_commands()
@@ -101,22 +234,66 @@ async def startup():
 
 async def shutdown():
     """Функция завершения работы бота"""
+    from services.answer_log_service import answer_log_service
+    from services.write_queue_service import write_queue_service
+    from services.profiling_service import profiling_service
+    
     logger.info("Завершение работы бота...")
     
     if scheduler.running:
         scheduler.shutdown()
         logger.info("Планировщик задач остановлен")
     
-    await bot.session.close()
+    await write_queue_service.stop()
+    
+    await answer_log_service.stop()
+    logger.info("Журнал ответов записан")
+    
+    profiling_service.stop()
+    
+    if TRACE_RECORD_PATH:
+        from services.trace_service import trace_recorder_service
+        if trace_recorder_service.enabled:
+            trace_recorder_service.stop()
+            logger.info(f"Трасса обновлений записана: {trace_recorder_service.recorded} обновлений")
+    
+    if bot is not None:
+        await bot.session.close()
     logger.info("Бот остановлен")
 
+def dump_profile():
+    """Сохраняет собранный профиль в файл (по сигналу SIGUSR1)"""
+    from services.profiling_service import profiling_service
+    
+    path = profiling_service.dump()
+    logger.info(f"Профиль сохранен: {path}")
+
 async def main():
     """Главная функция"""
+    from services.profiling_service import profiling_service
+    from services.query_profiler_service import query_profiler_service
+    
+    global bot
+    bot = create_bot()
+    
+    # Профилирование обработчиков (при выключенном только передает управление дальше)
+    dp.message.middleware(profiling_service)
+    dp.callback_query.middleware(profiling_service)
+    # Обработчик, от имени которого выполняются SQL-запросы
+    dp.message.middleware(query_profiler_service)
+    dp.callback_query.middleware(query_profiler_service)
+    # Запись трассы обновлений (подключается только при заданном TRACE_RECORD_PATH)
+    if TRACE_RECORD_PATH:
+        from services.trace_service import trace_recorder_service
+        os.makedirs(os.path.dirname(TRACE_RECORD_PATH) or ".", exist_ok=True)
+        trace_recorder_service.start(TRACE_RECORD_PATH)
+        dp.update.outer_middleware(trace_recorder_service)
+    if hasattr(signal, "SIGUSR1"):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, dump_profile)
+    
     # Регистрация обработчиков
-    dp.include_router(basic_handlers.router)
-    dp.include_router(training_handler.router)
-    dp.include_router(admin_handler.router)
-    dp.include_router(stats_handler.router)
+    for router in load_routers():
+        dp.include_router(router)
     
     # Регистрация функций startup и shutdown
     dp.startup.register(startup)
@@ -130,8 +307,87 @@ async def main():
     finally:
         await shutdown()
 
+def measure_imports() -> dict:
+    """
+    Время холодного импорта main в отдельном процессе (python -X importtime):
+    {модуль: накопленное время в секундах} для модулей бота и STARTUP_LIBRARIES.
+    Обработчики и сервисы запуска импортируются позже, их время - в шагах инициализации
+    """
+    modules = ["config", "database.database", "main"]
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    
+    timings = {}
+    wanted = set(modules) | set(STARTUP_LIBRARIES)
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if name in wanted and cumulative.isdigit():
+            timings[name] = int(cumulative) / 1_000_000
+    return timings
+
+async def check_startup() -> bool:
+    """Режим --check-startup: время импорта и инициализации без подключения к Telegram"""
+    print("⏱️ Проверка времени запуска\n")
+    
+    started = time.perf_counter()
+    import_timings = measure_imports()
+    print("📦 Импорт (накопленное время, в отдельном процессе):")
+    for name, seconds in sorted(import_timings.items(), key=lambda item: -item[1]):
+        print(f"   {name:<36} {seconds * 1000:>8.1f} мс")
+    import_total = time.perf_counter() - started
+    
+    steps = []
+    
+    step_started = time.perf_counter()
+    ddl = await init_db()
+    steps.append(("init_db" + (" (DDL)" if ddl else " (схема актуальна)"), time.perf_counter() - step_started))
+    
+    step_started = time.perf_counter()
+    routers = load_routers()
+    steps.append((f"обработчики ({len(routers)} роутеров)", time.perf_counter() - step_started))
+    
+    step_started = time.perf_counter()
+    for module_name in STARTUP_SERVICES:
+        importlib.import_module(module_name)
+    steps.append(("сервисы запуска", time.perf_counter() - step_started))
+    
+    from services.leveling_service import leveling_service
+    from services.support_phrases_service import support_phrases_service
+    step_started = time.perf_counter()
+    leveling_service.level_names
+    support_phrases_service.phrases
+    steps.append(("файлы уровней и фраз", time.perf_counter() - step_started))
+    
+    await engine.dispose()
+    
+    print("\n🚀 Инициализация:")
+    for name, seconds in steps:
+        print(f"   {name:<36} {seconds * 1000:>8.1f} мс")
+    
+    total = import_total + sum(seconds for _, seconds in steps)
+    within_budget = total <= STARTUP_BUDGET_SECONDS
+    print(f"\n{'✅' if within_budget else '❌'} Холодный запуск: {total:.2f} с (бюджет {STARTUP_BUDGET_SECONDS:.1f} с)")
+    return within_budget
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Telegram-бот для подготовки к ЕГЭ")
+    parser.add_argument("--check-startup", action="store_true",
+                        help="показать время импорта и инициализации и выйти (код 1 при превышении бюджета)")
+    args = parser.parse_args()
+    
+    if args.check_startup:
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+        engine.sync_engine.echo = False
+        sys.exit(0 if asyncio.run(check_startup()) else 1)
+    
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        logger.info("Принудительное завершение работы") 
\ No newline at end of file
+        logger.info("Принудительное завершение работы")
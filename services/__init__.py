@@ -1,5 +1,3 @@
 # Сервисы и бизнес-логика бота
-from .support_phrases_service import support_phrases_service
-from .leveling_service import leveling_service
-
-__all__ = ['support_phrases_service', 'leveling_service'] 
\ No newline at end of file
+# Сервисы импортируются из своих модулей (from services.leveling_service import leveling_service):
+# пакет ничего не загружает сам, чтобы импорт одного сервиса не тянул за собой остальные
@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import ANSWER_ARCHIVE_DIR, ANSWER_RETENTION_DAYS
+from database.models import TrainingSession, TrainingAnswer, TrainingAnswerPack, AnswerArchiveSegment
+from services.answer_pack_service import answer_pack_service
+
+logger = logging.getLogger(__name__)
+
+# Сколько завершенных тренировок переносится в архив за одну транзакцию
+ARCHIVE_SESSIONS_PER_BATCH = 1000
+
+# Заголовок блока: сигнатура, число строк и сжатые размеры столбцов
+BLOCK_MAGIC = b'TAB1'
+BLOCK_COLUMNS = ('id', 'session_id', 'user_id', 'word_id', 'is_correct', 'answered_at', 'answer_lengths', 'answers')
+BLOCK_HEADER = struct.Struct(f'<4sI{len(BLOCK_COLUMNS)}I')
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _to_micros(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=int(value))
+
+
+def encode_block(rows: Sequence[Dict]) -> bytes:
+    """
+    Кодирует ответы (по возрастанию id) в столбцовый блок: каждый столбец - массив NumPy,
+    сжатый zlib. id, тренировка и время хранятся разностями с предыдущей строкой,
+    правильность - битами, тексты ответов - длинами и общей строкой UTF-8.
+    У упакованных ответов нет id: они хранятся с id 0.
+    """
+    ids = np.array([row['id'] or 0 for row in rows], dtype=np.int64)
+    session_ids = np.array([row['session_id'] for row in rows], dtype=np.int64)
+    answered_at = np.array([_to_micros(row['answered_at']) for row in rows], dtype=np.int64)
+    encoded_answers = [None if row['user_answer'] is None else row['user_answer'].encode('utf-8') for row in rows]
+
+    columns = (
+        np.diff(ids, prepend=0),
+        np.diff(session_ids, prepend=0),
+        np.array([row['user_id'] for row in rows], dtype=np.int64),
+        np.array([row['word_id'] for row in rows], dtype=np.int32),
+        np.packbits(np.array([bool(row['is_correct']) for row in rows], dtype=bool)),
+        np.diff(answered_at, prepend=0),
+        np.array([-1 if answer is None else len(answer) for answer in encoded_answers], dtype=np.int32),
+        b''.join(answer for answer in encoded_answers if answer),
+    )
+    payloads = [zlib.compress(column if isinstance(column, bytes) else column.tobytes(), 6) for column in columns]
+    return BLOCK_HEADER.pack(BLOCK_MAGIC, len(rows), *(len(payload) for payload in payloads)) + b''.join(payloads)
+
+
+def decode_block(data: bytes) -> Dict[str, np.ndarray]:
+    """Раскодирует блок в словарь столбцов (user_answer - список строк)"""
+    magic, rows, *sizes = BLOCK_HEADER.unpack_from(data)
+    if magic != BLOCK_MAGIC:
+        raise ValueError("Поврежденный блок архива ответов")
+
+    raw = {}
+    position = BLOCK_HEADER.size
+    for name, size in zip(BLOCK_COLUMNS, sizes):
+        raw[name] = zlib.decompress(data[position:position + size])
+        position += size
+
+    lengths = np.frombuffer(raw['answer_lengths'], dtype=np.int32)
+    answers = []
+    offset = 0
+    for length in lengths:
+        if length < 0:
+            answers.append(None)
+        else:
+            answers.append(raw['answers'][offset:offset + length].decode('utf-8'))
+            offset += length
+
+    return {
+        'id': np.cumsum(np.frombuffer(raw['id'], dtype=np.int64)),
+        'session_id': np.cumsum(np.frombuffer(raw['session_id'], dtype=np.int64)),
+        'user_id': np.frombuffer(raw['user_id'], dtype=np.int64),
+        'word_id': np.frombuffer(raw['word_id'], dtype=np.int32),
+        'is_correct': np.unpackbits(np.frombuffer(raw['is_correct'], dtype=np.uint8), count=rows).astype(bool),
+        'answered_at': np.cumsum(np.frombuffer(raw['answered_at'], dtype=np.int64)),
+        'user_answer': answers,
+    }
+
+
+@dataclass
+class ArchiveResult:
+    sessions: int = 0
+    answers: int = 0
+    bytes_written: int = 0
+
+
+class AnswerArchiveService:
+    """
+    Перенос старых ответов тренировок из training_answers в сжатый архив.
+
+    В архив уходят ответы тренировок, завершенных раньше чем retention_days назад:
+    их результаты к этому времени уже учтены в дневной сводке (user_daily_stats
+    пополняется при завершении тренировки), поэтому статистика и прогноз
+    от архивирования не меняются. Тренировка переносится целиком: и строки ответов,
+    и ее упакованная запись (ANSWER_STORAGE=packed).
+
+    Архив - по файлу на месяц ответов (answers-YYYY-MM.bin), в который только
+    дописываются столбцовые блоки (encode_block). Блок считается записанным,
+    только когда его строка в answer_archive_segments закоммичена вместе с
+    удалением ответов: блок, дописанный перед сбоем, ни на что не ссылается
+    и при чтении пропускается, а ответы остаются в базе до следующего запуска.
+    """
+
+    def __init__(self, archive_dir: str = ANSWER_ARCHIVE_DIR, retention_days: int = ANSWER_RETENTION_DAYS):
+        self.archive_dir = archive_dir
+        self.retention_days = retention_days
+
+    def _month_path(self, month: str) -> str:
+        return os.path.join(self.archive_dir, f"answers-{month}.bin")
+
+    def _append(self, month: str, block: bytes) -> int:
+        """Дописывает блок в файл месяца и возвращает его смещение"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        with open(self._month_path(month), 'ab') as file:
+            offset = file.seek(0, os.SEEK_END)
+            file.write(block)
+            file.flush()
+            os.fsync(file.fileno())
+        return offset
+
+    async def archive(self, session: AsyncSession, retention_days: Optional[int] = None,
+                      batch_sessions: int = ARCHIVE_SESSIONS_PER_BATCH) -> ArchiveResult:
+        """
+        Переносит в архив ответы тренировок, завершенных раньше retention_days дней назад.
+        Каждая пачка тренировок - отдельная транзакция, поэтому перенос можно прервать
+        и продолжить. Возвращает количество перенесенных тренировок, ответов и байт.
+        """
+        retention_days = self.retention_days if retention_days is None else retention_days
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        result = ArchiveResult()
+        last_session_id = 0
+
+        while True:
+            sessions_query = select(TrainingSession.id).where(
+                TrainingSession.id > last_session_id,
+                TrainingSession.completed_at.isnot(None),
+                TrainingSession.completed_at < cutoff
+            ).order_by(TrainingSession.id).limit(batch_sessions)
+            sessions_result = await session.execute(sessions_query)
+            session_ids = sessions_result.scalars().all()
+            if not session_ids:
+                break
+            last_session_id = session_ids[-1]
+
+            answers_query = select(
+                TrainingAnswer.id, TrainingAnswer.session_id, TrainingSession.user_id, TrainingAnswer.word_id,
+                TrainingAnswer.is_correct, TrainingAnswer.answered_at, TrainingAnswer.user_answer
+            ).join(TrainingSession, TrainingSession.id == TrainingAnswer.session_id).where(
+                TrainingAnswer.session_id.in_(session_ids)
+            ).order_by(TrainingAnswer.id)
+            answers_result = await session.execute(answers_query)
+            rows = [dict(row._mapping) for row in answers_result.all()]
+            # Тренировки, упакованные при ANSWER_STORAGE=packed, переносятся так же
+            async for packed_rows in answer_pack_service.iter_answers(session, session_ids=session_ids):
+                rows += packed_rows
+            if not rows:
+                continue
+
+            by_month: Dict[str, List[Dict]] = {}
+            for row in rows:
+                by_month.setdefault(f"{row['answered_at']:%Y-%m}", []).append(row)
+
+            segments = []
+            for month, month_rows in by_month.items():
+                block = encode_block(month_rows)
+                offset = await asyncio.to_thread(self._append, month, block)
+                segments.append({
+                    'month': month,
+                    'offset': offset,
+                    'length': len(block),
+                    'rows': len(month_rows),
+                    'min_answered_at': min(row['answered_at'] for row in month_rows),
+                    'max_answered_at': max(row['answered_at'] for row in month_rows),
+                })
+                result.bytes_written += len(block)
+
+            await session.execute(insert(AnswerArchiveSegment), segments)
+            await session.execute(delete(TrainingAnswer).where(TrainingAnswer.session_id.in_(session_ids)))
+            await session.execute(delete(TrainingAnswerPack).where(TrainingAnswerPack.session_id.in_(session_ids)))
+            await session.commit()
+
+            result.sessions += len(session_ids)
+            result.answers += len(rows)
+
+        if result.answers:
+            logger.info(
+                f"В архив перенесено ответов: {result.answers} из {result.sessions} тренировок "
+                f"({result.bytes_written / 1048576:.1f} МБ)"
+            )
+        return result
+
+    def _read_segments(self, segments: Sequence[AnswerArchiveSegment]) -> Iterator[Dict[str, np.ndarray]]:
+        """Читает блоки архива в порядке файлов и смещений"""
+        for month, month_segments in _group_by_month(segments).items():
+            with open(self._month_path(month), 'rb') as file:
+                for segment in month_segments:
+                    file.seek(segment.offset)
+                    yield decode_block(file.read(segment.length))
+
+    async def read(self, session: AsyncSession, user_id: Optional[int] = None,
+                   session_ids: Optional[Sequence[int]] = None, since: Optional[datetime] = None,
+                   until: Optional[datetime] = None) -> List[Dict]:
+        """
+        Ответы из архива с фильтрами по пользователю (id в users), тренировкам и времени ответа.
+        Читаются только блоки месяцев, пересекающихся с [since, until). Возвращает словари
+        с теми же ключами, что у строк training_answers, плюс user_id (id упакованных ответов - None).
+        """
+        segments_query = select(AnswerArchiveSegment).order_by(AnswerArchiveSegment.month, AnswerArchiveSegment.offset)
+        if since is not None:
+            segments_query = segments_query.where(AnswerArchiveSegment.max_answered_at >= since)
+        if until is not None:
+            segments_query = segments_query.where(AnswerArchiveSegment.min_answered_at < until)
+        segments_result = await session.execute(segments_query)
+        segments = segments_result.scalars().all()
+        if not segments:
+            return []
+
+        def collect() -> List[Dict]:
+            wanted_sessions = None if session_ids is None else np.asarray(list(session_ids), dtype=np.int64)
+            rows = []
+            for block in self._read_segments(segments):
+                mask = np.ones(len(block['id']), dtype=bool)
+                if user_id is not None:
+                    mask &= block['user_id'] == user_id
+                if wanted_sessions is not None:
+                    mask &= np.isin(block['session_id'], wanted_sessions)
+                if since is not None:
+                    mask &= block['answered_at'] >= _to_micros(since)
+                if until is not None:
+                    mask &= block['answered_at'] < _to_micros(until)
+                rows += _block_rows(block, np.flatnonzero(mask))
+            return rows
+
+        return await asyncio.to_thread(collect)
+
+    async def _all_segments(self, session: AsyncSession) -> List[AnswerArchiveSegment]:
+        segments_result = await session.execute(
+            select(AnswerArchiveSegment).order_by(AnswerArchiveSegment.month, AnswerArchiveSegment.offset)
+        )
+        return segments_result.scalars().all()
+
+    async def iter_rows(self, session: AsyncSession) -> AsyncIterator[List[Dict]]:
+        """Все ответы архива поблочно (как read), без загрузки архива в память целиком"""
+        for segment in await self._all_segments(session):
+            block = await asyncio.to_thread(lambda: next(self._read_segments([segment])))
+            yield _block_rows(block, range(len(block['id'])))
+
+    async def count_word_answers(self, session: AsyncSession, word_ids: Sequence[int]) -> int:
+        """Сколько ответов архива относятся к словам (читается весь архив)"""
+        segments = await self._all_segments(session)
+        if not segments or not word_ids:
+            return 0
+
+        def count() -> int:
+            wanted_words = np.asarray(list(word_ids), dtype=np.int32)
+            return sum(int(np.isin(block['word_id'], wanted_words).sum()) for block in self._read_segments(segments))
+
+        return await asyncio.to_thread(count)
+
+    async def get_stats(self, session: AsyncSession) -> Dict[str, int]:
+        """Размер архива: блоков, ответов, месяцев и байт"""
+        result = await session.execute(select(
+            func.count(AnswerArchiveSegment.id),
+            func.coalesce(func.sum(AnswerArchiveSegment.rows), 0),
+            func.count(func.distinct(AnswerArchiveSegment.month)),
+            func.coalesce(func.sum(AnswerArchiveSegment.length), 0)
+        ))
+        segments, answers, months, size = result.one()
+        return {'segments': segments, 'answers': answers, 'months': months, 'bytes': size}
+
+
+def _block_rows(block: Dict[str, np.ndarray], indexes) -> List[Dict]:
+    return [{
+        'id': int(block['id'][index]) or None,
+        'session_id': int(block['session_id'][index]),
+        'user_id': int(block['user_id'][index]),
+        'word_id': int(block['word_id'][index]),
+        'user_answer': block['user_answer'][index],
+        'is_correct': bool(block['is_correct'][index]),
+        'answered_at': _from_micros(block['answered_at'][index]),
+    } for index in indexes]
+
+
+def _group_by_month(segments: Sequence[AnswerArchiveSegment]) -> Dict[str, List[AnswerArchiveSegment]]:
+    grouped: Dict[str, List[AnswerArchiveSegment]] = {}
+    for segment in segments:
+        grouped.setdefault(segment.month, []).append(segment)
+    return grouped
+
+
+# Создаем глобальный экземпляр сервиса
+answer_archive_service = AnswerArchiveService()
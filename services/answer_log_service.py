@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select, insert, exists, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import TrainingSession, TrainingAnswer, Word
+from services.training_results_service import training_results_service
+from services.write_queue_service import write_queue_service
+
+logger = logging.getLogger(__name__)
+
+# Как часто записывать накопленные ответы (групповой коммит)
+ANSWER_LOG_FLUSH_SECONDS = 1.0
+
+# При таком количестве ожидающих ответов запись начинается, не дожидаясь таймера
+ANSWER_LOG_MAX_BATCH = 200
+
+# Тренировки выученных слов не меняют прогресс слов (training_mode='learned')
+LEARNED_SESSION_PREFIX = 'training_learned_'
+
+
+class AnswerLogService:
+    """
+    Журнал ответов тренировок. Каждый ответ сразу попадает в буфер в памяти,
+    а фоновая задача записывает буфер в training_answers одним INSERT через очередь
+    записи раз в ANSWER_LOG_FLUSH_SECONDS. Так ответы переживают перезапуск бота без
+    отдельного fsync на каждый ответ (при сбое теряется не больше одного интервала).
+    """
+
+    def __init__(self):
+        self._pending: List[Dict] = []
+        self._lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def log_answer(self, session_id: int, word_id: int, user_answer: str, is_correct: bool):
+        """Добавляет ответ в журнал (без ожидания записи в базу)"""
+        self._pending.append({
+            'session_id': session_id,
+            'word_id': word_id,
+            'user_answer': user_answer,
+            'is_correct': is_correct,
+            'answered_at': datetime.utcnow(),
+        })
+        if len(self._pending) >= ANSWER_LOG_MAX_BATCH and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Записывает все накопленные ответы одной транзакцией, возвращает их количество"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, []
+            try:
+                # Через очередь записи: у SQLite один писатель, журнал не спорит с ним за блокировку
+                await write_queue_service.submit(lambda session: session.execute(insert(TrainingAnswer), batch))
+            except Exception:
+                # Возвращаем ответы в начало буфера, следующая попытка запишет их
+                self._pending[:0] = batch
+                raise
+
+            return len(batch)
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=ANSWER_LOG_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Ошибка записи журнала ответов: {e}")
+
+    def start(self):
+        """Запускает фоновую запись журнала"""
+        if self._flusher is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Останавливает фоновую запись и дописывает оставшиеся ответы"""
+        if self._flusher is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._flusher
+            self._flusher = None
+        await self.flush()
+
+    async def recover_sessions(self, session: AsyncSession) -> int:
+        """
+        Завершает тренировки, прерванные перезапуском бота: незавершенные сессии,
+        по которым в журнале есть ответы. Возвращает количество восстановленных тренировок.
+        """
+        return await self.finalize_sessions(session)
+
+    async def finalize_sessions(self, session: AsyncSession, idle_before: Optional[datetime] = None,
+                                exclude_ids: Iterable[int] = ()) -> int:
+        """
+        Завершает незавершенные сессии по ответам из журнала тем же путем, что и обычное
+        завершение тренировки (training_results_service через очередь записи): данные
+        тренировки собираются из журнала, завершение - время последнего ответа.
+
+        idle_before - только сессии, последний ответ в которых был раньше этого времени
+        exclude_ids - сессии, которые еще идут и не должны завершаться
+        Возвращает количество завершенных тренировок.
+        """
+        last_answers = select(TrainingAnswer.session_id).group_by(TrainingAnswer.session_id)
+        if idle_before is not None:
+            last_answers = last_answers.having(func.max(TrainingAnswer.answered_at) < idle_before)
+
+        sessions_query = select(TrainingSession).where(
+            TrainingSession.completed_at == None,
+            TrainingSession.id.in_(last_answers)
+        ).order_by(TrainingSession.id)
+        exclude_ids = list(exclude_ids)
+        if exclude_ids:
+            sessions_query = sessions_query.where(TrainingSession.id.not_in(exclude_ids))
+        sessions_result = await session.execute(sessions_query)
+        training_sessions = sessions_result.scalars().all()
+
+        for training_session in training_sessions:
+            answers_query = select(TrainingAnswer).where(
+                TrainingAnswer.session_id == training_session.id
+            ).order_by(TrainingAnswer.id)
+            answers_result = await session.execute(answers_query)
+            answers = answers_result.scalars().all()
+
+            words_result = await session.execute(
+                select(Word).where(Word.id.in_({answer.word_id for answer in answers}))
+            )
+            words = {word.id: word for word in words_result.scalars().all()}
+
+            # Те же данные, что копит обработчик тренировки в training_data
+            data = {
+                'session_id': training_session.id,
+                'answers': [
+                    {'word': words[answer.word_id], 'user_answer': answer.user_answer, 'is_correct': answer.is_correct}
+                    for answer in answers
+                ],
+                'correct_answers': sum(1 for answer in answers if answer.is_correct),
+                'incorrect_words': [words[answer.word_id] for answer in answers if not answer.is_correct],
+                'training_mode': 'learned' if (training_session.session_type or '').startswith(LEARNED_SESSION_PREFIX)
+                                 else 'new',
+                'completed_at': max(answer.answered_at for answer in answers),
+            }
+            await write_queue_service.submit(
+                lambda write_session: training_results_service.save_training_results(write_session, data)
+            )
+
+            logger.info(
+                f"Завершена тренировка {training_session.id} пользователя {training_session.user_id}: "
+                f"{len(answers)} ответов"
+            )
+
+        return len(training_sessions)
+
+    async def discard_empty_sessions(self, started_before: datetime, exclude_ids: Iterable[int] = ()) -> int:
+        """
+        Удаляет незавершенные сессии без единого ответа, начатые раньше started_before:
+        тренировку бросили до первого ответа, статистике в них учитывать нечего.
+        """
+        statement = delete(TrainingSession).where(
+            TrainingSession.completed_at == None,
+            TrainingSession.started_at < started_before,
+            ~exists().where(TrainingAnswer.session_id == TrainingSession.id)
+        )
+        exclude_ids = list(exclude_ids)
+        if exclude_ids:
+            statement = statement.where(TrainingSession.id.not_in(exclude_ids))
+
+        async def intent(session: AsyncSession) -> int:
+            result = await session.execute(statement)
+            return result.rowcount or 0
+
+        return await write_queue_service.submit(intent)
+
+
+# Создаем глобальный экземпляр сервиса
+answer_log_service = AnswerLogService()
@@ -0,0 +1,348 @@
+import logging
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, delete, insert, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import ANSWER_STORAGE
+from database.models import TrainingSession, TrainingAnswer, TrainingAnswerPack
+
+logger = logging.getLogger(__name__)
+
+# Версия формата упакованной записи (первый байт)
+PACK_FORMAT_VERSION = 1
+
+# Сколько завершенных тренировок упаковывается за одну транзакцию
+PACK_SESSIONS_PER_BATCH = 1000
+
+
+def _write_varint(buffer: bytearray, value: int):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def encode_answers(answers: Sequence[Dict], started_at: datetime) -> bytes:
+    """
+    Упаковывает ответы тренировки (по порядку) в одну запись:
+    номера слов (varint), битовая маска правильности, задержки между ответами
+    в миллисекундах (varint, первая - от начала тренировки) и тексты только
+    неправильных ответов (длина + UTF-8). Тексты правильных ответов не хранятся:
+    они совпадают с самим словом. Время ответа хранится с точностью до миллисекунды.
+    """
+    buffer = bytearray([PACK_FORMAT_VERSION])
+    _write_varint(buffer, len(answers))
+
+    for answer in answers:
+        _write_varint(buffer, answer['word_id'])
+
+    bits = bytearray((len(answers) + 7) // 8)
+    for index, answer in enumerate(answers):
+        if answer['is_correct']:
+            bits[index >> 3] |= 1 << (index & 7)
+    buffer += bits
+
+    # Смещения округляются до миллисекунд от начала тренировки, поэтому ошибки округления не копятся
+    previous = 0
+    for answer in answers:
+        offset = max(round((answer['answered_at'] - started_at) / timedelta(milliseconds=1)), previous)
+        _write_varint(buffer, offset - previous)
+        previous = offset
+
+    for answer in answers:
+        if not answer['is_correct']:
+            text = (answer['user_answer'] or '').encode('utf-8')
+            _write_varint(buffer, len(text))
+            buffer += text
+
+    return bytes(buffer)
+
+
+def decode_answers(payload: bytes, started_at: datetime) -> List[Dict]:
+    """Распаковывает запись в список ответов (user_answer правильных ответов - None)"""
+    if payload[0] != PACK_FORMAT_VERSION:
+        raise ValueError(f"Неизвестная версия упакованных ответов: {payload[0]}")
+
+    count, position = _read_varint(payload, 1)
+    word_ids = []
+    for _ in range(count):
+        word_id, position = _read_varint(payload, position)
+        word_ids.append(word_id)
+
+    bits = payload[position:position + (count + 7) // 8]
+    position += len(bits)
+
+    answers = []
+    offset = 0
+    for index, word_id in enumerate(word_ids):
+        delta, position = _read_varint(payload, position)
+        offset += delta
+        answers.append({
+            'word_id': word_id,
+            'is_correct': bool(bits[index >> 3] & (1 << (index & 7))),
+            'answered_at': started_at + timedelta(milliseconds=offset),
+            'user_answer': None,
+        })
+
+    for answer in answers:
+        if not answer['is_correct']:
+            length, position = _read_varint(payload, position)
+            answer['user_answer'] = payload[position:position + length].decode('utf-8')
+            position += length
+
+    return answers
+
+
+class AnswerPackService:
+    """
+    Компактное хранение ответов: ответы завершенной тренировки сворачиваются
+    из строк training_answers в одну запись training_answer_packs.
+
+    Включается ANSWER_STORAGE=packed: тогда тренировка упаковывается при завершении
+    (в той же транзакции). Пока тренировка идет, ответы пишутся строками журнала
+    ответов как обычно - по ним восстанавливаются прерванные тренировки.
+    """
+
+    def __init__(self, storage: str = ANSWER_STORAGE):
+        self.storage = storage
+
+    @property
+    def enabled(self) -> bool:
+        return self.storage == 'packed'
+
+    async def _started_at(self, session: AsyncSession, session_ids: Sequence[int]) -> Dict[int, datetime]:
+        result = await session.execute(
+            select(TrainingSession.id, TrainingSession.started_at).where(TrainingSession.id.in_(session_ids))
+        )
+        return {session_id: started_at or datetime.min for session_id, started_at in result.all()}
+
+    async def pack_sessions(self, session: AsyncSession, session_ids: Sequence[int]) -> int:
+        """
+        Упаковывает строки ответов тренировок и удаляет их. Если тренировка уже упакована,
+        новые строки дописываются к записи. Коммит остается за вызывающим кодом.
+        Возвращает количество упакованных строк.
+        """
+        session_ids = list(session_ids)
+        rows_result = await session.execute(
+            select(
+                TrainingAnswer.session_id, TrainingAnswer.word_id, TrainingAnswer.is_correct,
+                TrainingAnswer.answered_at, TrainingAnswer.user_answer
+            ).where(TrainingAnswer.session_id.in_(session_ids)).order_by(TrainingAnswer.id)
+        )
+        by_session: Dict[int, List[Dict]] = {}
+        for row in rows_result.all():
+            by_session.setdefault(row.session_id, []).append(dict(row._mapping))
+        if not by_session:
+            return 0
+
+        started = await self._started_at(session, list(by_session))
+        packs_result = await session.execute(
+            select(TrainingAnswerPack).where(TrainingAnswerPack.session_id.in_(list(by_session)))
+        )
+        existing = {pack.session_id: pack.payload for pack in packs_result.scalars().all()}
+
+        packs = []
+        packed_rows = 0
+        for session_id, answers in by_session.items():
+            packed_rows += len(answers)
+            if session_id in existing:
+                answers = decode_answers(existing[session_id], started[session_id]) + answers
+            packs.append({
+                'session_id': session_id,
+                'answers_count': len(answers),
+                'correct_count': sum(1 for answer in answers if answer['is_correct']),
+                'payload': encode_answers(answers, started[session_id]),
+            })
+
+        if existing:
+            await session.execute(delete(TrainingAnswerPack).where(TrainingAnswerPack.session_id.in_(list(existing))))
+        await session.execute(insert(TrainingAnswerPack), packs)
+        await session.execute(delete(TrainingAnswer).where(TrainingAnswer.session_id.in_(list(by_session))))
+        return packed_rows
+
+    async def pack_completed(self, session: AsyncSession,
+                             batch_sessions: int = PACK_SESSIONS_PER_BATCH) -> Tuple[int, int]:
+        """
+        Перевод существующих строк на компактное хранение: упаковывает все завершенные
+        тренировки пачками по id, коммит после каждой пачки (можно прервать и продолжить).
+        Возвращает (упаковано тренировок, упаковано ответов).
+        """
+        packed_sessions = 0
+        packed_rows = 0
+        last_id = 0
+
+        while True:
+            ids_result = await session.execute(
+                select(TrainingSession.id).where(
+                    TrainingSession.id > last_id,
+                    TrainingSession.completed_at.isnot(None),
+                    select(TrainingAnswer.id).where(TrainingAnswer.session_id == TrainingSession.id).exists()
+                ).order_by(TrainingSession.id).limit(batch_sessions)
+            )
+            session_ids = ids_result.scalars().all()
+            if not session_ids:
+                break
+
+            packed_rows += await self.pack_sessions(session, session_ids)
+            await session.commit()
+            packed_sessions += len(session_ids)
+            last_id = session_ids[-1]
+
+        if packed_rows:
+            logger.info(f"Упаковано ответов: {packed_rows} из {packed_sessions} тренировок")
+        return packed_sessions, packed_rows
+
+    async def unpack_all(self, session: AsyncSession, batch_sessions: int = PACK_SESSIONS_PER_BATCH) -> int:
+        """
+        Обратный перевод: разворачивает упакованные тренировки в строки training_answers.
+        Тексты правильных ответов не хранились и восстанавливаются пустыми.
+        Возвращает количество восстановленных строк.
+        """
+        restored = 0
+        while True:
+            packs_result = await session.execute(
+                select(TrainingAnswerPack).order_by(TrainingAnswerPack.session_id).limit(batch_sessions)
+            )
+            packs = packs_result.scalars().all()
+            if not packs:
+                break
+
+            started = await self._started_at(session, [pack.session_id for pack in packs])
+            rows = []
+            for pack in packs:
+                for answer in decode_answers(pack.payload, started[pack.session_id]):
+                    answer['session_id'] = pack.session_id
+                    answer['user_answer'] = answer['user_answer'] or ''
+                    rows.append(answer)
+
+            if rows:
+                await session.execute(insert(TrainingAnswer), rows)
+            await session.execute(
+                delete(TrainingAnswerPack).where(TrainingAnswerPack.session_id.in_([pack.session_id for pack in packs]))
+            )
+            await session.commit()
+            restored += len(rows)
+
+        return restored
+
+    async def get_answers(self, session: AsyncSession, session_id: int) -> List[Dict]:
+        """Ответы тренировки независимо от способа хранения: упакованные, затем строки"""
+        answers = []
+        pack_result = await session.execute(
+            select(TrainingAnswerPack.payload).where(TrainingAnswerPack.session_id == session_id)
+        )
+        payload = pack_result.scalar()
+        if payload is not None:
+            started = await self._started_at(session, [session_id])
+            answers = decode_answers(payload, started[session_id])
+
+        rows_result = await session.execute(
+            select(
+                TrainingAnswer.word_id, TrainingAnswer.is_correct, TrainingAnswer.answered_at, TrainingAnswer.user_answer
+            ).where(TrainingAnswer.session_id == session_id).order_by(TrainingAnswer.id)
+        )
+        answers += [dict(row._mapping) for row in rows_result.all()]
+        return answers
+
+    async def _iter_packs(self, session: AsyncSession, batch_sessions: int = PACK_SESSIONS_PER_BATCH,
+                          session_ids: Optional[Sequence[int]] = None
+                          ) -> AsyncIterator[List[Tuple[int, int, datetime, List[Dict]]]]:
+        """Упакованные тренировки пачками по session_id: (session_id, user_id, started_at, ответы)"""
+        last_session_id = 0
+        while True:
+            packs_query = select(
+                TrainingAnswerPack.session_id, TrainingAnswerPack.payload,
+                TrainingSession.user_id, TrainingSession.started_at
+            ).join(TrainingSession, TrainingSession.id == TrainingAnswerPack.session_id).where(
+                TrainingAnswerPack.session_id > last_session_id
+            ).order_by(TrainingAnswerPack.session_id).limit(batch_sessions)
+            if session_ids is not None:
+                packs_query = packs_query.where(TrainingAnswerPack.session_id.in_(list(session_ids)))
+            packs_result = await session.execute(packs_query)
+            packs = packs_result.all()
+            if not packs:
+                break
+            last_session_id = packs[-1].session_id
+
+            yield [
+                (pack.session_id, pack.user_id, pack.started_at or datetime.min,
+                 decode_answers(pack.payload, pack.started_at or datetime.min))
+                for pack in packs
+            ]
+
+    async def iter_answers(self, session: AsyncSession, batch_sessions: int = PACK_SESSIONS_PER_BATCH,
+                           session_ids: Optional[Sequence[int]] = None) -> AsyncIterator[List[Dict]]:
+        """
+        Упакованные ответы (всех тренировок или только session_ids) пачками тренировок,
+        с теми же ключами, что у строк training_answers, плюс user_id.
+        У упакованных ответов нет своего id (None).
+        """
+        async for packs in self._iter_packs(session, batch_sessions, session_ids):
+            yield [
+                {'id': None, 'session_id': session_id, 'user_id': user_id, **answer}
+                for session_id, user_id, _, answers in packs
+                for answer in answers
+            ]
+
+    async def count_word_answers(self, session: AsyncSession, word_ids: Sequence[int]) -> int:
+        """Сколько упакованных ответов относятся к словам (распаковываются все записи)"""
+        wanted_words = set(word_ids)
+        count = 0
+        async for rows in self.iter_answers(session):
+            count += sum(1 for row in rows if row['word_id'] in wanted_words)
+        return count
+
+    async def remove_words(self, session: AsyncSession, word_ids: Sequence[int]) -> int:
+        """
+        Удаляет из упакованных тренировок ответы на слова: затронутые записи
+        перезаписываются, опустевшие удаляются. Коммит остается за вызывающим кодом.
+        Возвращает количество удаленных ответов.
+        """
+        wanted_words = set(word_ids)
+        removed = 0
+        async for packs in self._iter_packs(session):
+            for session_id, _, started_at, answers in packs:
+                kept = [answer for answer in answers if answer['word_id'] not in wanted_words]
+                if len(kept) == len(answers):
+                    continue
+
+                removed += len(answers) - len(kept)
+                if kept:
+                    await session.execute(update(TrainingAnswerPack).where(
+                        TrainingAnswerPack.session_id == session_id
+                    ).values(
+                        answers_count=len(kept),
+                        correct_count=sum(1 for answer in kept if answer['is_correct']),
+                        payload=encode_answers(kept, started_at)
+                    ))
+                else:
+                    await session.execute(delete(TrainingAnswerPack).where(TrainingAnswerPack.session_id == session_id))
+        return removed
+
+    async def get_stats(self, session: AsyncSession) -> Dict[str, int]:
+        """Упакованных тренировок, ответов в них и байт в записях"""
+        result = await session.execute(select(
+            func.count(TrainingAnswerPack.session_id),
+            func.coalesce(func.sum(TrainingAnswerPack.answers_count), 0),
+            func.coalesce(func.sum(func.length(TrainingAnswerPack.payload)), 0)
+        ))
+        sessions, answers, size = result.one()
+        return {'sessions': sessions, 'answers': answers, 'bytes': size}
+
+
+# Создаем глобальный экземпляр сервиса
+answer_pack_service = AnswerPackService()
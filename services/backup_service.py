@@ -0,0 +1,194 @@
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.engine import make_url
+
+from config import DATABASE_URL, BACKUP_DIR, BACKUP_KEEP
+
+logger = logging.getLogger(__name__)
+
+# Страниц базы, копируемых за один шаг резервного копирования (между шагами база не заблокирована)
+BACKUP_PAGES_PER_STEP = 1024
+
+# Пауза между шагами, с: в это время бот успевает записать свои изменения
+BACKUP_STEP_SLEEP = 0.005
+
+SNAPSHOT_SUFFIX = ".db.gz"
+
+
+def sqlite_path(database_url: str = DATABASE_URL) -> Optional[str]:
+    """Путь к файлу SQLite из DATABASE_URL (None - база не SQLite или в памяти)"""
+    url = make_url(database_url)
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return None
+    return os.path.abspath(url.database)
+
+
+def integrity_check(path: str) -> List[str]:
+    """PRAGMA integrity_check файла базы: пустой список - база цела"""
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        problems = [row[0] for row in connection.execute("PRAGMA integrity_check")]
+    finally:
+        connection.close()
+    return [] if problems == ['ok'] else problems
+
+
+@dataclass
+class BackupResult:
+    path: str
+    database_bytes: int
+    snapshot_bytes: int
+    pages: int
+    seconds: float
+
+
+class BackupService:
+    """
+    Горячее резервное копирование SQLite без остановки бота.
+
+    Копия снимается через online backup API SQLite шагами по BACKUP_PAGES_PER_STEP
+    страниц в отдельном потоке: между шагами база доступна боту на запись,
+    а цикл событий не блокируется. В отличие от копирования файла, снимок всегда
+    согласован (изменения, сделанные во время копирования, перезапускают копирование).
+    Снимок проверяется PRAGMA integrity_check, сжимается gzip и сохраняется
+    с отметкой времени, старые снимки сверх BACKUP_KEEP удаляются.
+    """
+
+    def __init__(self, backup_dir: str = BACKUP_DIR, keep: int = BACKUP_KEEP):
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def available(self) -> bool:
+        return sqlite_path() is not None
+
+    def list_snapshots(self) -> List[str]:
+        """Снимки в каталоге резервных копий, от новых к старым"""
+        source = sqlite_path()
+        if source is None or not os.path.isdir(self.backup_dir):
+            return []
+        prefix = os.path.splitext(os.path.basename(source))[0] + "-"
+        names = [
+            name for name in os.listdir(self.backup_dir)
+            if name.startswith(prefix) and name.endswith(SNAPSHOT_SUFFIX)
+        ]
+        # Отметка времени в имени сортируется как строка
+        return [os.path.join(self.backup_dir, name) for name in sorted(names, reverse=True)]
+
+    def _create(self) -> BackupResult:
+        source_path = sqlite_path()
+        if source_path is None:
+            raise RuntimeError("Резервное копирование поддерживается только для SQLite")
+
+        started = time.perf_counter()
+        os.makedirs(self.backup_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        snapshot_path = os.path.join(self.backup_dir, f"{stem}-{datetime.utcnow():%Y%m%d-%H%M%S}{SNAPSHOT_SUFFIX}")
+
+        fd, copy_path = tempfile.mkstemp(suffix=".db", dir=self.backup_dir)
+        os.close(fd)
+        try:
+            source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+            target = sqlite3.connect(copy_path)
+            try:
+                source.backup(target, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP)
+                pages = target.execute("PRAGMA page_count").fetchone()[0]
+            finally:
+                target.close()
+                source.close()
+
+            problems = integrity_check(copy_path)
+            if problems:
+                raise RuntimeError(f"Снимок базы поврежден: {'; '.join(problems[:5])}")
+
+            # Сначала пишем во временный файл: оборванная запись не оставит битый снимок
+            partial_path = snapshot_path + ".partial"
+            with open(copy_path, 'rb') as raw, gzip.open(partial_path, 'wb', compresslevel=6) as packed:
+                shutil.copyfileobj(raw, packed, 1024 * 1024)
+            os.replace(partial_path, snapshot_path)
+
+            database_bytes = os.path.getsize(copy_path)
+        finally:
+            os.remove(copy_path)
+
+        for old_snapshot in self.list_snapshots()[self.keep:]:
+            os.remove(old_snapshot)
+
+        return BackupResult(
+            path=snapshot_path,
+            database_bytes=database_bytes,
+            snapshot_bytes=os.path.getsize(snapshot_path),
+            pages=pages,
+            seconds=time.perf_counter() - started,
+        )
+
+    async def create_backup(self) -> BackupResult:
+        """Снимает, проверяет и сжимает резервную копию базы (не блокируя цикл событий)"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            result = await asyncio.to_thread(self._create)
+
+        logger.info(
+            f"Резервная копия базы: {result.path} ({result.database_bytes / 1048576:.1f} МБ -> "
+            f"{result.snapshot_bytes / 1048576:.1f} МБ, {result.seconds:.1f} с)"
+        )
+        return result
+
+    def _unpack(self, snapshot_path: str, directory: str) -> str:
+        fd, unpacked_path = tempfile.mkstemp(suffix=".db", dir=directory)
+        with os.fdopen(fd, 'wb') as raw, gzip.open(snapshot_path, 'rb') as packed:
+            shutil.copyfileobj(packed, raw, 1024 * 1024)
+        return unpacked_path
+
+    def verify(self, snapshot_path: str) -> List[str]:
+        """Распаковывает снимок во временный файл и проверяет его целостность"""
+        unpacked_path = self._unpack(snapshot_path, tempfile.gettempdir())
+        try:
+            return integrity_check(unpacked_path)
+        finally:
+            os.remove(unpacked_path)
+
+    def restore(self, snapshot_path: str, target_path: Optional[str] = None) -> int:
+        """
+        Восстанавливает базу из снимка (по умолчанию - базу из DATABASE_URL).
+        Снимок проверяется до восстановления, страницы переносятся backup API
+        под блокировкой базы-назначения, поэтому файл не остается наполовину записанным.
+        Бот на время восстановления нужно остановить. Возвращает количество страниц.
+        """
+        target_path = target_path or sqlite_path()
+        if target_path is None:
+            raise RuntimeError("Восстановление поддерживается только для SQLite")
+
+        unpacked_path = self._unpack(snapshot_path, os.path.dirname(os.path.abspath(target_path)))
+        try:
+            problems = integrity_check(unpacked_path)
+            if problems:
+                raise RuntimeError(f"Снимок поврежден, восстановление отменено: {'; '.join(problems[:5])}")
+
+            source = sqlite3.connect(unpacked_path)
+            target = sqlite3.connect(target_path)
+            try:
+                source.backup(target)
+                return target.execute("PRAGMA page_count").fetchone()[0]
+            finally:
+                target.close()
+                source.close()
+        finally:
+            os.remove(unpacked_path)
+
+
+# Создаем глобальный экземпляр сервиса
+backup_service = BackupService()
@@ -0,0 +1,357 @@
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import select, delete, update, exists, func, case, and_, or_, Integer, cast
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.database import async_session
+from database.models import User, Word, UserWord, TrainingSession, TrainingAnswer
+from services.level_table import level_table
+
+logger = logging.getLogger(__name__)
+
+# Ширина диапазона id, который проверяется одним запросом
+CONSISTENCY_CHUNK_SIZE = 10000
+
+# Сколько диапазонов проверяется одновременно (каждый в своем соединении)
+CONSISTENCY_WORKERS = 4
+
+
+@dataclass
+class Finding:
+    """Найденное нарушение: проверка, id строки (или пользователя) и описание"""
+    check: str
+    key: int
+    details: str
+
+
+@dataclass
+class ConsistencyCheck:
+    """
+    Проверка целостности по диапазонам id_column.
+    find(session, от id, до id) возвращает нарушения в диапазоне [от, до),
+    repair(session, от id, до id) исправляет их одним-двумя запросами и возвращает число строк.
+    """
+    name: str
+    description: str
+    id_column: object
+    find: Callable[[AsyncSession, int, int], Awaitable[List[Finding]]]
+    repair: Callable[[AsyncSession, int, int], Awaitable[int]]
+
+
+@dataclass
+class ConsistencyReport:
+    """Итоги проверки по каждой проверке"""
+    chunks: int = 0
+    found: Counter = field(default_factory=Counter)
+    repaired: Counter = field(default_factory=Counter)
+
+
+def _in_range(column, start: int, end: int):
+    return and_(column >= start, column < end)
+
+
+# user_words, ссылающиеся на удаленного пользователя или слово
+
+def _orphan_user_word():
+    return or_(
+        ~exists().where(User.id == UserWord.user_id),
+        ~exists().where(Word.id == UserWord.word_id)
+    )
+
+
+async def _find_orphan_user_words(session: AsyncSession, start: int, end: int) -> List[Finding]:
+    result = await session.execute(
+        select(UserWord.id, UserWord.user_id, UserWord.word_id).where(
+            _in_range(UserWord.id, start, end), _orphan_user_word()
+        )
+    )
+    return [
+        Finding('orphan_user_words', row_id, f"user_id={user_id}, word_id={word_id}")
+        for row_id, user_id, word_id in result.all()
+    ]
+
+
+async def _repair_orphan_user_words(session: AsyncSession, start: int, end: int) -> int:
+    result = await session.execute(
+        delete(UserWord).where(_in_range(UserWord.id, start, end), _orphan_user_word()),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount
+
+
+# training_answers, ссылающиеся на удаленную тренировку или слово
+
+def _orphan_answer():
+    return or_(
+        ~exists().where(TrainingSession.id == TrainingAnswer.session_id),
+        ~exists().where(Word.id == TrainingAnswer.word_id)
+    )
+
+
+async def _find_orphan_answers(session: AsyncSession, start: int, end: int) -> List[Finding]:
+    result = await session.execute(
+        select(TrainingAnswer.id, TrainingAnswer.session_id, TrainingAnswer.word_id).where(
+            _in_range(TrainingAnswer.id, start, end), _orphan_answer()
+        )
+    )
+    return [
+        Finding('orphan_training_answers', row_id, f"session_id={session_id}, word_id={word_id}")
+        for row_id, session_id, word_id in result.all()
+    ]
+
+
+async def _repair_orphan_answers(session: AsyncSession, start: int, end: int) -> int:
+    result = await session.execute(
+        delete(TrainingAnswer).where(_in_range(TrainingAnswer.id, start, end), _orphan_answer()),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount
+
+
+# Повторяющиеся пары (user_id, word_id) в личном словаре (проверяются по диапазонам user_id)
+
+async def _find_duplicate_user_words(session: AsyncSession, start: int, end: int) -> List[Finding]:
+    result = await session.execute(
+        select(UserWord.user_id, UserWord.word_id, func.count(UserWord.id)).where(
+            _in_range(UserWord.user_id, start, end)
+        ).group_by(UserWord.user_id, UserWord.word_id).having(func.count(UserWord.id) > 1)
+    )
+    return [
+        Finding('duplicate_user_words', user_id, f"word_id={word_id}: {copies} записей")
+        for user_id, word_id, copies in result.all()
+    ]
+
+
+async def _repair_duplicate_user_words(session: AsyncSession, start: int, end: int) -> int:
+    # Остается самая ранняя запись пары, остальные удаляются
+    first_ids = select(func.min(UserWord.id)).where(
+        _in_range(UserWord.user_id, start, end)
+    ).group_by(UserWord.user_id, UserWord.word_id)
+    result = await session.execute(
+        delete(UserWord).where(_in_range(UserWord.user_id, start, end), UserWord.id.not_in(first_ids)),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount
+
+
+# Завершенные тренировки, счетчики которых не совпадают с журналом ответов.
+# Тренировки без единого ответа (до появления журнала) не проверяются: сверять не с чем.
+
+def _answers_count():
+    return select(func.count(TrainingAnswer.id)).where(
+        TrainingAnswer.session_id == TrainingSession.id
+    ).scalar_subquery()
+
+
+def _answers_correct():
+    return select(func.coalesce(func.sum(cast(TrainingAnswer.is_correct, Integer)), 0)).where(
+        TrainingAnswer.session_id == TrainingSession.id
+    ).scalar_subquery()
+
+
+def _session_mismatch(answers_count, answers_correct):
+    return and_(
+        TrainingSession.completed_at.isnot(None),
+        answers_count > 0,
+        or_(
+            func.coalesce(TrainingSession.words_total, -1) != answers_count,
+            func.coalesce(TrainingSession.words_correct, -1) != answers_correct
+        )
+    )
+
+
+async def _find_session_totals(session: AsyncSession, start: int, end: int) -> List[Finding]:
+    answers = select(
+        TrainingAnswer.session_id,
+        func.count(TrainingAnswer.id).label('answers_count'),
+        func.sum(cast(TrainingAnswer.is_correct, Integer)).label('answers_correct')
+    ).where(_in_range(TrainingAnswer.session_id, start, end)).group_by(TrainingAnswer.session_id).subquery()
+
+    result = await session.execute(
+        select(
+            TrainingSession.id, TrainingSession.words_total, TrainingSession.words_correct,
+            answers.c.answers_count, answers.c.answers_correct
+        ).join(answers, answers.c.session_id == TrainingSession.id).where(
+            _in_range(TrainingSession.id, start, end),
+            _session_mismatch(answers.c.answers_count, answers.c.answers_correct)
+        )
+    )
+    return [
+        Finding(
+            'session_totals', session_id,
+            f"words_total={words_total}, words_correct={words_correct}, "
+            f"в журнале ответов {answers_count}, правильных {answers_correct}"
+        )
+        for session_id, words_total, words_correct, answers_count, answers_correct in result.all()
+    ]
+
+
+async def _repair_session_totals(session: AsyncSession, start: int, end: int) -> int:
+    answers_count = _answers_count()
+    answers_correct = _answers_correct()
+    result = await session.execute(
+        update(TrainingSession).where(
+            _in_range(TrainingSession.id, start, end),
+            _session_mismatch(answers_count, answers_correct)
+        ).values(
+            words_total=answers_count,
+            words_correct=answers_correct,
+            words_incorrect=answers_count - answers_correct
+        ),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount
+
+
+# Пользователи, уровень которых не соответствует опыту по таблице уровней.
+# Уровень считается в SQL выражением CASE по порогам, поэтому исправление - один UPDATE.
+
+def _expected_level():
+    experience = func.coalesce(User.experience_points, 0)
+    return case(
+        *[(experience >= threshold, level)
+          for level, threshold in reversed(list(enumerate(level_table.thresholds, 1))) if level > 1],
+        else_=1
+    )
+
+
+def _level_mismatch():
+    return func.coalesce(User.level, 0) != _expected_level()
+
+
+async def _find_user_levels(session: AsyncSession, start: int, end: int) -> List[Finding]:
+    result = await session.execute(
+        select(User.id, User.experience_points, User.level, _expected_level()).where(
+            _in_range(User.id, start, end), _level_mismatch()
+        )
+    )
+    return [
+        Finding('user_levels', user_id, f"опыт {experience}, уровень {level}, должен быть {expected}")
+        for user_id, experience, level, expected in result.all()
+    ]
+
+
+async def _repair_user_levels(session: AsyncSession, start: int, end: int) -> int:
+    result = await session.execute(
+        update(User).where(_in_range(User.id, start, end), _level_mismatch()).values(level=_expected_level()),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount
+
+
+CHECKS: Dict[str, ConsistencyCheck] = {
+    check.name: check for check in (
+        ConsistencyCheck('orphan_user_words', "Словарь: записи без пользователя или слова",
+                         UserWord.id, _find_orphan_user_words, _repair_orphan_user_words),
+        ConsistencyCheck('orphan_training_answers', "Ответы без тренировки или слова",
+                         TrainingAnswer.id, _find_orphan_answers, _repair_orphan_answers),
+        ConsistencyCheck('duplicate_user_words', "Словарь: повторяющиеся пары пользователь-слово",
+                         UserWord.user_id, _find_duplicate_user_words, _repair_duplicate_user_words),
+        ConsistencyCheck('session_totals', "Тренировки: счетчики не совпадают с ответами",
+                         TrainingSession.id, _find_session_totals, _repair_session_totals),
+        ConsistencyCheck('user_levels', "Пользователи: уровень не соответствует опыту",
+                         User.id, _find_user_levels, _repair_user_levels),
+    )
+}
+
+
+class ConsistencyService:
+    """
+    Проверка целостности данных. Таблица каждой проверки делится на диапазоны id
+    шириной chunk_size, диапазоны проверяются параллельно в workers соединениях,
+    найденные нарушения отдаются по мере проверки диапазонов.
+
+    При repair=True диапазоны с нарушениями исправляются set-based запросами
+    после проверки, по одному и каждый в своей транзакции: SQLite допускает
+    одного писателя, а параллельные чтения задерживали бы его коммиты.
+    Запросы исправления заново отбирают нарушения, поэтому изменения,
+    сделанные между проверкой и исправлением, не портятся.
+    """
+
+    async def _ranges(self, check: ConsistencyCheck, chunk_size: int) -> List[tuple]:
+        async with async_session() as session:
+            result = await session.execute(select(func.min(check.id_column), func.max(check.id_column)))
+            low, high = result.one()
+        if low is None:
+            return []
+        return [(start, start + chunk_size) for start in range(low, high + 1, chunk_size)]
+
+    async def check(self, names: Optional[Sequence[str]] = None, repair: bool = False,
+                    chunk_size: int = CONSISTENCY_CHUNK_SIZE, workers: int = CONSISTENCY_WORKERS,
+                    report: Optional[ConsistencyReport] = None) -> AsyncIterator[Finding]:
+        """
+        Выполняет проверки names (по умолчанию все) и отдает найденные нарушения.
+        Итоги (количество диапазонов, нарушений и исправленных строк) пишутся в report.
+        """
+        checks = [CHECKS[name] for name in (names or CHECKS)]
+        report = report if report is not None else ConsistencyReport()
+
+        # Очередь диапазонов ограничена, чтобы не держать в памяти задания для всей таблицы
+        tasks: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        findings: asyncio.Queue = asyncio.Queue()
+        to_repair: List[tuple] = []
+
+        async def produce():
+            for check in checks:
+                for start, end in await self._ranges(check, chunk_size):
+                    await tasks.put((check, start, end))
+            for _ in range(workers):
+                await tasks.put(None)
+
+        async def work():
+            while True:
+                task = await tasks.get()
+                if task is None:
+                    break
+                check, start, end = task
+
+                async with async_session() as session:
+                    found = await check.find(session, start, end)
+                report.chunks += 1
+                report.found[check.name] += len(found)
+
+                if found and repair:
+                    to_repair.append(task)
+
+                for finding in found:
+                    findings.put_nowait(finding)
+
+        async def run():
+            jobs = [asyncio.create_task(produce())] + [asyncio.create_task(work()) for _ in range(workers)]
+            try:
+                await asyncio.gather(*jobs)
+                for check, start, end in to_repair:
+                    async with async_session() as session:
+                        report.repaired[check.name] += await check.repair(session, start, end)
+                        await session.commit()
+            finally:
+                for job in jobs:
+                    job.cancel()
+                findings.put_nowait(None)
+
+        runner = asyncio.create_task(run())
+        try:
+            while True:
+                finding = await findings.get()
+                if finding is None:
+                    break
+                yield finding
+        finally:
+            # Читатель мог прекратить чтение раньше времени - тогда проверка отменяется
+            runner.cancel()
+            await asyncio.wait([runner])
+
+        # Ошибка проверки не должна потеряться
+        if not runner.cancelled() and runner.exception() is not None:
+            raise runner.exception()
+
+        if report.repaired:
+            logger.info(f"Исправлено нарушений целостности: {dict(report.repaired)}")
+
+
+# Создаем глобальный экземпляр сервиса
+consistency_service = ConsistencyService()
@@ -0,0 +1,106 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.database import dialect_insert
+from database.models import UserDailyStats
+
+
+class DailyStatsService:
+    """Сервис для работы с дневной сводкой статистики (таблица user_daily_stats)"""
+
+    @staticmethod
+    def _upsert_statement(session: AsyncSession):
+        """INSERT ... ON CONFLICT (user_id, day) DO UPDATE, прибавляющий значения к строке дня"""
+        insert = dialect_insert(session)
+        statement = insert(UserDailyStats)
+        return statement.on_conflict_do_update(
+            index_elements=[UserDailyStats.user_id, UserDailyStats.day],
+            set_={
+                'sessions_count': UserDailyStats.sessions_count + statement.excluded.sessions_count,
+                'words_trained': UserDailyStats.words_trained + statement.excluded.words_trained,
+                'words_correct': UserDailyStats.words_correct + statement.excluded.words_correct,
+                'words_learned': UserDailyStats.words_learned + statement.excluded.words_learned,
+                'experience_gained': UserDailyStats.experience_gained + statement.excluded.experience_gained,
+            }
+        )
+
+    async def record_training(self, session: AsyncSession, user_id: int, words_trained: int,
+                              words_correct: int, words_learned: int, day: Optional[date] = None):
+        """
+        Прибавляет результаты завершенной тренировки к строке пользователя за день.
+        Коммит остается за вызывающим кодом.
+        """
+        if day is None:
+            day = datetime.utcnow().date()
+
+        await self.record_days(session, [{
+            'user_id': user_id,
+            'day': day,
+            'sessions_count': 1,
+            'words_trained': words_trained,
+            'words_correct': words_correct,
+            'words_learned': words_learned,
+            'experience_gained': 0
+        }])
+
+    async def record_experience(self, session: AsyncSession, user_id: int, experience: int,
+                                day: Optional[date] = None):
+        """
+        Прибавляет полученный опыт к строке пользователя за день.
+        Коммит остается за вызывающим кодом.
+        """
+        if day is None:
+            day = datetime.utcnow().date()
+
+        await self.record_days(session, [{
+            'user_id': user_id,
+            'day': day,
+            'sessions_count': 0,
+            'words_trained': 0,
+            'words_correct': 0,
+            'words_learned': 0,
+            'experience_gained': experience
+        }])
+
+    async def record_days(self, session: AsyncSession, rows: List[Dict]):
+        """
+        Прибавляет пачку строк (user_id, day, sessions_count, words_trained,
+        words_correct, words_learned, experience_gained) к дневной сводке одним запросом.
+        Коммит остается за вызывающим кодом.
+        """
+        if not rows:
+            return
+        await session.execute(self._upsert_statement(session), rows)
+
+    async def get_period_totals(self, session: AsyncSession, user_id: int,
+                                since: Optional[date] = None) -> Dict[str, int]:
+        """
+        Суммирует дневную сводку пользователя начиная с даты since (None = за все время)
+        Возвращает словарь с ключами sessions_count, words_trained, words_correct, words_learned
+        """
+        query = select(
+            func.sum(UserDailyStats.sessions_count),
+            func.sum(UserDailyStats.words_trained),
+            func.sum(UserDailyStats.words_correct),
+            func.sum(UserDailyStats.words_learned)
+        ).where(UserDailyStats.user_id == user_id)
+
+        if since is not None:
+            query = query.where(UserDailyStats.day >= since)
+
+        result = await session.execute(query)
+        sessions_count, words_trained, words_correct, words_learned = result.one()
+
+        return {
+            'sessions_count': sessions_count or 0,
+            'words_trained': words_trained or 0,
+            'words_correct': words_correct or 0,
+            'words_learned': words_learned or 0
+        }
+
+
+# Создаем глобальный экземпляр сервиса
+daily_stats_service = DailyStatsService()
@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import UserWord, Word
+
+# Слов на одной странице личного словаря
+DICTIONARY_PAGE_SIZE = 20
+
+# Фильтры по статусу слова
+DICTIONARY_STATUSES = {
+    'all': "Все",
+    'due': "К повторению",
+    'scheduled': "Запланированы",
+    'learned': "Выучены",
+}
+
+
+@dataclass
+class DictionaryPage:
+    """Страница личного словаря"""
+    entries: List[Tuple[UserWord, Word]]
+    has_prev: bool
+    has_next: bool
+
+    @property
+    def first_id(self) -> Optional[int]:
+        return self.entries[0][0].id if self.entries else None
+
+    @property
+    def last_id(self) -> Optional[int]:
+        return self.entries[-1][0].id if self.entries else None
+
+
+class DictionaryService:
+    """
+    Постраничный просмотр личного словаря.
+    Страницы выбираются по ключу (next_repetition, id) без OFFSET, поэтому
+    стоимость листания не зависит от размера словаря. Курсор - id записи user_words.
+    """
+
+    @staticmethod
+    def _filters(user_id: int, status: str, morpheme_type: Optional[str], now: datetime) -> list:
+        if status not in DICTIONARY_STATUSES:
+            raise ValueError(f"Неизвестный фильтр словаря: {status}")
+
+        conditions = [UserWord.user_id == user_id]
+        if status == 'due':
+            conditions += [UserWord.is_learned == False, UserWord.next_repetition <= now]
+        elif status == 'scheduled':
+            conditions += [UserWord.is_learned == False, UserWord.next_repetition > now]
+        elif status == 'learned':
+            conditions.append(UserWord.is_learned == True)
+
+        if morpheme_type:
+            conditions.append(Word.morpheme_type == morpheme_type)
+        return conditions
+
+    async def get_page(self, session: AsyncSession, user_id: int, status: str = 'all',
+                       morpheme_type: Optional[str] = None, after_id: Optional[int] = None,
+                       before_id: Optional[int] = None, page_size: int = DICTIONARY_PAGE_SIZE,
+                       now: Optional[datetime] = None) -> DictionaryPage:
+        """
+        Возвращает страницу словаря после записи after_id (следующая страница)
+        или перед записью before_id (предыдущая страница). Без курсора - первая страница.
+        """
+        if now is None:
+            now = datetime.utcnow()
+
+        query = select(UserWord, Word).join(Word).where(*self._filters(user_id, status, morpheme_type, now))
+
+        cursor_id = after_id if after_id is not None else before_id
+        backwards = after_id is None and before_id is not None
+
+        if cursor_id is not None:
+            cursor_time = select(UserWord.next_repetition).where(UserWord.id == cursor_id).scalar_subquery()
+            if backwards:
+                query = query.where(or_(
+                    UserWord.next_repetition < cursor_time,
+                    and_(UserWord.next_repetition == cursor_time, UserWord.id < cursor_id)
+                )).order_by(UserWord.next_repetition.desc(), UserWord.id.desc())
+            else:
+                query = query.where(or_(
+                    UserWord.next_repetition > cursor_time,
+                    and_(UserWord.next_repetition == cursor_time, UserWord.id > cursor_id)
+                )).order_by(UserWord.next_repetition, UserWord.id)
+        else:
+            query = query.order_by(UserWord.next_repetition, UserWord.id)
+
+        # Лишняя запись показывает, есть ли еще страница в направлении листания
+        result = await session.execute(query.limit(page_size + 1))
+        entries = [tuple(row) for row in result.all()]
+        has_more = len(entries) > page_size
+        entries = entries[:page_size]
+
+        if backwards:
+            entries.reverse()
+            return DictionaryPage(entries=entries, has_prev=has_more, has_next=True)
+
+        return DictionaryPage(entries=entries, has_prev=cursor_id is not None, has_next=has_more)
+
+    async def count_words(self, session: AsyncSession, user_id: int, status: str = 'all',
+                          morpheme_type: Optional[str] = None, now: Optional[datetime] = None) -> int:
+        """Количество слов словаря с учетом фильтров (отдельный COUNT без загрузки записей)"""
+        if now is None:
+            now = datetime.utcnow()
+
+        query = select(func.count(UserWord.id)).select_from(UserWord)
+        if morpheme_type:
+            query = query.join(Word)
+        query = query.where(*self._filters(user_id, status, morpheme_type, now))
+
+        result = await session.execute(query)
+        return result.scalar() or 0
+
+
+# Создаем глобальный экземпляр сервиса
+dictionary_service = DictionaryService()
@@ -0,0 +1,217 @@
+import csv
+import gzip
+import importlib.util
+import json
+from datetime import date, datetime
+from typing import AsyncIterator, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Word, UserWord, TrainingSession, TrainingAnswer
+from services.answer_archive_service import answer_archive_service
+from services.answer_pack_service import answer_pack_service
+
+# Сколько строк читать из базы и записывать в файл за один раз
+EXPORT_CHUNK_SIZE = 10000
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+# Сколько тренировок запрашивать за раз, подставляя тип тренировки к упакованным и архивным ответам
+SESSION_TYPES_CHUNK_SIZE = 500
+
+# Выгружаемые таблицы: запрос с порядком по id
+EXPORT_QUERIES = {
+    'words': lambda: select(*Word.__table__.columns).order_by(Word.id),
+    'user_words': lambda: select(*UserWord.__table__.columns).order_by(UserWord.id),
+    # К ответам добавляем владельца тренировки, чтобы выгрузка была самодостаточной.
+    # Упакованные ответы и ответы из архива дописываются после строк таблицы (export_table)
+    'training_answers': lambda: select(
+        *TrainingAnswer.__table__.columns,
+        TrainingSession.user_id,
+        TrainingSession.session_type
+    ).join(TrainingSession, TrainingSession.id == TrainingAnswer.session_id).order_by(TrainingAnswer.id),
+}
+
+
+def parquet_available() -> bool:
+    """
+    Установлен ли pyarrow для выгрузки в Parquet (необязательная возможность).
+    Сам pyarrow импортируется только при выгрузке: его импорт заметно удлиняет запуск бота
+    """
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def available_formats() -> List[str]:
+    """Форматы выгрузки, доступные в текущем окружении"""
+    return [file_format for file_format in EXPORT_FORMATS if file_format != 'parquet' or parquet_available()]
+
+
+def _arrow_type(column_type):
+    """Тип pyarrow для типа столбца SQLAlchemy (по типу значений Python)"""
+    import pyarrow
+
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        return pyarrow.string()
+    if issubclass(python_type, bool):
+        return pyarrow.bool_()
+    if issubclass(python_type, int):
+        return pyarrow.int64()
+    if issubclass(python_type, float):
+        return pyarrow.float64()
+    if issubclass(python_type, datetime):
+        return pyarrow.timestamp('us')
+    if issubclass(python_type, date):
+        return pyarrow.date32()
+    if issubclass(python_type, bytes):
+        return pyarrow.binary()
+    return pyarrow.string()
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class _CsvWriter:
+    def __init__(self, path: str, columns: List[str], column_types: Sequence, compress: bool):
+        self._file = gzip.open(path, 'wt', encoding='utf-8', newline='') if compress \
+            else open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write_chunk(self, rows: Sequence[Sequence]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _JsonlWriter:
+    def __init__(self, path: str, columns: List[str], column_types: Sequence, compress: bool):
+        self._file = gzip.open(path, 'wt', encoding='utf-8') if compress else open(path, 'w', encoding='utf-8')
+        self._columns = columns
+
+    def write_chunk(self, rows: Sequence[Sequence]):
+        self._file.writelines(
+            json.dumps({column: _json_value(value) for column, value in zip(self._columns, row)},
+                       ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    """
+    Каждая порция строк записывается отдельной группой строк (row group).
+    Схема строится заранее из типов столбцов: по первой порции ее не угадать,
+    если в ней столбец целиком пустой (NULL).
+    """
+
+    def __init__(self, path: str, columns: List[str], column_types: Sequence, compress: bool):
+        import pyarrow
+        import pyarrow.parquet as pyarrow_parquet
+
+        self._schema = pyarrow.schema([
+            (column, _arrow_type(column_type)) for column, column_type in zip(columns, column_types)
+        ])
+        self._writer = pyarrow_parquet.ParquetWriter(path, self._schema, compression='zstd')
+
+    def write_chunk(self, rows: Sequence[Sequence]):
+        import pyarrow
+
+        columns = zip(*rows)
+        self._writer.write_table(pyarrow.table(
+            {field.name: list(values) for field, values in zip(self._schema, columns)}, schema=self._schema
+        ))
+
+    def close(self):
+        self._writer.close()
+
+
+_WRITERS = {
+    'csv': _CsvWriter,
+    'jsonl': _JsonlWriter,
+    'parquet': _ParquetWriter,
+}
+
+
+class ExportService:
+    """
+    Выгрузка таблиц в файлы. Строки читаются серверным курсором порциями
+    по chunk_size и сразу пишутся в файл, таблица целиком в памяти не держится.
+    """
+
+    @staticmethod
+    def file_name(table: str, file_format: str, compress: bool = False) -> str:
+        """Имя файла выгрузки, например words_20240101_1200.csv.gz"""
+        name = f"{table}_{datetime.utcnow().strftime('%Y%m%d_%H%M')}.{file_format}"
+        if compress and file_format != 'parquet':
+            name += ".gz"
+        return name
+
+    async def _stored_answers(self, session: AsyncSession, columns: List[str]) -> AsyncIterator[List[tuple]]:
+        """Упакованные ответы, затем ответы из архива - порциями, в столбцах выгрузки training_answers"""
+        sources = (answer_pack_service.iter_answers(session), answer_archive_service.iter_rows(session))
+        for source in sources:
+            async for answers in source:
+                session_ids = sorted({answer['session_id'] for answer in answers})
+                session_types = {}
+                for start in range(0, len(session_ids), SESSION_TYPES_CHUNK_SIZE):
+                    types_result = await session.execute(
+                        select(TrainingSession.id, TrainingSession.session_type).where(
+                            TrainingSession.id.in_(session_ids[start:start + SESSION_TYPES_CHUNK_SIZE])
+                        )
+                    )
+                    session_types.update(types_result.all())
+
+                for answer in answers:
+                    answer['session_type'] = session_types.get(answer['session_id'])
+                yield [tuple(answer[column] for column in columns) for answer in answers]
+
+    async def export_table(self, session: AsyncSession, table: str, path: str, file_format: str = 'csv',
+                           compress: bool = False, chunk_size: int = EXPORT_CHUNK_SIZE) -> int:
+        """
+        Выгружает таблицу в файл path и возвращает количество строк.
+        training_answers выгружается со всеми ответами: строки таблицы, затем упакованные
+        тренировки (у их ответов нет id) и ответы из архива.
+        compress - gzip для CSV и JSONL (Parquet сжимается сам)
+        """
+        if table not in EXPORT_QUERIES:
+            raise ValueError(f"Неизвестная таблица для выгрузки: {table}")
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Неподдерживаемый формат выгрузки: {file_format}")
+        if file_format == 'parquet' and not parquet_available():
+            raise ValueError("Для выгрузки в Parquet установите pyarrow")
+
+        query = EXPORT_QUERIES[table]().execution_options(stream_results=True, yield_per=chunk_size)
+
+        rows_total = 0
+        result = await session.stream(query)
+        columns = list(result.keys())
+        column_types = [column.type for column in query.selected_columns]
+        writer = _WRITERS[file_format](path, columns, column_types, compress)
+        try:
+            async for rows in result.partitions(chunk_size):
+                writer.write_chunk(rows)
+                rows_total += len(rows)
+            await result.close()
+
+            if table == 'training_answers':
+                async for rows in self._stored_answers(session, columns):
+                    writer.write_chunk(rows)
+                    rows_total += len(rows)
+        finally:
+            writer.close()
+            await result.close()
+
+        return rows_total
+
+
+# Создаем глобальный экземпляр сервиса
+export_service = ExportService()
@@ -0,0 +1,205 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import UserWord, UserDailyStats
+from services.repetition_scheduler import repetition_scheduler
+
+MINUTES_PER_HOUR = 60
+HOURS_PER_DAY = 24
+
+# Сколько строк user_words читать из базы за один раз
+LOAD_CHUNK_SIZE = 50000
+
+# Сглаживание точности пользователя к общей точности (число "виртуальных" ответов)
+ACCURACY_PRIOR_WEIGHT = 10
+
+# Точность по умолчанию, если истории ответов нет совсем
+DEFAULT_ACCURACY = 0.8
+
+# Предохранитель от бесконечной симуляции
+MAX_SIMULATION_STEPS = 10000
+
+
+@dataclass
+class ReviewState:
+    """Состояние невыученных слов всех пользователей в виде столбцов"""
+    user_id: np.ndarray
+    due: np.ndarray  # минуты от момента прогноза до следующего повторения
+    last_reviewed: np.ndarray  # минуты от последнего повторения до момента прогноза
+    interval_index: np.ndarray
+    stability: np.ndarray
+    difficulty: np.ndarray
+    correct_answers: np.ndarray
+
+
+@dataclass
+class ForecastResult:
+    """Результат прогноза нагрузки"""
+    start: datetime
+    days: int
+    hourly: np.ndarray  # количество повторений по часам, длина days * 24
+    user_ids: np.ndarray  # пользователи с повторениями в прогнозе
+    user_totals: np.ndarray  # количество повторений каждого из них
+    words_total: int
+
+    @property
+    def daily(self) -> np.ndarray:
+        return self.hourly.reshape(self.days, HOURS_PER_DAY).sum(axis=1)
+
+    def top_users(self, limit: int = 5) -> List[Tuple[int, int]]:
+        order = np.argsort(self.user_totals)[::-1][:limit]
+        return [(int(self.user_ids[i]), int(self.user_totals[i])) for i in order]
+
+
+class ForecastService:
+    """Прогноз количества повторений по часам на ближайшие дни"""
+
+    async def load_review_state(self, session: AsyncSession, now: datetime) -> ReviewState:
+        """Читает невыученные слова частями и собирает их в массивы NumPy"""
+        query = select(
+            UserWord.user_id,
+            UserWord.next_repetition,
+            UserWord.last_reviewed,
+            UserWord.current_interval_index,
+            UserWord.stability,
+            UserWord.difficulty,
+            UserWord.correct_answers_count
+        ).where(UserWord.is_learned == False).execution_options(yield_per=LOAD_CHUNK_SIZE)
+
+        now64 = np.datetime64(now, 's')
+        chunks = []
+        result = await session.stream(query)
+        async for rows in result.partitions(LOAD_CHUNK_SIZE):
+            columns = list(zip(*rows))
+            next_repetition = np.array(columns[1], dtype='datetime64[s]')
+            last_reviewed = np.array(
+                [value if value is not None else now for value in columns[2]], dtype='datetime64[s]'
+            )
+            chunks.append((
+                np.array(columns[0], dtype=np.int64),
+                (next_repetition - now64).astype(np.float64) / 60,
+                (now64 - last_reviewed).astype(np.float64) / 60,
+                np.array(columns[3], dtype=np.float64),
+                np.array(columns[4], dtype=np.float64),
+                np.array(columns[5], dtype=np.float64),
+                np.array([value or 0 for value in columns[6]], dtype=np.int64)
+            ))
+
+        if not chunks:
+            empty = np.empty(0)
+            return ReviewState(empty.astype(np.int64), empty, empty, empty, empty, empty, empty.astype(np.int64))
+
+        return ReviewState(*(np.concatenate(column) for column in zip(*chunks)))
+
+    async def load_user_accuracy(self, session: AsyncSession) -> Tuple[Dict[int, Tuple[int, int]], float]:
+        """
+        Историческая точность ответов из дневной сводки (в ней учтены и ответы,
+        перенесенные из training_answers в архив)
+        Возвращает ({user_id: (правильных, всего)}, общая точность)
+        """
+        query = select(
+            UserDailyStats.user_id,
+            func.sum(UserDailyStats.words_trained),
+            func.sum(UserDailyStats.words_correct)
+        ).group_by(UserDailyStats.user_id)
+
+        result = await session.execute(query)
+        history = {
+            user_id: (int(correct or 0), int(total or 0))
+            for user_id, total, correct in result.all() if total
+        }
+
+        answers_total = sum(total for _, total in history.values())
+        correct_total = sum(correct for correct, _ in history.values())
+        global_accuracy = correct_total / answers_total if answers_total else DEFAULT_ACCURACY
+        return history, global_accuracy
+
+    @staticmethod
+    def user_accuracy_array(user_id: np.ndarray, history: Dict[int, Tuple[int, int]],
+                            global_accuracy: float) -> np.ndarray:
+        """Сглаженная точность для каждого слова по истории его владельца"""
+        unique_users, inverse = np.unique(user_id, return_inverse=True)
+        correct = np.array([history.get(int(u), (0, 0))[0] for u in unique_users], dtype=np.float64)
+        total = np.array([history.get(int(u), (0, 0))[1] for u in unique_users], dtype=np.float64)
+        accuracy = (correct + ACCURACY_PRIOR_WEIGHT * global_accuracy) / (total + ACCURACY_PRIOR_WEIGHT)
+        return accuracy[inverse]
+
+    @staticmethod
+    def simulate(state: ReviewState, accuracy: np.ndarray, days: int, start: datetime,
+                 algorithm: Optional[str] = None, seed: Optional[int] = None) -> ForecastResult:
+        """
+        Прогоняет повторения вперед: каждое слово повторяется в момент, когда подходит срок,
+        ответ разыгрывается с исторической точностью пользователя, следующий срок
+        рассчитывает планировщик. Выученные слова выпадают из прогноза.
+        Все шаги векторные: одна итерация обрабатывает все слова, у которых срок в горизонте.
+        """
+        rng = np.random.default_rng(seed)
+        horizon = days * HOURS_PER_DAY * MINUTES_PER_HOUR
+        scheduler_algorithm = repetition_scheduler.get_algorithm(algorithm)
+
+        # Просроченные слова считаем пришедшими в первый час прогноза
+        due = np.maximum(state.due, 0.0)
+        last_review = -state.last_reviewed
+        stability, difficulty = scheduler_algorithm.initial_state_batch(
+            state.interval_index, state.stability, state.difficulty
+        )
+        correct_answers = state.correct_answers.copy()
+        items = np.arange(len(due))
+
+        hourly = np.zeros(days * HOURS_PER_DAY, dtype=np.int64)
+        per_word = np.zeros(len(due), dtype=np.int64)
+
+        for _ in range(MAX_SIMULATION_STEPS):
+            active = due < horizon
+            if not active.any():
+                break
+            items, due, last_review = items[active], due[active], last_review[active]
+            stability, difficulty = stability[active], difficulty[active]
+            correct_answers = correct_answers[active]
+
+            hourly += np.bincount((due // MINUTES_PER_HOUR).astype(np.int64), minlength=len(hourly))
+            per_word += np.bincount(items, minlength=len(per_word))
+
+            outcome = rng.random(len(items)) < accuracy[items]
+            stability, difficulty, intervals = repetition_scheduler.schedule_batch(
+                stability, difficulty, due - last_review, outcome, algorithm=scheduler_algorithm.name
+            )
+            correct_answers = correct_answers + outcome
+            learned = repetition_scheduler.learned_mask(intervals, correct_answers, outcome)
+
+            last_review = due
+            due = np.where(learned, np.inf, due + intervals)
+
+        user_ids, inverse = np.unique(state.user_id, return_inverse=True)
+        user_totals = np.bincount(inverse, weights=per_word, minlength=len(user_ids)).astype(np.int64)
+        has_reviews = user_totals > 0
+
+        return ForecastResult(
+            start=start,
+            days=days,
+            hourly=hourly,
+            user_ids=user_ids[has_reviews],
+            user_totals=user_totals[has_reviews],
+            words_total=len(state.due)
+        )
+
+    async def forecast(self, session: AsyncSession, days: int = 1, algorithm: Optional[str] = None,
+                       seed: Optional[int] = None) -> ForecastResult:
+        """Строит прогноз нагрузки на days дней вперед от текущего момента"""
+        now = datetime.utcnow()
+        state = await self.load_review_state(session, now)
+        history, global_accuracy = await self.load_user_accuracy(session)
+        accuracy = self.user_accuracy_array(state.user_id, history, global_accuracy)
+
+        # Симуляция занимает процессор, поэтому выполняем ее вне цикла событий
+        return await asyncio.to_thread(self.simulate, state, accuracy, days, now, algorithm, seed)
+
+
+# Создаем глобальный экземпляр сервиса
+forecast_service = ForecastService()
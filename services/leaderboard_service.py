@@ -0,0 +1,168 @@
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import User, UserDailyStats
+
+# Периоды рейтинга: None - за все время (уровень и опыт), иначе - опыт за последние N дней
+LEADERBOARD_PERIODS = {
+    'all': None,
+    'week': 7,
+    'month': 30,
+}
+
+# Как часто полностью перечитывать рейтинг из базы (изменения вне add_experience)
+LEADERBOARD_REBUILD_SECONDS = 3600
+
+
+class SortedBoard:
+    """
+    Отсортированный массив ключей (ключ, user_id) с поиском места бинарным поиском.
+    Ключ - кортеж, меньший ключ означает более высокое место.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[tuple, int]] = []
+        self._keys: Dict[int, tuple] = {}
+        self.built_at = 0.0
+        self.built_day = None
+
+    def load(self, keys: Dict[int, tuple]):
+        """Заменяет содержимое рейтинга целиком"""
+        self._keys = dict(keys)
+        self._entries = sorted((key, user_id) for user_id, key in self._keys.items())
+        self.built_at = time.monotonic()
+        self.built_day = datetime.utcnow().date()
+
+    def set(self, user_id: int, key: tuple):
+        """Обновляет ключ пользователя с сохранением порядка"""
+        old_key = self._keys.get(user_id)
+        if old_key == key:
+            return
+        if old_key is not None:
+            del self._entries[bisect_left(self._entries, (old_key, user_id))]
+        insort(self._entries, (key, user_id))
+        self._keys[user_id] = key
+
+    def get(self, user_id: int) -> Optional[tuple]:
+        return self._keys.get(user_id)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """Место пользователя (с 1) или None, если его нет в рейтинге"""
+        key = self._keys.get(user_id)
+        if key is None:
+            return None
+        return bisect_left(self._entries, (key, user_id)) + 1
+
+    def top(self, limit: int) -> List[Tuple[int, tuple]]:
+        return [(user_id, key) for key, user_id in self._entries[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LeaderboardService:
+    """
+    Материализованный рейтинг пользователей: держится в памяти и обновляется
+    при начислении опыта, поэтому топ и место любого пользователя не требуют сортировки всей таблицы
+    """
+
+    def __init__(self):
+        self._boards: Dict[str, SortedBoard] = {period: SortedBoard() for period in LEADERBOARD_PERIODS}
+
+    @staticmethod
+    def _all_time_key(level: int, experience_points: int) -> tuple:
+        return (-(level or 1), -(experience_points or 0))
+
+    @staticmethod
+    def _period_key(experience: int) -> tuple:
+        return (-(experience or 0),)
+
+    def _needs_rebuild(self, period: str) -> bool:
+        board = self._boards[period]
+        if board.built_day is None:
+            return True
+        if time.monotonic() - board.built_at > LEADERBOARD_REBUILD_SECONDS:
+            return True
+        # Окно недели/месяца сдвигается каждый день
+        return LEADERBOARD_PERIODS[period] is not None and board.built_day != datetime.utcnow().date()
+
+    async def _ensure_loaded(self, session: AsyncSession, period: str) -> SortedBoard:
+        if period not in self._boards:
+            raise ValueError(f"Неизвестный период рейтинга: {period}")
+        if self._needs_rebuild(period):
+            await self.rebuild(session, period)
+        return self._boards[period]
+
+    async def rebuild(self, session: AsyncSession, period: str):
+        """Перечитывает рейтинг за период из базы"""
+        days = LEADERBOARD_PERIODS[period]
+
+        if days is None:
+            query = select(User.id, User.level, User.experience_points).where(User.is_active == True)
+            result = await session.execute(query)
+            keys = {
+                user_id: self._all_time_key(level, experience_points)
+                for user_id, level, experience_points in result.all()
+            }
+        else:
+            since = datetime.utcnow().date() - timedelta(days=days - 1)
+            query = select(
+                UserDailyStats.user_id,
+                func.sum(UserDailyStats.experience_gained)
+            ).join(User, User.id == UserDailyStats.user_id).where(
+                User.is_active == True,
+                UserDailyStats.day >= since
+            ).group_by(UserDailyStats.user_id)
+            result = await session.execute(query)
+            keys = {
+                user_id: self._period_key(experience)
+                for user_id, experience in result.all()
+                if experience
+            }
+
+        self._boards[period].load(keys)
+
+    def on_experience_added(self, user: User, experience: int):
+        """Обновляет загруженные рейтинги после начисления опыта"""
+        all_time = self._boards['all']
+        if all_time.built_day is not None and user.is_active:
+            all_time.set(user.id, self._all_time_key(user.level, user.experience_points))
+
+        for period, days in LEADERBOARD_PERIODS.items():
+            board = self._boards[period]
+            if days is None or board.built_day is None:
+                continue
+            current = board.get(user.id)
+            gained = -current[0] if current else 0
+            board.set(user.id, self._period_key(gained + experience))
+
+    async def get_top(self, session: AsyncSession, period: str = 'all', limit: int = 10) -> List[Tuple[int, int]]:
+        """
+        Возвращает топ пользователей: список (user_id, очки)
+        Для рейтинга за все время очки - опыт, для недели и месяца - опыт за период
+        """
+        board = await self._ensure_loaded(session, period)
+        return [(user_id, -key[-1]) for user_id, key in board.top(limit)]
+
+    async def get_rank(self, session: AsyncSession, user: User, period: str = 'all') -> Tuple[int, int, int]:
+        """
+        Возвращает (место, очки, всего участников) для пользователя.
+        Пользователь без опыта за период считается стоящим после всех участников.
+        """
+        board = await self._ensure_loaded(session, period)
+
+        if board.get(user.id) is None:
+            if LEADERBOARD_PERIODS[period] is not None:
+                return len(board) + 1, 0, len(board) + 1
+            board.set(user.id, self._all_time_key(user.level, user.experience_points))
+
+        return board.rank(user.id), -board.get(user.id)[-1], len(board)
+
+
+# Создаем глобальный экземпляр сервиса
+leaderboard_service = LeaderboardService()
@@ -0,0 +1,78 @@
+from bisect import bisect_right
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# Максимальный уровень
+MAX_LEVEL = 25
+
+
+def build_experience_thresholds(max_level: int = MAX_LEVEL) -> List[int]:
+    """Рассчитывает пороги опыта для каждого уровня (кривая уровней)"""
+    thresholds = [0]  # Уровень 1 начинается с 0 опыта
+
+    # Прогрессивное увеличение опыта для каждого уровня
+    # Разные формулы для низких и высоких уровней
+    base_exp = 100
+
+    for level in range(2, max_level + 1):
+        if level <= 10:
+            # Для низких уровней (2-10): стандартная прогрессия
+            exp_needed = int(base_exp * (level ** 1.5) + (level - 1) * 50)
+        elif level <= 15:
+            # Для средних уровней (11-15): умеренное увеличение сложности
+            exp_needed = int(base_exp * (level ** 1.8) + (level - 1) * 100)
+        else:
+            # Для высоких уровней (16-25): умеренный экспоненциальный рост
+            exp_needed = int(base_exp * (level ** 1.9) + (level - 1) * 150)
+
+        thresholds.append(thresholds[-1] + exp_needed)
+
+    return thresholds
+
+
+class LevelTable:
+    """
+    Таблица уровней: пороги опыта и заранее посчитанные границы каждого уровня.
+    Уровень ищется бинарным поиском, для массивов опыта - через np.searchsorted.
+    """
+
+    def __init__(self, thresholds: Sequence[int]):
+        if not thresholds or thresholds[0] != 0 or list(thresholds) != sorted(thresholds):
+            raise ValueError("Пороги опыта должны начинаться с 0 и не убывать")
+
+        self.thresholds: Tuple[int, ...] = tuple(thresholds)
+        self.max_level = len(self.thresholds)
+        self._thresholds_array = np.asarray(self.thresholds, dtype=np.int64)
+
+        # (начало уровня, опыта на уровень) для каждого уровня, кроме максимального
+        self._level_spans: Tuple[Tuple[int, int], ...] = tuple(
+            (start, end - start) for start, end in zip(self.thresholds, self.thresholds[1:])
+        )
+
+    def level_for(self, experience: int) -> int:
+        """Определяет уровень по количеству опыта"""
+        return max(bisect_right(self.thresholds, experience), 1)
+
+    def levels_for(self, experience: np.ndarray) -> np.ndarray:
+        """Определяет уровни сразу для массива значений опыта"""
+        levels = np.searchsorted(self._thresholds_array, np.asarray(experience), side='right')
+        return np.maximum(levels, 1)
+
+    def next_threshold(self, level: int) -> int:
+        """Опыт, с которого начинается следующий уровень (0 для максимального)"""
+        if level >= self.max_level:
+            return 0
+        return self.thresholds[level]
+
+    def progress(self, experience: int, level: int) -> Tuple[int, int]:
+        """Прогресс опыта: (текущий_опыт_уровня, опыт_до_следующего_уровня)"""
+        if level >= self.max_level:
+            return (experience, 0)
+
+        level_start, total_needed = self._level_spans[max(level, 1) - 1]
+        return (experience - level_start, total_needed)
+
+
+# Создаем глобальную таблицу уровней
+level_table = LevelTable(build_experience_thresholds())
@@ -1,15 +1,31 @@
 from typing import List, Tuple, Optional
-from sqlalchemy import select, desc, func
+from sqlalchemy import select, func, update
 from database.models import User, UserWord, Word
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, timedelta
+import numpy as np
+from services.daily_stats_service import daily_stats_service
+from services.leaderboard_service import leaderboard_service
+from services.level_table import LevelTable, level_table
+from services.write_queue_service import write_queue_service
+
+# Сколько пользователей пересчитывать за один проход при смене кривой уровней
+RELEVEL_BATCH_SIZE = 5000
 
 class LevelingService:
     """Сервис для работы с системой уровней и опыта"""
     
     def __init__(self):
-        self._level_names = self._load_level_names()
-        self._experience_thresholds = self._calculate_experience_thresholds()
+        # Названия уровней читаются из файла при первом обращении, а не при импорте
+        self._level_names: Optional[List[str]] = None
+        self._level_table = level_table
+    
+    @property
+    def level_names(self) -> List[str]:
+        """Названия уровней (загружаются один раз)"""
+        if self._level_names is None:
+            self._level_names = self._load_level_names()
+        return self._level_names
     
     def _load_level_names(self) -> List[str]:
         """Загружает названия уровней из файла"""
@@ -37,64 +53,24 @@ class LevelingService:
                 "Фантастический", "Мифический", "Легендарный", "Эпический", "Величайший"
             ]
     
-    def _calculate_experience_thresholds(self) -> List[int]:
-        """Рассчитывает пороги опыта для каждого уровня"""
-        thresholds = [0]  # Уровень 1 начинается с 0 опыта
-        
-        # Прогрессивное увеличение опыта для каждого уровня
-        # Разные формулы для низких и высоких уровней
-        base_exp = 100
-        
-        for level in range(2, 26):  # уровни 2-25
-            if level <= 10:
-                # Для низких уровней (2-10): стандартная прогрессия
-                exp_needed = int(base_exp * (level ** 1.5) + (level - 1) * 50)
-            elif level <= 15:
-                # Для средних уровней (11-15): умеренное увеличение сложности
-                exp_needed = int(base_exp * (level ** 1.8) + (level - 1) * 100)
-            else:
-                # Для высоких уровней (16-25): умеренный экспоненциальный рост
-                exp_needed = int(base_exp * (level ** 1.9) + (level - 1) * 150)
-            
-            thresholds.append(thresholds[-1] + exp_needed)
-        
-        return thresholds
-    
     def get_level_name(self, level: int) -> str:
         """Возвращает название уровня по номеру"""
-        if 1 <= level <= len(self._level_names):
-            return self._level_names[level - 1]
+        level_names = self.level_names
+        if 1 <= level <= len(level_names):
+            return level_names[level - 1]
         return f"Уровень {level}"
     
     def get_level_by_experience(self, experience: int) -> int:
         """Определяет уровень по количеству опыта"""
-        level = 1
-        for i, threshold in enumerate(self._experience_thresholds):
-            if experience >= threshold:
-                level = i + 1
-            else:
-                break
-        return min(level, 25)  # Максимальный уровень 25
+        return self._level_table.level_for(experience)
     
     def get_experience_for_next_level(self, current_level: int) -> int:
         """Возвращает количество опыта, необходимое для следующего уровня"""
-        if current_level >= 25:
-            return 0  # Максимальный уровень достигнут
-        
-        return self._experience_thresholds[current_level]
+        return self._level_table.next_threshold(current_level)
     
     def get_experience_progress(self, experience: int, level: int) -> Tuple[int, int]:
         """Возвращает прогресс опыта: (текущий_опыт_уровня, опыт_до_следующего_уровня)"""
-        if level >= 25:
-            return (experience, 0)
-        
-        level_start = self._experience_thresholds[level - 1] if level > 1 else 0
-        level_end = self._experience_thresholds[level]
-        
-        current_progress = experience - level_start
-        total_needed = level_end - level_start
-        
-        return (current_progress, total_needed)
+        return self._level_table.progress(experience, level)
     
     def calculate_experience_reward(self, difficulty_level: int = 1, streak: int = 0) -> int:
         """Рассчитывает награду опыта за правильный ответ"""
@@ -106,7 +82,8 @@ class LevelingService:
     
     async def add_experience(self, session: AsyncSession, user: User, experience: int) -> Tuple[bool, int]:
         """
-        Добавляет опыт пользователю
+        Добавляет опыт пользователю. Коммит и обновление рейтинга
+        (leaderboard_service.on_experience_added) остаются за вызывающим кодом.
         Возвращает (level_up_occurred, new_level)
         """
         old_level = user.level
@@ -115,13 +92,34 @@ class LevelingService:
         new_level = self.get_level_by_experience(user.experience_points)
         user.level = new_level
         
-        await session.commit()
+        # Опыт за день нужен для недельного и месячного рейтинга
+        await daily_stats_service.record_experience(session, user.id, experience)
         
         return (new_level > old_level, new_level)
     
+    async def award_experience(self, telegram_id: int, experience: int) -> Optional[Tuple[bool, int]]:
+        """
+        Начисляет опыт через очередь записи (групповой коммит) и обновляет рейтинг.
+        Возвращает (level_up_occurred, new_level) или None, если пользователя нет
+        """
+        async def intent(session: AsyncSession):
+            user_result = await session.execute(select(User).where(User.telegram_id == telegram_id))
+            user = user_result.scalar_one_or_none()
+            if user is None:
+                return None
+            return user, await self.add_experience(session, user, experience)
+        
+        result = await write_queue_service.submit(intent)
+        if result is None:
+            return None
+        
+        user, outcome = result
+        leaderboard_service.on_experience_added(user, experience)
+        return outcome
+    
     async def update_streak(self, session: AsyncSession, user: User) -> Tuple[int, bool]:
         """
-        Обновляет стрик пользователя при завершении тренировки
+        Обновляет стрик пользователя при завершении тренировки (коммит - за вызывающим кодом)
         Возвращает (новый_стрик, новый_рекорд)
         """
         today = date.today()
@@ -150,34 +148,89 @@ class LevelingService:
             user.best_streak = user.current_streak
             new_record = True
         
-        await session.commit()
-        
         return user.current_streak, new_record
     
-    async def get_leaderboard(self, session: AsyncSession, limit: int = 10) -> List[Tuple[User, str]]:
-        """Возвращает топ пользователей по уровню и опыту"""
-        query = select(User).where(User.is_active == True).order_by(
-            desc(User.level),
-            desc(User.experience_points)
-        ).limit(limit)
+    async def get_leaderboard(self, session: AsyncSession, limit: int = 10, period: str = 'all') -> List[Tuple[User, str, int]]:
+        """
+        Возвращает топ пользователей: список (пользователь, название уровня, очки)
+        period: 'all' - по уровню и опыту, 'week' / 'month' - по опыту за период
+        """
+        top = await leaderboard_service.get_top(session, period, limit)
+        if not top:
+            return []
         
-        result = await session.execute(query)
-        users = result.scalars().all()
+        users_query = select(User).where(User.id.in_([user_id for user_id, _ in top]))
+        users_result = await session.execute(users_query)
+        users_by_id = {user.id: user for user in users_result.scalars().all()}
         
         leaderboard = []
-        for user in users:
+        for user_id, score in top:
+            user = users_by_id.get(user_id)
+            if user is None:
+                continue
             level_name = self.get_level_name(user.level)
-            leaderboard.append((user, level_name))
+            leaderboard.append((user, level_name, score))
         
         return leaderboard
     
+    async def get_user_rank(self, session: AsyncSession, user: User, period: str = 'all') -> Tuple[int, int, int]:
+        """Возвращает (место, очки, всего участников) пользователя в рейтинге за период"""
+        return await leaderboard_service.get_rank(session, user, period)
+    
+    async def relevel_users(self, session: AsyncSession, table: Optional[LevelTable] = None,
+                            batch_size: int = RELEVEL_BATCH_SIZE, dry_run: bool = False) -> Tuple[int, int]:
+        """
+        Пересчитывает уровни всех пользователей по таблице уровней (после изменения кривой).
+        Пользователи читаются пачками по id, уровни пачки считаются одним вызовом NumPy,
+        в базу записываются только изменившиеся уровни, каждая пачка - намерением очереди записи.
+        Возвращает (проверено пользователей, изменено уровней)
+        """
+        if table is None:
+            table = self._level_table
+        
+        checked = 0
+        changed = 0
+        last_id = 0
+        
+        while True:
+            query = select(User.id, User.experience_points, User.level).where(
+                User.id > last_id
+            ).order_by(User.id).limit(batch_size)
+            result = await session.execute(query)
+            rows = result.all()
+            if not rows:
+                break
+            
+            user_ids = np.array([row[0] for row in rows], dtype=np.int64)
+            experience = np.array([row[1] or 0 for row in rows], dtype=np.int64)
+            levels = np.array([row[2] or 0 for row in rows], dtype=np.int64)
+            new_levels = table.levels_for(experience)
+            mask = new_levels != levels
+            
+            if mask.any() and not dry_run:
+                changes = [
+                    {'id': int(user_id), 'level': int(level)}
+                    for user_id, level in zip(user_ids[mask], new_levels[mask])
+                ]
+                await write_queue_service.submit(lambda write_session: write_session.execute(update(User), changes))
+            
+            checked += len(rows)
+            changed += int(mask.sum())
+            last_id = int(user_ids[-1])
+        
+        # Уровни изменились в обход add_experience, поэтому перечитываем рейтинг
+        if changed and not dry_run:
+            await leaderboard_service.rebuild(session, 'all')
+        
+        return checked, changed
+    
     async def format_user_stats(self, user: User, session: AsyncSession) -> str:
         """Форматирует статистику пользователя"""
         level_name = self.get_level_name(user.level)
         current_exp, needed_exp = self.get_experience_progress(user.experience_points, user.level)
         
         # Получаем статистику по словам
-        total_words_query = select(func.count(Word.id))
+        total_words_query = select(func.count(Word.id)).where(Word.is_archived == False)
         total_words_result = await session.execute(total_words_query)
         total_words = total_words_result.scalar() or 0
         
@@ -207,7 +260,7 @@ class LevelingService:
         
         stats += "\n"
         
-        if user.level < 25:
+        if user.level < self._level_table.max_level:
             progress_bar = self._create_progress_bar(current_exp, needed_exp)
             stats += f"📈 <b>Прогресс уровня:</b> {current_exp}/{needed_exp}\n"
             stats += f"{progress_bar}\n"
@@ -0,0 +1,178 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from config import PROFILING_SAMPLE_RATE, PROFILING_INTERVAL_MS, PROFILING_DUMP_DIR
+
+# Сколько кадров стека сохранять в одном сэмпле (от обработчика вглубь)
+PROFILING_MAX_DEPTH = 64
+
+
+def _frame_name(frame) -> str:
+    """Имя кадра для flame graph: модуль:функция"""
+    module = frame.f_globals.get('__name__', '?')
+    return f"{module}:{frame.f_code.co_name}"
+
+
+def _handler_info(data: Dict[str, Any]) -> Tuple[str, Any]:
+    """Имя и код функции обработчика (aiogram кладет HandlerObject в data['handler'])"""
+    callback = getattr(data.get('handler'), 'callback', None)
+    return getattr(callback, '__name__', None) or 'unknown', getattr(callback, '__code__', None)
+
+
+class ProfilingService(BaseMiddleware):
+    """
+    Сэмплирующий профилировщик обработчиков. Подключается как inner middleware
+    (dp.message / dp.callback_query) и отбирает для профилирования долю обновлений sample_rate.
+
+    Пока обработчик отобранного обновления выполняется, фоновый поток раз в
+    PROFILING_INTERVAL_MS снимает стек главного потока и, если в стеке есть кадр
+    этого middleware, записывает путь от обработчика до текущей функции.
+    Сэмплы других корутин (в том числе неотобранных обновлений) не учитываются.
+    Ожидание ввода-вывода в сэмплы не попадает, полное время вызовов - в get_timings().
+
+    При sample_rate = 0 фоновый поток не запускается, а middleware только
+    передает управление обработчику.
+    """
+
+    def __init__(self, sample_rate: float = PROFILING_SAMPLE_RATE, interval_ms: int = PROFILING_INTERVAL_MS):
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        # Кадр __call__ отобранного обновления -> (имя обработчика, код обработчика)
+        self._active: Dict[Any, Tuple[str, Any]] = {}
+        self._stacks: Dict[Tuple[str, ...], int] = Counter()
+        self._timings: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0, 0.0])  # вызовов, сумма, максимум
+        self._main_thread_id = threading.main_thread().ident
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.started_at = datetime.utcnow()
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]) -> Any:
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return await handler(event, data)
+
+        name, code = _handler_info(data)
+        frame = sys._getframe()
+        self._active[frame] = (name, code)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            elapsed = time.perf_counter() - started
+            del self._active[frame]
+            timing = self._timings[name]
+            timing[0] += 1
+            timing[1] += elapsed
+            timing[2] = max(timing[2], elapsed)
+
+    def start(self, sample_rate: Optional[float] = None):
+        """Включает профилирование (sample_rate - доля отбираемых обновлений от 0 до 1)"""
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if self.sample_rate > 0 and self._sampler is None:
+            self._stop_event.clear()
+            self._sampler = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        """Выключает профилирование, собранные данные сохраняются"""
+        self.sample_rate = 0
+        if self._sampler is not None:
+            self._stop_event.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def reset(self):
+        """Сбрасывает собранные данные"""
+        with self._lock:
+            self._stacks = Counter()
+            self._timings = defaultdict(lambda: [0, 0.0, 0.0])
+            self.started_at = datetime.utcnow()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            if self._active:
+                self._sample()
+
+    def _sample(self):
+        frame = sys._current_frames().get(self._main_thread_id)
+        stack = []
+        while frame is not None:
+            active = self._active.get(frame)
+            if active is not None:
+                name, code = active
+                # Кадры aiogram между middleware и обработчиком (handler.call и т.п.) не нужны
+                codes = [frame_code for frame_code, _ in stack]
+                if code in codes:
+                    stack = stack[:len(codes) - codes[::-1].index(code)]
+                path = (name,) + tuple(frame_name for _, frame_name in reversed(stack[-PROFILING_MAX_DEPTH:]))
+                with self._lock:
+                    self._stacks[path] += 1
+                return
+            stack.append((frame.f_code, _frame_name(frame)))
+            frame = frame.f_back
+
+    def folded_stacks(self) -> str:
+        """Сэмплы в формате folded stacks (flamegraph.pl, speedscope): путь;через;точку_с_запятой количество"""
+        with self._lock:
+            stacks = sorted(self._stacks.items())
+        return "".join(f"{';'.join(path)} {count}\n" for path, count in stacks)
+
+    def hot_functions(self, limit: int = 5) -> Dict[str, List[Tuple[str, int, int]]]:
+        """
+        Самые горячие функции по обработчикам: (функция, собственные сэмплы, сэмплы с вложенными вызовами)
+        в порядке убывания собственных сэмплов
+        """
+        own: Dict[str, Counter] = defaultdict(Counter)
+        total: Dict[str, Counter] = defaultdict(Counter)
+        with self._lock:
+            stacks = list(self._stacks.items())
+
+        for path, count in stacks:
+            handler, frames = path[0], path[1:]
+            if not frames:
+                continue
+            own[handler][frames[-1]] += count
+            for name in set(frames):
+                total[handler][name] += count
+
+        return {
+            handler: [(name, samples, total[handler][name]) for name, samples in counter.most_common(limit)]
+            for handler, counter in own.items()
+        }
+
+    def get_timings(self) -> Dict[str, Dict[str, float]]:
+        """Время отобранных вызовов по обработчикам: количество, среднее и максимум в мс"""
+        return {
+            name: {'calls': calls, 'avg_ms': total / calls * 1000, 'max_ms': maximum * 1000}
+            for name, (calls, total, maximum) in self._timings.items() if calls
+        }
+
+    def get_sample_count(self) -> int:
+        return sum(self._stacks.values())
+
+    def dump(self, directory: str = PROFILING_DUMP_DIR) -> str:
+        """Записывает folded stacks в файл и возвращает путь к нему"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"profile_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.folded")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.folded_stacks())
+        return path
+
+
+# Создаем глобальный экземпляр сервиса
+profiling_service = ProfilingService()
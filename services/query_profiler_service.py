@@ -0,0 +1,200 @@
+import logging
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import QUERY_SLOW_MS, QUERY_STATS_WINDOW_MINUTES
+
+logger = logging.getLogger(__name__)
+
+# Верхние границы корзин гистограммы задержек, мс (последняя корзина - все, что дольше)
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Обработчик aiogram, выполняющий запрос (для запросов вне обработчиков - фоновая задача)
+current_handler: ContextVar[Optional[str]] = ContextVar('current_handler', default=None)
+
+BACKGROUND = 'background'
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMS_LIST_RE = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_VALUES_RE = re.compile(r"(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+", re.IGNORECASE)
+_SPACES_RE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Отпечаток запроса: литералы заменены на ?, списки параметров IN (?, ?, ...) и
+    многострочные VALUES свернуты, пробелы схлопнуты. Запросы, отличающиеся
+    только значениями, дают один отпечаток.
+    """
+    text = _SPACES_RE.sub(' ', statement).strip()
+    text = _STRING_RE.sub('?', text)
+    text = _NUMBER_RE.sub('?', text)
+    text = re.sub(r"%\(\w+\)s|\$\d+|:\w+", '?', text)
+    text = _PARAMS_LIST_RE.sub('(...)', text)
+    text = _VALUES_RE.sub(r'\1', text)
+    return text
+
+
+class LatencyStats:
+    """Количество, сумма, максимум и гистограмма задержек одного отпечатка"""
+
+    __slots__ = ('count', 'total_ms', 'max_ms', 'buckets', 'handlers')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.handlers: Counter = Counter()
+
+    def add(self, elapsed_ms: float, handler: str):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.handlers[handler] += 1
+
+    def merge(self, other: 'LatencyStats'):
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.handlers.update(other.handlers)
+
+    def percentile(self, share: float) -> float:
+        """Оценка перцентиля сверху: граница корзины, в которую он попадает"""
+        target = share * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+class QueryProfilerService(BaseMiddleware):
+    """
+    Профилировщик SQL-запросов на событиях движка SQLAlchemy.
+
+    - install(engine) подписывается на before/after_cursor_execute и замеряет каждый запрос;
+    - как inner middleware (dp.message / dp.callback_query) запоминает в contextvar
+      обработчик, от имени которого выполняются запросы;
+    - статистика копится по отпечаткам запросов в скользящем окне из двух
+      интервалов по QUERY_STATS_WINDOW_MINUTES;
+    - запросы дольше QUERY_SLOW_MS пишутся в журнал вместе с обработчиком.
+    """
+
+    def __init__(self, slow_ms: float = QUERY_SLOW_MS, window_minutes: int = QUERY_STATS_WINDOW_MINUTES):
+        self.slow_ms = slow_ms
+        self.window = window_minutes * 60
+        self._current: Dict[str, LatencyStats] = {}
+        self._previous: Dict[str, LatencyStats] = {}
+        self._window_started = time.monotonic()
+        self._fingerprints: Dict[str, str] = {}
+        self._installed = set()
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]) -> Any:
+        callback = getattr(data.get('handler'), 'callback', None)
+        token = current_handler.set(getattr(callback, '__name__', None) or 'unknown')
+        try:
+            return await handler(event, data)
+        finally:
+            current_handler.reset(token)
+
+    def install(self, engine: AsyncEngine):
+        """Подписывается на события выполнения запросов движка"""
+        sync_engine = engine.sync_engine
+        if id(sync_engine) in self._installed:
+            return
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        self._installed.add(id(sync_engine))
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.query_started_at = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, 'query_started_at', None)
+        if started_at is not None:
+            self.record(statement, (time.perf_counter() - started_at) * 1000)
+
+    def record(self, statement: str, elapsed_ms: float):
+        """Учитывает выполненный запрос"""
+        handler = current_handler.get() or BACKGROUND
+
+        key = self._fingerprints.get(statement)
+        if key is None:
+            key = fingerprint(statement)
+            # Кэш отпечатков по тексту запроса: SQLAlchemy повторяет одни и те же строки
+            if len(self._fingerprints) < 10000:
+                self._fingerprints[statement] = key
+
+        self._rotate()
+        stats = self._current.get(key)
+        if stats is None:
+            stats = self._current[key] = LatencyStats()
+        stats.add(elapsed_ms, handler)
+
+        if elapsed_ms >= self.slow_ms:
+            logger.warning(f"Медленный запрос {elapsed_ms:.0f} мс в {handler}: {key[:500]}")
+
+    def _rotate(self):
+        now = time.monotonic()
+        if now - self._window_started >= self.window:
+            # Если простаивали дольше двух окон, предыдущее окно тоже устарело
+            self._previous = self._current if now - self._window_started < 2 * self.window else {}
+            self._current = {}
+            self._window_started = now
+
+    def reset(self):
+        """Сбрасывает накопленную статистику"""
+        self._current = {}
+        self._previous = {}
+        self._window_started = time.monotonic()
+
+    def snapshot(self) -> Dict[str, LatencyStats]:
+        """Статистика за скользящее окно (текущий и предыдущий интервалы)"""
+        self._rotate()
+        merged: Dict[str, LatencyStats] = {}
+        for source in (self._previous, self._current):
+            for key, stats in source.items():
+                merged.setdefault(key, LatencyStats()).merge(stats)
+        return merged
+
+    def top(self, limit: int = 10, order_by: str = 'total') -> List[Dict[str, Any]]:
+        """Топ отпечатков по суммарному (total), среднему (avg) или максимальному (max) времени"""
+        sort_keys = {
+            'total': lambda item: item[1].total_ms,
+            'avg': lambda item: item[1].total_ms / item[1].count,
+            'max': lambda item: item[1].max_ms,
+            'count': lambda item: item[1].count,
+        }
+        items = sorted(self.snapshot().items(), key=sort_keys[order_by], reverse=True)[:limit]
+        return [
+            {
+                'fingerprint': key,
+                'count': stats.count,
+                'total_ms': stats.total_ms,
+                'avg_ms': stats.total_ms / stats.count,
+                'p95_ms': stats.percentile(0.95),
+                'max_ms': stats.max_ms,
+                'handlers': stats.handlers.most_common(3),
+            }
+            for key, stats in items
+        ]
+
+
+# Создаем глобальный экземпляр сервиса
+query_profiler_service = QueryProfilerService()
@@ -0,0 +1,278 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple, Type
+
+import numpy as np
+
+from config import REPETITION_INTERVALS, REPETITION_ALGORITHM, LEARNED_CORRECT_ANSWERS
+from database.models import UserWord
+
+MINUTES_PER_DAY = 1440
+
+# Интервал, после которого слово считается выученным (последняя ступень лестницы)
+LEARNED_INTERVAL = REPETITION_INTERVALS[-1]
+
+_LADDER = np.asarray(REPETITION_INTERVALS, dtype=np.float64)
+
+
+class SchedulerAlgorithm:
+    """
+    Базовый класс алгоритма интервальных повторений.
+
+    Состояние слова описывается парой (stability, difficulty), смысл которой
+    определяет сам алгоритм. Основной метод - next_batch: он принимает массивы
+    одинаковой длины и возвращает новые stability, difficulty и интервал в минутах.
+    """
+
+    name = ""
+    # Хранит ли алгоритм собственное состояние в UserWord.stability / difficulty
+    stores_state = True
+
+    def initial_state(self, user_word: UserWord) -> Tuple[float, float]:
+        """Возвращает (stability, difficulty) для записи из личного словаря"""
+        raise NotImplementedError
+
+    def initial_state_batch(self, interval_index: np.ndarray, stability: np.ndarray,
+                            difficulty: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """То же, что initial_state, для столбцов user_words (NULL передается как NaN)"""
+        raise NotImplementedError
+
+    def next_batch(self, stability: np.ndarray, difficulty: np.ndarray, elapsed: np.ndarray,
+                   outcome: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Args:
+            stability: текущая стабильность
+            difficulty: текущая сложность
+            elapsed: минуты с последнего повторения
+            outcome: результат ответа (True - правильно)
+
+        Returns:
+            (новая stability, новая difficulty, следующий интервал в минутах)
+        """
+        raise NotImplementedError
+
+
+class LadderAlgorithm(SchedulerAlgorithm):
+    """
+    Исходная лестница по кривой Эббингауза (REPETITION_INTERVALS).
+    stability - индекс текущего интервала, difficulty не используется.
+    """
+
+    name = "ladder"
+    stores_state = False
+
+    def initial_state(self, user_word: UserWord) -> Tuple[float, float]:
+        return float(user_word.current_interval_index or 0), 0.0
+
+    def initial_state_batch(self, interval_index, stability, difficulty):
+        return np.nan_to_num(interval_index), np.zeros_like(interval_index)
+
+    def next_batch(self, stability, difficulty, elapsed, outcome):
+        index = np.where(outcome, np.minimum(stability + 1, len(_LADDER) - 1), 0).astype(np.int64)
+        return index.astype(np.float64), difficulty, _LADDER[index]
+
+
+class SM2Algorithm(SchedulerAlgorithm):
+    """
+    SM-2 (SuperMemo 2) с бинарной оценкой: правильный ответ - качество 4, ошибка - 1.
+    stability - последний интервал в минутах, difficulty - коэффициент лёгкости (EF).
+    """
+
+    name = "sm2"
+
+    INITIAL_EASE = 2.5
+    MIN_EASE = 1.3
+    FIRST_INTERVAL = 1 * MINUTES_PER_DAY
+    SECOND_INTERVAL = 6 * MINUTES_PER_DAY
+    CORRECT_QUALITY = 4
+    WRONG_QUALITY = 1
+
+    def initial_state(self, user_word: UserWord) -> Tuple[float, float]:
+        return float(user_word.stability or 0.0), float(user_word.difficulty or self.INITIAL_EASE)
+
+    def initial_state_batch(self, interval_index, stability, difficulty):
+        return np.nan_to_num(stability), np.where(np.isnan(difficulty), self.INITIAL_EASE, difficulty)
+
+    def next_batch(self, stability, difficulty, elapsed, outcome):
+        quality = np.where(outcome, self.CORRECT_QUALITY, self.WRONG_QUALITY)
+        miss = 5 - quality
+        ease = np.maximum(self.MIN_EASE, difficulty + (0.1 - miss * (0.08 + miss * 0.02)))
+
+        success_interval = np.select(
+            [stability < self.FIRST_INTERVAL, stability < self.SECOND_INTERVAL],
+            [self.FIRST_INTERVAL, self.SECOND_INTERVAL],
+            default=stability * ease
+        )
+        # При ошибке слово возвращается на первую ступень лестницы
+        interval = np.where(outcome, success_interval, _LADDER[0])
+        return interval, ease, interval
+
+
+class FSRSAlgorithm(SchedulerAlgorithm):
+    """
+    Упрощённая модель FSRS v4 с весами по умолчанию и бинарной оценкой (Again/Good).
+    stability - стабильность памяти в днях, difficulty - сложность от 1 до 10.
+    """
+
+    name = "fsrs"
+
+    WEIGHTS = (
+        0.4, 0.6, 2.4, 5.8, 4.93, 0.94, 0.86, 0.01, 1.49,
+        0.14, 0.94, 2.18, 0.05, 0.34, 1.26, 0.29, 2.61
+    )
+    REQUEST_RETENTION = 0.9
+    AGAIN = 1
+    GOOD = 3
+
+    def initial_state(self, user_word: UserWord) -> Tuple[float, float]:
+        return float(user_word.stability or 0.0), float(user_word.difficulty or 0.0)
+
+    def initial_state_batch(self, interval_index, stability, difficulty):
+        return np.nan_to_num(stability), np.nan_to_num(difficulty)
+
+    def next_batch(self, stability, difficulty, elapsed, outcome):
+        w = self.WEIGHTS
+        grade = np.where(outcome, self.GOOD, self.AGAIN)
+        is_new = stability <= 0
+
+        # Первое повторение: начальные стабильность и сложность по оценке
+        init_stability = np.where(outcome, w[self.GOOD - 1], w[self.AGAIN - 1])
+        init_difficulty = np.clip(w[4] - (grade - 3) * w[5], 1, 10)
+
+        safe_stability = np.where(is_new, 1.0, stability)
+        safe_difficulty = np.where(is_new, init_difficulty, difficulty)
+        retrievability = 1.0 / (1.0 + (elapsed / MINUTES_PER_DAY) / (9.0 * safe_stability))
+
+        # Сложность сдвигается от оценки и возвращается к среднему значению
+        mean_difficulty = w[4]
+        next_difficulty = safe_difficulty - w[6] * (grade - 3)
+        next_difficulty = np.clip(w[7] * mean_difficulty + (1 - w[7]) * next_difficulty, 1, 10)
+
+        recall_stability = safe_stability * (
+            1 + np.exp(w[8]) * (11 - safe_difficulty) * safe_stability ** -w[9]
+            * (np.exp((1 - retrievability) * w[10]) - 1)
+        )
+        forget_stability = (
+            w[11] * safe_difficulty ** -w[12] * ((safe_stability + 1) ** w[13] - 1)
+            * np.exp((1 - retrievability) * w[14])
+        )
+
+        new_stability = np.where(
+            is_new, init_stability, np.where(outcome, recall_stability, forget_stability)
+        )
+        new_difficulty = np.where(is_new, init_difficulty, next_difficulty)
+
+        interval_days = 9 * new_stability * (1 / self.REQUEST_RETENTION - 1)
+        interval = np.maximum(interval_days * MINUTES_PER_DAY, _LADDER[0])
+        # После ошибки - шаг переобучения: первая ступень лестницы
+        interval = np.where(outcome, interval, _LADDER[0])
+        return new_stability, new_difficulty, interval
+
+
+class RepetitionScheduler:
+    """Планировщик повторений с подключаемым алгоритмом"""
+
+    def __init__(self, algorithm: str = REPETITION_ALGORITHM):
+        self._algorithms: Dict[str, SchedulerAlgorithm] = {}
+        for algorithm_class in (LadderAlgorithm, SM2Algorithm, FSRSAlgorithm):
+            self.register_algorithm(algorithm_class)
+        self.algorithm = self.get_algorithm(algorithm)
+
+    def register_algorithm(self, algorithm_class: Type[SchedulerAlgorithm]):
+        """Регистрирует алгоритм под его именем"""
+        self._algorithms[algorithm_class.name] = algorithm_class()
+
+    def get_algorithm(self, name: Optional[str] = None) -> SchedulerAlgorithm:
+        """Возвращает алгоритм по имени (по умолчанию - текущий)"""
+        if name is None:
+            return self.algorithm
+        if name not in self._algorithms:
+            raise ValueError(f"Неизвестный алгоритм повторений: {name}")
+        return self._algorithms[name]
+
+    def schedule_batch(self, stability, difficulty, elapsed, outcome,
+                       algorithm: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Рассчитывает следующие интервалы сразу для массива слов
+        (вся завершенная тренировка или вся база при миграции)
+
+        Returns:
+            (stability, difficulty, интервал в минутах)
+        """
+        return self.get_algorithm(algorithm).next_batch(
+            np.asarray(stability, dtype=np.float64),
+            np.asarray(difficulty, dtype=np.float64),
+            np.asarray(elapsed, dtype=np.float64),
+            np.asarray(outcome, dtype=bool)
+        )
+
+    @staticmethod
+    def learned_mask(intervals, correct_answers, outcome) -> np.ndarray:
+        """
+        Слово считается выученным после правильного ответа, если:
+        1) интервал дошел до последней ступени лестницы ИЛИ
+        2) набрано LEARNED_CORRECT_ANSWERS правильных ответов
+        """
+        intervals = np.asarray(intervals)
+        correct_answers = np.asarray(correct_answers)
+        return np.asarray(outcome, dtype=bool) & (
+            (intervals >= LEARNED_INTERVAL) | (correct_answers >= LEARNED_CORRECT_ANSWERS)
+        )
+
+    @staticmethod
+    def interval_index(interval_minutes: float) -> int:
+        """Ступень лестницы REPETITION_INTERVALS, соответствующая интервалу"""
+        return max(bisect_right(REPETITION_INTERVALS, interval_minutes) - 1, 0)
+
+    def review_words(self, user_words: list, outcomes: list, now: Optional[datetime] = None) -> int:
+        """
+        Применяет результаты ответов к записям личного словаря одним пакетным расчетом.
+        Коммит остается за вызывающим кодом.
+        Возвращает количество слов, ставших выученными.
+        """
+        if not user_words:
+            return 0
+        if now is None:
+            now = datetime.utcnow()
+
+        states = [self.algorithm.initial_state(user_word) for user_word in user_words]
+        elapsed = [
+            (now - user_word.last_reviewed).total_seconds() / 60 if user_word.last_reviewed else 0.0
+            for user_word in user_words
+        ]
+        stability, difficulty, intervals = self.schedule_batch(
+            [state[0] for state in states],
+            [state[1] for state in states],
+            elapsed,
+            outcomes
+        )
+
+        for user_word, is_correct in zip(user_words, outcomes):
+            if is_correct:
+                user_word.correct_answers_count += 1
+            else:
+                # Счетчик правильных ответов НЕ сбрасываем, так как это независимый критерий
+                user_word.mistakes_count += 1
+
+        learned = self.learned_mask(
+            intervals, [user_word.correct_answers_count for user_word in user_words], outcomes
+        )
+
+        newly_learned = 0
+        for i, user_word in enumerate(user_words):
+            interval = float(intervals[i])
+            if self.algorithm.stores_state:
+                user_word.stability = float(stability[i])
+                user_word.difficulty = float(difficulty[i])
+            user_word.current_interval_index = self.interval_index(interval)
+            user_word.next_repetition = now + timedelta(minutes=interval)
+            user_word.last_reviewed = now
+            if learned[i] and not user_word.is_learned:
+                user_word.is_learned = True
+                newly_learned += 1
+
+        return newly_learned
+
+
+# Создаем глобальный экземпляр планировщика
+repetition_scheduler = RepetitionScheduler()
@@ -0,0 +1,256 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.client.default import Default
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage, TelegramMethod
+
+from config import (
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_GLOBAL_BURST,
+    TELEGRAM_CHAT_RATE,
+    TELEGRAM_CHAT_BURST,
+    TELEGRAM_MAX_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Максимальная длина текста сообщения в Telegram
+MAX_MESSAGE_LENGTH = 4096
+
+# После какого количества чатов начинаем чистить простаивающие бакеты
+MAX_CHAT_BUCKETS = 10000
+
+
+class TokenBucket:
+    """Токен-бакет: rate токенов в секунду, не больше capacity в запасе"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = asyncio.get_event_loop().time()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def is_full(self) -> bool:
+        """Проверяет, что бакет полностью восстановился (чат простаивает)"""
+        self._refill(asyncio.get_event_loop().time())
+        return self.tokens >= self.capacity
+
+    async def acquire(self):
+        """Забирает один токен, при необходимости ожидая его появления"""
+        self._refill(asyncio.get_event_loop().time())
+        # Резервируем токен сразу (баланс может уйти в минус),
+        # чтобы конкурентные вызовы выстраивались в очередь без блокировок
+        self.tokens -= 1
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class CoalescedMessage:
+    """
+    Результат sendMessage, склеенного с предыдущим сообщением в тот же чат.
+    Своего сообщения в Telegram у него нет: message - общее склеенное сообщение,
+    а любые действия с результатом (edit_text, delete, message_id, ...) падают с понятной
+    ошибкой, а не меняют чужой текст.
+    """
+
+    def __init__(self, message: Any):
+        self.message = message
+
+    def __getattr__(self, name: str):
+        raise RuntimeError(
+            f"Сообщение склеено очередью отправки с предыдущим, «{name}» недоступно: "
+            f"результат склейки - CoalescedMessage.message"
+        )
+
+
+class SendQueueService(BaseRequestMiddleware):
+    """
+    Очередь исходящих запросов к Telegram Bot API.
+    Подключается как middleware сессии бота, поэтому все message.answer / edit_text
+    проходят через неё без изменений в обработчиках:
+    - глобальный и поштучный (на чат) токен-бакеты;
+    - автоматический повтор при RetryAfter (429);
+    - склейка подряд идущих текстовых сообщений в один чат, пока они ждут отправки
+      (первый отправитель получает Message, остальные - CoalescedMessage).
+    """
+
+    def __init__(self):
+        self._queues: Dict[int, Deque[Tuple[TelegramMethod, asyncio.Future, NextRequestMiddlewareType]]] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._global_bucket: Optional[TokenBucket] = None
+        self._metrics = {
+            'sent': 0,
+            'coalesced': 0,
+            'retries': 0,
+            'failed': 0,
+            'max_queue_depth': 0,
+        }
+
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot: Bot, method: TelegramMethod) -> Any:
+        chat_id = getattr(method, 'chat_id', None)
+        if chat_id is None:
+            # Запросы без чата (answerCallbackQuery, getMe, ...) идут мимо очереди чатов,
+            # но общий лимит бота на них тоже распространяется
+            await self._get_global_bucket().acquire()
+            return await self._send_with_retry(make_request, bot, method)
+
+        future = asyncio.get_event_loop().create_future()
+        queue = self._queues.setdefault(chat_id, deque())
+        queue.append((method, future, make_request))
+
+        depth = self.get_queue_depth()
+        if depth > self._metrics['max_queue_depth']:
+            self._metrics['max_queue_depth'] = depth
+
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._drain_chat(bot, chat_id))
+
+        return await future
+
+    async def _drain_chat(self, bot: Bot, chat_id: int):
+        """Последовательно отправляет накопившиеся запросы одного чата"""
+        queue = self._queues[chat_id]
+        try:
+            while queue:
+                method, future, make_request = queue.popleft()
+                if future.done():
+                    continue
+
+                merged = []
+                if isinstance(method, SendMessage):
+                    method, merged = self._coalesce(bot, method, queue)
+
+                await self._get_chat_bucket(chat_id).acquire()
+                await self._get_global_bucket().acquire()
+
+                try:
+                    result = await self._send_with_retry(make_request, bot, method)
+                except Exception as e:
+                    self._metrics['failed'] += 1
+                    for waiter in [future] + merged:
+                        if not waiter.done():
+                            waiter.set_exception(e)
+                    continue
+
+                self._metrics['sent'] += 1
+                if not future.done():
+                    future.set_result(result)
+                for waiter in merged:
+                    if not waiter.done():
+                        waiter.set_result(CoalescedMessage(result))
+        finally:
+            del self._workers[chat_id]
+            if not queue:
+                del self._queues[chat_id]
+
+    def _coalesce(self, bot: Bot, head: SendMessage, queue: Deque) -> Tuple[SendMessage, List[asyncio.Future]]:
+        """
+        Склеивает head с ожидающими следом текстовыми сообщениями в тот же чат.
+        Клавиатура допустима только у последнего сообщения в склейке,
+        все остальные параметры отправки должны совпадать.
+        """
+        if head.reply_markup is not None:
+            return head, []
+
+        texts = [head.text]
+        merged_futures = []
+        reply_markup = None
+        head_params = self._merge_key(bot, head)
+
+        while queue:
+            method, future, _ = queue[0]
+            if not isinstance(method, SendMessage) or self._merge_key(bot, method) != head_params:
+                break
+            if sum(len(text) + 2 for text in texts) + len(method.text) > MAX_MESSAGE_LENGTH:
+                break
+
+            queue.popleft()
+            if future.done():
+                continue
+            texts.append(method.text)
+            merged_futures.append(future)
+
+            if method.reply_markup is not None:
+                reply_markup = method.reply_markup
+                break
+
+        if not merged_futures:
+            return head, []
+
+        self._metrics['coalesced'] += len(merged_futures)
+        merged = head.model_copy(update={'text': "\n\n".join(texts), 'reply_markup': reply_markup})
+        return merged, merged_futures
+
+    @staticmethod
+    def _merge_key(bot: Bot, method: SendMessage) -> Dict[str, Any]:
+        """Параметры сообщения, которые должны совпадать для склейки"""
+        params = method.model_dump(exclude={'text', 'reply_markup'})
+        for key, value in params.items():
+            if isinstance(value, Default):
+                params[key] = bot.default[value.name]
+        return params
+
+    async def _send_with_retry(self, make_request: NextRequestMiddlewareType, bot: Bot, method: TelegramMethod) -> Any:
+        """Выполняет запрос, повторяя его после паузы, которую запросил Telegram"""
+        attempt = 0
+        while True:
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                attempt += 1
+                if attempt > TELEGRAM_MAX_RETRIES:
+                    raise
+                self._metrics['retries'] += 1
+                logger.warning(
+                    f"Flood control для {type(method).__name__}, повтор через {e.retry_after} сек. "
+                    f"(попытка {attempt}/{TELEGRAM_MAX_RETRIES})"
+                )
+                await asyncio.sleep(e.retry_after)
+
+    def _get_chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= MAX_CHAT_BUCKETS:
+                self._prune_chat_buckets()
+            bucket = TokenBucket(TELEGRAM_CHAT_RATE, TELEGRAM_CHAT_BURST)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _prune_chat_buckets(self):
+        """Удаляет бакеты простаивающих чатов, чтобы словарь не рос бесконечно"""
+        idle_chats = [
+            chat_id for chat_id, bucket in self._chat_buckets.items()
+            if chat_id not in self._workers and bucket.is_full()
+        ]
+        for chat_id in idle_chats:
+            del self._chat_buckets[chat_id]
+
+    def _get_global_bucket(self) -> TokenBucket:
+        if self._global_bucket is None:
+            self._global_bucket = TokenBucket(TELEGRAM_GLOBAL_RATE, TELEGRAM_GLOBAL_BURST)
+        return self._global_bucket
+
+    def get_queue_depth(self) -> int:
+        """Количество запросов, ожидающих отправки во всех чатах"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Возвращает метрики очереди отправки"""
+        metrics = dict(self._metrics)
+        metrics['queue_depth'] = self.get_queue_depth()
+        metrics['active_chats'] = len(self._workers)
+        return metrics
+
+
+# Создаем глобальный экземпляр сервиса
+send_queue_service = SendQueueService()
@@ -0,0 +1,87 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import TRAINING_IDLE_TTL_MINUTES
+from services.answer_log_service import answer_log_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReapResult:
+    """Итог одного прохода по брошенным тренировкам"""
+    released: int = 0     # освобождено записей training_data
+    finalized: int = 0    # завершено сессий с ответами
+    discarded: int = 0    # удалено сессий без ответов
+
+    @property
+    def total(self) -> int:
+        return self.finalized + self.discarded
+
+
+class SessionReaperService:
+    """
+    Завершение брошенных тренировок. Тренировка считается брошенной, если пользователь
+    не отвечал дольше TRAINING_IDLE_TTL_MINUTES: ее данные удаляются из памяти, а сессия
+    завершается по ответам из журнала тем же путем, что и при восстановлении после перезапуска.
+    """
+
+    def __init__(self):
+        self.totals = ReapResult()
+
+    def release_idle(self, training_data: Dict[int, Dict], idle_before: datetime) -> int:
+        """Удаляет из training_data тренировки без активности с idle_before"""
+        idle_users = []
+        for user_id, data in training_data.items():
+            last_activity = data.get('last_activity')
+            if last_activity is None:
+                # Запись без отметки времени: отсчитываем простой с первой проверки
+                data['last_activity'] = datetime.utcnow()
+            elif last_activity < idle_before:
+                idle_users.append(user_id)
+
+        for user_id in idle_users:
+            del training_data[user_id]
+        return len(idle_users)
+
+    async def reap(self, session: AsyncSession, training_data: Dict[int, Dict],
+                   ttl_minutes: Optional[int] = None) -> ReapResult:
+        """
+        Завершает тренировки без активности дольше ttl_minutes (по умолчанию TRAINING_IDLE_TTL_MINUTES).
+        Сессии, которые еще есть в training_data, не трогаются.
+        """
+        ttl = timedelta(minutes=ttl_minutes if ttl_minutes is not None else TRAINING_IDLE_TTL_MINUTES)
+        idle_before = datetime.utcnow() - ttl
+        result = ReapResult()
+
+        result.released = self.release_idle(training_data, idle_before)
+
+        # Ответы брошенных тренировок могут еще лежать в буфере журнала
+        await answer_log_service.flush()
+
+        active_ids = [data['session_id'] for data in training_data.values() if data.get('session_id')]
+        result.finalized = await answer_log_service.finalize_sessions(
+            session, idle_before=idle_before, exclude_ids=active_ids
+        )
+        result.discarded = await answer_log_service.discard_empty_sessions(
+            started_before=idle_before, exclude_ids=active_ids
+        )
+
+        self.totals.released += result.released
+        self.totals.finalized += result.finalized
+        self.totals.discarded += result.discarded
+
+        if result.released or result.total:
+            logger.info(
+                f"Брошенные тренировки: освобождено {result.released}, завершено {result.finalized}, "
+                f"удалено пустых {result.discarded}"
+            )
+        return result
+
+
+# Создаем глобальный экземпляр сервиса
+session_reaper_service = SessionReaperService()
@@ -1,11 +1,19 @@
 import random
-from typing import List
+from typing import List, Optional
 
 class SupportPhrasesService:
     """Сервис для работы с поддерживающими фразами"""
     
     def __init__(self):
-        self._phrases = self._load_phrases()
+        # Фразы читаются из файла при первом обращении, а не при импорте
+        self._phrases: Optional[List[str]] = None
+    
+    @property
+    def phrases(self) -> List[str]:
+        """Список поддерживающих фраз (загружается один раз)"""
+        if self._phrases is None:
+            self._phrases = self._load_phrases()
+        return self._phrases
     
     def _load_phrases(self) -> List[str]:
         """Загружает список поддерживающих фраз из файла"""
@@ -34,7 +42,7 @@ class SupportPhrasesService:
     
     def get_random_phrase(self) -> str:
         """Возвращает случайную поддерживающую фразу"""
-        return random.choice(self._phrases)
+        return random.choice(self.phrases)
     
     def should_show_support_phrase(self, words_answered: int) -> bool:
         """Определяет, нужно ли показать поддерживающую фразу
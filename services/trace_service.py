@@ -0,0 +1,155 @@
+import gzip
+import json
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+logger = logging.getLogger(__name__)
+
+# Сколько записей копить в памяти перед дозаписью в файл
+TRACE_FLUSH_RECORDS = 100
+
+# Тексты кнопок главной клавиатуры: записываются как есть, остальной текст - только длиной
+TRACE_PUBLIC_TEXTS = (
+    "🎯 Начать тренировку",
+    "📚 Мой словарь",
+    "📊 Моя статистика",
+    "📊 Статистика",
+    "🏆 Рейтинг",
+    "⚙️ Настройки",
+    "❓ Помощь",
+)
+
+# Подстановка собственного telegram id пользователя в callback_data
+USER_PLACEHOLDER = "{user}"
+
+
+def describe_update(update: Update, user_index: Callable[[int], int]) -> Optional[Dict[str, Any]]:
+    """
+    Обезличенное описание обновления: тип, номер пользователя в трассе,
+    команда или кнопка (но не свободный текст), длина текста, форма callback_data.
+    Для остальных типов обновлений возвращает None.
+    """
+    if update.message is not None and update.message.from_user is not None:
+        message = update.message
+        text = message.text or ''
+        record = {
+            'k': 'message',
+            'u': user_index(message.from_user.id),
+            'ct': message.content_type,
+            'len': len(text),
+        }
+        if text in TRACE_PUBLIC_TEXTS:
+            record['text'] = text
+        elif text.startswith('/'):
+            # Аргументы команды могут содержать личные данные, сохраняем только саму команду
+            record['text'] = text.split()[0]
+        return record
+
+    if update.callback_query is not None:
+        callback = update.callback_query
+        return {
+            'k': 'callback_query',
+            'u': user_index(callback.from_user.id),
+            # Только id целиком: те же цифры внутри других чисел (id слова, курсор) не трогаем
+            'data': re.sub(rf'(?<!\d){callback.from_user.id}(?!\d)', USER_PLACEHOLDER, callback.data or ''),
+        }
+
+    return None
+
+
+class TraceRecorderService(BaseMiddleware):
+    """
+    Запись входящих обновлений в трассу для воспроизведения нагрузки (utils/replay_trace.py).
+    Подключается как outer middleware на dp.update, только если задан TRACE_RECORD_PATH.
+
+    Трасса - JSONL в gzip: в начале каждого запуска бота строка-заголовок сегмента,
+    затем по строке на обновление с интервалом от предыдущего обновления ('t', мс).
+    Telegram id не записываются: пользователи нумеруются по первому появлению в сегменте.
+    """
+
+    def __init__(self):
+        self._path: Optional[str] = None
+        self._buffer: List[str] = []
+        self._users: Dict[int, int] = {}
+        self._last_at: Optional[float] = None
+        self.recorded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._path is not None
+
+    def start(self, path: str):
+        """Начинает новый сегмент трассы в файле path (файл дописывается)"""
+        self._path = path
+        self._users = {}
+        self._last_at = None
+        self._buffer.append(json.dumps({'segment': datetime.utcnow().isoformat(timespec='seconds')}))
+
+    def _user_index(self, telegram_id: int) -> int:
+        return self._users.setdefault(telegram_id, len(self._users) + 1)
+
+    async def __call__(self, handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+                       event: Update, data: Dict[str, Any]) -> Any:
+        if self._path is not None:
+            try:
+                record = describe_update(event, self._user_index)
+            except Exception as e:
+                logger.error(f"Ошибка записи обновления в трассу: {e}")
+                record = None
+
+            if record is not None:
+                now = time.monotonic()
+                record['t'] = 0 if self._last_at is None else round((now - self._last_at) * 1000)
+                self._last_at = now
+                self._buffer.append(json.dumps(record, ensure_ascii=False))
+                self.recorded += 1
+                if len(self._buffer) >= TRACE_FLUSH_RECORDS:
+                    self.flush()
+
+        return await handler(event, data)
+
+    def flush(self):
+        """Дописывает накопленные записи в файл трассы"""
+        if not self._buffer or self._path is None:
+            return
+        lines, self._buffer = self._buffer, []
+        with gzip.open(self._path, 'at', encoding='utf-8') as file:
+            file.write("\n".join(lines) + "\n")
+
+    def stop(self):
+        """Записывает остаток буфера и прекращает запись"""
+        self.flush()
+        self._path = None
+
+
+def read_trace(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Читает трассу. Номера пользователей из разных сегментов не пересекаются:
+    'u' заменяется на сквозной номер пользователя по всей трассе.
+    """
+    users: Dict[tuple, int] = {}
+    segment = 0
+    with open(path, 'rb') as file:
+        compressed = file.read(2) == b'\x1f\x8b'
+    opener = gzip.open if compressed else open
+    with opener(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if 'segment' in record:
+                segment += 1
+                continue
+            record['u'] = users.setdefault((segment, record['u']), len(users) + 1)
+            yield record
+
+
+# Создаем глобальный экземпляр сервиса
+trace_recorder_service = TraceRecorderService()
@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import Dict, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import User, TrainingSession
+from services.answer_pack_service import answer_pack_service
+from services.daily_stats_service import daily_stats_service
+from services.leveling_service import leveling_service
+from services.word_service import WordService
+
+
+class TrainingResultsService:
+    """
+    Запись результатов завершенной тренировки. Один путь и для обычного завершения
+    (handlers/training_handler.py), и для тренировок, завершаемых по журналу ответов
+    (восстановление после перезапуска и брошенные тренировки).
+    """
+
+    async def save_training_results(self, session: AsyncSession, data: Dict) -> Tuple[int, bool]:
+        """
+        Намерение записи результатов тренировки: сессия, прогресс слов, личный словарь,
+        дневная сводка и стрик. Коммитит очередь записи, возвращает (новый_стрик, новый_рекорд).
+
+        data - данные тренировки как в training_data: session_id, answers ({'word', 'is_correct', ...}),
+        correct_answers, incorrect_words, training_mode; completed_at - время завершения
+        (по умолчанию сейчас, для завершения по журналу - время последнего ответа)
+        """
+        completed_at = data.get('completed_at') or datetime.utcnow()
+
+        # Обновляем сессию тренировки: слов в ней столько, сколько ответов (тренировку могли завершить досрочно)
+        session_query = select(TrainingSession).where(TrainingSession.id == data['session_id'])
+        training_session_result = await session.execute(session_query)
+        training_session = training_session_result.scalar_one()
+
+        training_session.words_total = len(data['answers'])
+        training_session.words_correct = data['correct_answers']
+        training_session.words_incorrect = len(data['answers']) - data['correct_answers']
+        training_session.completed_at = completed_at
+
+        # Обновляем прогресс только для обычных тренировок (не для тренировок выученных слов)
+        newly_learned = 0
+        if data.get('training_mode', 'new') != 'learned':
+            newly_learned = await WordService.update_words_progress(
+                session,
+                training_session.user_id,
+                [(answer_data['word'].id, answer_data['is_correct']) for answer_data in data['answers']]
+            )
+
+        user_result = await session.execute(select(User).where(User.id == training_session.user_id))
+        user = user_result.scalar_one()
+
+        # Неправильные слова - в личный словарь
+        if data.get('training_mode', 'new') != 'learned' and data['incorrect_words']:
+            for incorrect_word in data['incorrect_words']:
+                await WordService.add_word_to_user_dictionary(session, user.id, incorrect_word.id)
+
+        # Добавляем результаты в дневную сводку статистики
+        await daily_stats_service.record_training(
+            session,
+            user.id,
+            words_trained=training_session.words_total,
+            words_correct=data['correct_answers'],
+            words_learned=newly_learned,
+            day=completed_at.date()
+        )
+
+        # Обновляем стрик пользователя
+        new_streak, is_new_record = await leveling_service.update_streak(session, user)
+
+        # Ответы завершенной тренировки сворачиваются в одну запись (ANSWER_STORAGE=packed)
+        if answer_pack_service.enabled:
+            await answer_pack_service.pack_sessions(session, [training_session.id])
+
+        return new_streak, is_new_record
+
+
+# Создаем глобальный экземпляр сервиса
+training_results_service = TrainingResultsService()
@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Sequence
+
+from sqlalchemy import select, func, delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Word, UserWord, TrainingAnswer
+from services.answer_archive_service import answer_archive_service
+from services.answer_pack_service import answer_pack_service
+from services.word_search_service import word_search_service
+from services.write_queue_service import write_queue_service
+
+# Сколько id передавать в один запрос IN (...) (у SQLite ограничено число параметров)
+DELETE_CHUNK_SIZE = 500
+
+
+def _chunks(word_ids: Sequence[int], size: int = DELETE_CHUNK_SIZE) -> Iterator[List[int]]:
+    for start in range(0, len(word_ids), size):
+        yield list(word_ids[start:start + size])
+
+
+@dataclass
+class DeletionResult:
+    """Итог удаления или архивации слов"""
+    words: int = 0
+    user_words: int = 0
+    training_answers: int = 0
+    archived: bool = False
+
+
+class WordDeletionService:
+    """
+    Удаление слов каталога вместе со связанными записями.
+    Все изменения делаются запросами DELETE / UPDATE ... WHERE word_id IN (...)
+    без загрузки записей в память, одним намерением очереди записи (одна транзакция).
+
+    Файлы архива ответов только дописываются, поэтому слова, на которые ссылаются
+    архивные ответы, не удаляются, а всегда переносятся в архив слов.
+    """
+
+    async def count_references(self, session: AsyncSession, word_ids: Sequence[int]) -> Dict[str, int]:
+        """Сколько записей личных словарей, ответов (строками и упакованных) и ответов архива ссылаются на слова"""
+        counts = {'user_words': 0, 'training_answers': 0,
+                  'archived_answers': await answer_archive_service.count_word_answers(session, word_ids)}
+        for chunk in _chunks(word_ids):
+            user_words_result = await session.execute(
+                select(func.count(UserWord.id)).where(UserWord.word_id.in_(chunk))
+            )
+            answers_result = await session.execute(
+                select(func.count(TrainingAnswer.id)).where(TrainingAnswer.word_id.in_(chunk))
+            )
+            counts['user_words'] += user_words_result.scalar() or 0
+            counts['training_answers'] += answers_result.scalar() or 0
+        # Ответы упакованных тренировок тоже удаляются вместе со словами
+        counts['training_answers'] += await answer_pack_service.count_word_answers(session, word_ids)
+        return counts
+
+    async def delete_words(self, session: AsyncSession, word_ids: Sequence[int],
+                           archive: bool = False) -> DeletionResult:
+        """
+        Удаляет слова из каталога.
+
+        archive=False - слова удаляются вместе с записями личных словарей и ответами тренировок,
+        в том числе из упакованных тренировок.
+        archive=True - слова помечаются is_archived и перестают попадать в тренировки,
+        записи личных словарей удаляются, история ответов сохраняется.
+        Если на слова ссылаются ответы в архиве ответов, удаление заменяется архивацией
+        (result.archived).
+        """
+        word_ids = sorted(set(word_ids))
+        if not word_ids:
+            return DeletionResult(archived=archive)
+
+        if not archive and await answer_archive_service.count_word_answers(session, word_ids):
+            archive = True
+
+        async def intent(write_session: AsyncSession) -> DeletionResult:
+            result = DeletionResult(archived=archive)
+            for chunk in _chunks(word_ids):
+                user_words_result = await write_session.execute(
+                    delete(UserWord).where(UserWord.word_id.in_(chunk))
+                )
+                result.user_words += user_words_result.rowcount or 0
+
+                if archive:
+                    words_result = await write_session.execute(
+                        update(Word).where(Word.id.in_(chunk), Word.is_archived == False).values(
+                            is_archived=True, updated_at=datetime.utcnow()
+                        )
+                    )
+                else:
+                    answers_result = await write_session.execute(
+                        delete(TrainingAnswer).where(TrainingAnswer.word_id.in_(chunk))
+                    )
+                    result.training_answers += answers_result.rowcount or 0
+                    words_result = await write_session.execute(
+                        delete(Word).where(Word.id.in_(chunk))
+                    )
+                result.words += words_result.rowcount or 0
+
+            if not archive:
+                result.training_answers += await answer_pack_service.remove_words(write_session, word_ids)
+            return result
+
+        result = await write_queue_service.submit(intent)
+        word_search_service.invalidate()
+        return result
+
+    async def restore_words(self, session: AsyncSession, word_ids: Sequence[int]) -> int:
+        """Возвращает архивные слова в каталог"""
+        async def intent(write_session: AsyncSession) -> int:
+            restored = 0
+            for chunk in _chunks(sorted(set(word_ids))):
+                restore_result = await write_session.execute(
+                    update(Word).where(Word.id.in_(chunk), Word.is_archived == True).values(
+                        is_archived=False, updated_at=datetime.utcnow()
+                    )
+                )
+                restored += restore_result.rowcount or 0
+            return restored
+
+        restored = await write_queue_service.submit(intent)
+        word_search_service.invalidate()
+        return restored
+
+
+# Создаем глобальный экземпляр сервиса
+word_deletion_service = WordDeletionService()
@@ -0,0 +1,243 @@
+import csv
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import MORPHEME_TYPES
+from database.database import dialect_insert
+from database.models import Word
+from services.word_search_service import word_search_service
+from services.word_service import WordService
+from services.write_queue_service import write_queue_service
+
+# Сколько строк вставлять одним запросом
+IMPORT_BATCH_SIZE = 500
+
+# Поддерживаемые форматы файла
+IMPORT_FORMATS = ('csv', 'tsv', 'jsonl')
+
+# Столбцы файла импорта (обязательны первые три)
+IMPORT_COLUMNS = ('word', 'morpheme_type', 'puzzle_pattern', 'hidden_letters', 'explanation', 'difficulty_level')
+
+# Типы с выбором варианта ответа: шаблон со скобками, скрытые буквы не используются
+CHOICE_MORPHEME_TYPES = ('spelling', 'stress', 'ne_particle')
+
+WORD_RE = re.compile(r'^[а-яёА-ЯЁa-zA-Z\-\s]+$')
+
+
+@dataclass
+class ImportRowError:
+    """Ошибка в строке файла импорта"""
+    line: int
+    word: str
+    message: str
+
+
+@dataclass
+class ImportReport:
+    """Итог импорта слов"""
+    total: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    errors: List[ImportRowError] = field(default_factory=list)
+
+    def format_errors(self) -> str:
+        """Отчет об ошибках по строкам: строка<TAB>слово<TAB>ошибка"""
+        lines = ["line\tword\terror"]
+        lines += [f"{error.line}\t{error.word}\t{error.message}" for error in self.errors]
+        return "\n".join(lines) + "\n"
+
+
+def detect_format(filename: str) -> Optional[str]:
+    """Определяет формат по расширению файла"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension == 'txt':
+        return 'tsv'
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def iter_rows(file: TextIO, file_format: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Построчно читает файл и возвращает пары (номер строки, словарь полей).
+    Файл не загружается в память целиком.
+    """
+    if file_format == 'jsonl':
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, {'_error': f"некорректный JSON: {e.msg}"}
+                continue
+            if not isinstance(row, dict):
+                yield line_number, {'_error': "строка должна быть JSON-объектом"}
+                continue
+            yield line_number, row
+        return
+
+    if file_format not in ('csv', 'tsv'):
+        raise ValueError(f"Неподдерживаемый формат файла: {file_format}")
+
+    reader = csv.DictReader(file, delimiter='\t' if file_format == 'tsv' else ',')
+    for row in reader:
+        if not any(value for value in row.values() if isinstance(value, str)):
+            continue
+        yield reader.line_num, row
+
+
+def _clean(value) -> str:
+    return str(value).strip() if value is not None else ''
+
+
+def validate_row(row: Dict) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Проверяет строку импорта по тем же правилам, что и пошаговое добавление слова.
+    Возвращает (значения для таблицы words, None) или (None, текст ошибки)
+    """
+    if '_error' in row:
+        return None, row['_error']
+
+    word = _clean(row.get('word'))  # НЕ применяем .lower() чтобы сохранить ударения!
+    morpheme_type = _clean(row.get('morpheme_type')) or 'roots'
+    pattern = _clean(row.get('puzzle_pattern'))
+    hidden_letters = _clean(row.get('hidden_letters')).lower()
+    explanation = _clean(row.get('explanation'))
+    difficulty = _clean(row.get('difficulty_level')) or '1'
+
+    if not WORD_RE.match(word) or len(word) < 2:
+        return None, "слово должно содержать только буквы, дефисы или пробелы и быть длиной минимум 2 символа"
+    if morpheme_type not in MORPHEME_TYPES:
+        return None, f"неизвестный тип морфемы '{morpheme_type}'"
+    if not pattern:
+        return None, "не указан шаблон"
+    if not difficulty.isdigit() or not 1 <= int(difficulty) <= 5:
+        return None, "уровень сложности должен быть числом от 1 до 5"
+
+    if morpheme_type in CHOICE_MORPHEME_TYPES:
+        if '(' not in pattern or ')' not in pattern:
+            return None, "шаблон должен содержать скобки вокруг спорной части"
+
+        base = pattern.replace('(', '').replace(')', '')
+        if morpheme_type == 'stress':
+            # Шаблон без скобок - то же слово, ударная буква в слове - заглавная
+            if base.lower() != word.lower():
+                return None, "шаблон без скобок не совпадает со словом"
+            if word == word.lower():
+                return None, "в слове не отмечена ударная (заглавная) буква"
+        else:
+            # Слитное, раздельное и дефисное написание отличаются только пробелами и дефисами
+            if re.sub(r'[\s\-]', '', base).lower() != re.sub(r'[\s\-]', '', word).lower():
+                return None, "шаблон без скобок не совпадает со словом"
+        hidden_letters = ''
+    else:
+        if '_' not in pattern:
+            return None, "в шаблоне должен быть хотя бы один пропуск '_'"
+        if len(pattern) != len(word):
+            return None, "длина шаблона не совпадает с длиной слова"
+        if not hidden_letters:
+            hidden_letters = ''.join(word[i] for i, char in enumerate(pattern) if char == '_').lower()
+        if not WordService.validate_word_pattern(word, pattern, hidden_letters):
+            return None, "шаблон или скрытые буквы не совпадают со словом"
+
+    return {
+        'word': word,
+        'definition': "",
+        'explanation': explanation,
+        'morpheme_type': morpheme_type,
+        'puzzle_pattern': pattern,
+        'hidden_letters': hidden_letters,
+        'difficulty_level': int(difficulty),
+        'is_archived': False,
+    }, None
+
+
+class WordImportService:
+    """Пакетный импорт слов из CSV / TSV / JSONL"""
+
+    async def import_rows(self, session: AsyncSession, rows: Iterable[Tuple[int, Dict]],
+                          batch_size: int = IMPORT_BATCH_SIZE, update_existing: bool = False) -> ImportReport:
+        """
+        Проверяет строки и вставляет их пачками по batch_size
+        (INSERT ... ON CONFLICT (word) DO NOTHING / DO UPDATE), каждая пачка - своим намерением очереди записи.
+        """
+        report = ImportReport()
+        batch: Dict[str, Dict] = {}
+        batch_lines: Dict[str, int] = {}
+
+        for line_number, row in rows:
+            report.total += 1
+            values, error = validate_row(row)
+            if error:
+                report.errors.append(ImportRowError(line_number, _clean(row.get('word')), error))
+                continue
+
+            word = values['word']
+            if word in batch:
+                report.errors.append(ImportRowError(
+                    line_number, word, f"повтор слова из строки {batch_lines[word]}, используется последняя строка"
+                ))
+            batch[word] = values
+            batch_lines[word] = line_number
+
+            if len(batch) >= batch_size:
+                await self._flush(session, batch, report, update_existing)
+                batch, batch_lines = {}, {}
+
+        if batch:
+            await self._flush(session, batch, report, update_existing)
+
+        return report
+
+    async def _flush(self, session: AsyncSession, batch: Dict[str, Dict], report: ImportReport,
+                     update_existing: bool):
+        existing_query = select(Word.word).where(Word.word.in_(list(batch)))
+        existing_result = await session.execute(existing_query)
+        existing = set(existing_result.scalars().all())
+
+        insert = dialect_insert(session)
+        statement = insert(Word)
+        if update_existing:
+            # is_archived не обновляется: повторный импорт не должен возвращать слова из архива
+            statement = statement.on_conflict_do_update(
+                index_elements=[Word.word],
+                set_={
+                    column: statement.excluded[column]
+                    for column in ('explanation', 'morpheme_type', 'puzzle_pattern',
+                                   'hidden_letters', 'difficulty_level', 'updated_at')
+                }
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=[Word.word])
+
+        await write_queue_service.submit(lambda write_session: write_session.execute(statement, list(batch.values())))
+        word_search_service.invalidate()
+
+        report.inserted += len(batch) - len(existing)
+        if update_existing:
+            report.updated += len(existing)
+        else:
+            report.skipped += len(existing)
+
+    async def import_file(self, session: AsyncSession, path: str, file_format: Optional[str] = None,
+                          batch_size: int = IMPORT_BATCH_SIZE, update_existing: bool = False) -> ImportReport:
+        """Импортирует слова из файла на диске, читая его построчно"""
+        if file_format is None:
+            file_format = detect_format(path)
+        if file_format not in IMPORT_FORMATS:
+            raise ValueError(f"Неподдерживаемый формат файла: {path}")
+
+        with open(path, 'r', encoding='utf-8-sig', newline='') as file:
+            return await self.import_rows(
+                session, iter_rows(file, file_format), batch_size=batch_size, update_existing=update_existing
+            )
+
+
+# Создаем глобальный экземпляр сервиса
+word_import_service = WordImportService()
@@ -0,0 +1,208 @@
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Word
+
+# Как часто сверять версию каталога с базой (слова могли измениться из другого процесса)
+CATALOG_CHECK_SECONDS = 60
+
+# Минимальное сходство по триграммам для поиска с опечатками
+FUZZY_MIN_SIMILARITY = 0.3
+
+# Ранги совпадений: чем больше, тем выше в выдаче
+MATCH_EXACT = 'exact'
+MATCH_PREFIX = 'prefix'
+MATCH_SUBSTRING = 'substring'
+MATCH_FUZZY = 'fuzzy'
+
+_MATCH_RANK = {
+    MATCH_EXACT: 3,
+    MATCH_PREFIX: 2,
+    MATCH_SUBSTRING: 1,
+    MATCH_FUZZY: 0,
+}
+
+
+def normalize(text: str) -> str:
+    """Приводит слово к виду для поиска: нижний регистр (ударения не мешают), ё -> е"""
+    return " ".join(text.lower().replace('ё', 'е').split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Триграммы слова с границами: '  с', ' сл', 'сло', ..., 'во '"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class SearchResult:
+    """Найденное слово"""
+    word_id: int
+    word: str
+    morpheme_type: str
+    match: str
+    score: float
+
+
+class WordSearchIndex:
+    """Триграммный индекс и отсортированный список слов для поиска по префиксу"""
+
+    def __init__(self, words: List[Tuple[int, str, str]]):
+        self.words: Dict[int, Tuple[str, str]] = {}
+        self.normalized: Dict[int, str] = {}
+        self.by_normalized: Dict[str, List[int]] = defaultdict(list)
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.trigram_counts: Dict[int, int] = {}
+
+        for word_id, word, morpheme_type in words:
+            text = normalize(word)
+            self.words[word_id] = (word, morpheme_type)
+            self.normalized[word_id] = text
+            self.by_normalized[text].append(word_id)
+            word_trigrams = trigrams(text)
+            self.trigram_counts[word_id] = len(word_trigrams)
+            for trigram in word_trigrams:
+                self.postings[trigram].append(word_id)
+
+        self.sorted_words: List[Tuple[str, int]] = sorted((text, word_id) for word_id, text in self.normalized.items())
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def prefix(self, query: str) -> List[int]:
+        """Слова, начинающиеся с query (бинарный поиск по отсортированному списку)"""
+        start = bisect_left(self.sorted_words, (query, -1))
+        result = []
+        for text, word_id in self.sorted_words[start:]:
+            if not text.startswith(query):
+                break
+            result.append(word_id)
+        return result
+
+    def substring(self, query: str) -> List[int]:
+        """Слова, содержащие query: пересечение списков триграмм и проверка вхождения"""
+        # Границы слова в запросе не нужны: ищем вхождение, а не целое слово
+        inner = [query[i:i + 3] for i in range(len(query) - 2)]
+        if not inner:
+            return [word_id for word_id, text in self.normalized.items() if query in text]
+
+        postings = sorted((self.postings.get(trigram, []) for trigram in set(inner)), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return [word_id for word_id in candidates if query in self.normalized[word_id]]
+
+    def fuzzy(self, query: str, min_similarity: float = FUZZY_MIN_SIMILARITY) -> List[Tuple[int, float]]:
+        """Слова, похожие на query: доля общих триграмм (коэффициент Жаккара)"""
+        query_trigrams = trigrams(query)
+        common = Counter()
+        for trigram in query_trigrams:
+            common.update(self.postings.get(trigram, ()))
+
+        result = []
+        for word_id, shared in common.items():
+            similarity = shared / (len(query_trigrams) + self.trigram_counts[word_id] - shared)
+            if similarity >= min_similarity:
+                result.append((word_id, similarity))
+        return result
+
+
+class WordSearchService:
+    """
+    Поиск слов каталога (кроме архивных) для админки: точный, по префиксу, по подстроке и с опечатками.
+    Индекс строится в памяти и перестраивается при смене версии каталога
+    (вызов invalidate() после изменений или изменение количества, максимального id
+    или времени последнего изменения слов - так замечаются правки из других процессов).
+    """
+
+    def __init__(self):
+        self._index: Optional[WordSearchIndex] = None
+        self._version: Optional[Tuple[int, int, Optional[datetime]]] = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        """Сбрасывает индекс после изменения каталога слов"""
+        self._index = None
+
+    async def _catalog_version(self, session: AsyncSession) -> Tuple[int, int, Optional[datetime]]:
+        result = await session.execute(select(func.count(Word.id), func.max(Word.id), func.max(Word.updated_at)))
+        count, max_id, updated_at = result.one()
+        return count or 0, max_id or 0, updated_at
+
+    async def get_index(self, session: AsyncSession) -> WordSearchIndex:
+        """Возвращает актуальный индекс, при необходимости перестраивая его"""
+        now = time.monotonic()
+        if self._index is not None and now - self._checked_at < CATALOG_CHECK_SECONDS:
+            return self._index
+
+        version = await self._catalog_version(session)
+        if self._index is None or version != self._version:
+            result = await session.execute(
+                select(Word.id, Word.word, Word.morpheme_type).where(Word.is_archived == False)
+            )
+            self._index = WordSearchIndex(result.all())
+            self._version = version
+        self._checked_at = now
+        return self._index
+
+    async def search(self, session: AsyncSession, query: str, limit: int = 10,
+                     morpheme_type: Optional[str] = None) -> List[SearchResult]:
+        """Ищет слова и возвращает их по убыванию релевантности"""
+        query = normalize(query)
+        if not query:
+            return []
+
+        index = await self.get_index(session)
+
+        matches: Dict[int, Tuple[str, float]] = {}
+
+        def add(word_id: int, match: str, score: float):
+            current = matches.get(word_id)
+            if current is None or (_MATCH_RANK[match], score) > (_MATCH_RANK[current[0]], current[1]):
+                matches[word_id] = (match, score)
+
+        for word_id in index.by_normalized.get(query, []):
+            add(word_id, MATCH_EXACT, 1.0)
+        for word_id in index.prefix(query):
+            add(word_id, MATCH_PREFIX, len(query) / len(index.normalized[word_id]))
+        for word_id in index.substring(query):
+            add(word_id, MATCH_SUBSTRING, len(query) / len(index.normalized[word_id]))
+        # Поиск с опечатками нужен, только если точных совпадений мало
+        if len(matches) < limit:
+            for word_id, similarity in index.fuzzy(query):
+                add(word_id, MATCH_FUZZY, similarity)
+
+        results = []
+        for word_id, (match, score) in matches.items():
+            word, word_morpheme_type = index.words[word_id]
+            if morpheme_type and word_morpheme_type != morpheme_type:
+                continue
+            results.append(SearchResult(word_id, word, word_morpheme_type, match, score))
+
+        results.sort(key=lambda result: (-_MATCH_RANK[result.match], -result.score, result.word))
+        return results[:limit]
+
+    async def find_exact(self, session: AsyncSession, text: str) -> Optional[int]:
+        """
+        id слова, совпадающего с text: сначала с учетом регистра (ударения),
+        затем без учета регистра и разницы е/ё. None, если совпадений нет или их несколько.
+        """
+        index = await self.get_index(session)
+        candidates = index.by_normalized.get(normalize(text), [])
+        for word_id in candidates:
+            if index.words[word_id][0] == text.strip():
+                return word_id
+        return candidates[0] if len(candidates) == 1 else None
+
+
+# Создаем глобальный экземпляр сервиса
+word_search_service = WordSearchService()
@@ -256,6 +256,7 @@ class WordService:
         if remaining_slots > 0:
             # Получаем новые слова, которых нет в личном словаре пользователя
             new_words_query = select(Word).where(
+                Word.is_archived == False,
                 ~Word.id.in_(
                     select(UserWord.word_id).where(UserWord.user_id == user_id)
                 )
@@ -300,6 +301,7 @@ class WordService:
             # Получаем новые слова определенного типа, которых нет в личном словаре пользователя
             new_words_query = select(Word).where(
                 Word.morpheme_type == morpheme_type,
+                Word.is_archived == False,
                 ~Word.id.in_(
                     select(UserWord.word_id).where(UserWord.user_id == user_id)
                 )
@@ -377,6 +379,7 @@ class WordService:
     async def add_word_to_user_dictionary(session: Session, user_id: int, word_id: int):
         """
         Добавляет слово в личный словарь пользователя после ошибки
+        (коммит остается за вызывающим кодом)
         """
         from datetime import datetime, timedelta
         from config import REPETITION_INTERVALS
@@ -405,58 +408,54 @@ class WordService:
                 next_repetition=datetime.utcnow() + timedelta(minutes=REPETITION_INTERVALS[0])
             )
             session.add(new_user_word)
-        
-        await session.commit()
     
     @staticmethod
     async def update_word_progress(session: Session, user_id: int, word_id: int, is_correct: bool):
         """
         Обновляет прогресс изучения слова
+        Следующий интервал рассчитывает планировщик повторений (services/repetition_scheduler.py).
         Слово считается выученным при:
         1) Прохождении всех 7 интервалов повторения ИЛИ
         2) После 5 правильных ответов в тренировках
         """
-        from datetime import datetime, timedelta
-        from config import REPETITION_INTERVALS
+        await WordService.update_words_progress(session, user_id, [(word_id, is_correct)])
+    
+    @staticmethod
+    async def update_words_progress(session: Session, user_id: int, results: List[Tuple[int, bool]]) -> int:
+        """
+        Обновляет прогресс сразу по всем ответам тренировки:
+        один запрос за записями словаря и один пакетный расчет интервалов.
+        Коммит остается за вызывающим кодом.
         
-        user_word_query = select(UserWord).where(
+        Args:
+            session: сессия базы данных
+            user_id: ID пользователя
+            results: список пар (word_id, is_correct)
+        
+        Returns:
+            количество слов, ставших выученными
+        """
+        from services.repetition_scheduler import repetition_scheduler
+        
+        if not results:
+            return 0
+        
+        user_words_query = select(UserWord).where(
             UserWord.user_id == user_id,
-            UserWord.word_id == word_id
+            UserWord.word_id.in_([word_id for word_id, _ in results])
         )
-        user_word = await session.execute(user_word_query)
-        user_word = user_word.scalar_one_or_none()
+        user_words_result = await session.execute(user_words_query)
+        user_words_by_word = {user_word.word_id: user_word for user_word in user_words_result.scalars().all()}
         
-        if not user_word:
-            return
-            
-        user_word.last_reviewed = datetime.utcnow()
+        # Слова, которых еще нет в личном словаре, пропускаем
+        user_words = []
+        outcomes = []
+        for word_id, is_correct in results:
+            user_word = user_words_by_word.get(word_id)
+            if user_word is not None:
+                user_words.append(user_word)
+                outcomes.append(is_correct)
         
-        if is_correct:
-            # Увеличиваем счетчик правильных ответов
-            user_word.correct_answers_count += 1
-            
-            # Переходим к следующему интервалу
-            next_interval_index = min(
-                user_word.current_interval_index + 1,
-                len(REPETITION_INTERVALS) - 1
-            )
-            user_word.current_interval_index = next_interval_index
-            
-            # Проверяем условия для пометки слова как выученного:
-            # 1) Прошли все интервалы ИЛИ 2) Дали 5 правильных ответов
-            if (next_interval_index == len(REPETITION_INTERVALS) - 1) or (user_word.correct_answers_count >= 5):
-                user_word.is_learned = True
-                
-            user_word.next_repetition = datetime.utcnow() + timedelta(
-                minutes=REPETITION_INTERVALS[next_interval_index]
-            )
-        else:
-            # При ошибке сбрасываем интервал на начало и увеличиваем счетчик ошибок
-            # Счетчик правильных ответов НЕ сбрасываем, так как это независимый критерий
-            user_word.current_interval_index = 0
-            user_word.mistakes_count += 1
-            user_word.next_repetition = datetime.utcnow() + timedelta(
-                minutes=REPETITION_INTERVALS[0]
-            )
+        newly_learned = repetition_scheduler.review_words(user_words, outcomes)
         
-        await session.commit() 
\ No newline at end of file
+        return newly_learned 
\ No newline at end of file
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import WRITE_QUEUE
+from database.database import engine, async_session
+from services.query_profiler_service import current_handler
+
+logger = logging.getLogger(__name__)
+
+# Сколько писатель ждет новые намерения, прежде чем закоммитить пачку, с
+WRITE_QUEUE_BATCH_SECONDS = 0.005
+
+# Больше намерений в одну транзакцию не собирается
+WRITE_QUEUE_MAX_BATCH = 100
+
+# Намерение записи: корутина, которая меняет базу через переданную сессию и не коммитит
+WriteIntent = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class WriteQueueService:
+    """
+    Единственный писатель для SQLite. Обработчики не коммитят сами, а отправляют
+    намерения записи (submit): фоновая задача собирает намерения, пришедшие
+    за WRITE_QUEUE_BATCH_SECONDS, выполняет их по очереди в одной сессии и делает
+    один коммит на всю пачку (групповой коммит), после чего отдает результаты.
+    Так за блокировку записи SQLite не спорят десятки одновременных транзакций.
+
+    Если намерение падает, пачка откатывается и намерения выполняются заново
+    каждое в своей транзакции: ошибка достается только своему вызывающему.
+    Поэтому намерение не должно иметь побочных эффектов вне сессии - их
+    вызывающий код выполняет после того, как submit вернул результат.
+
+    Включается WRITE_QUEUE=on, по умолчанию (auto) - только для SQLite.
+    Пока писатель не запущен (утилиты, замеры), submit сразу выполняет
+    намерение в отдельной транзакции.
+    """
+
+    def __init__(self, mode: str = WRITE_QUEUE):
+        self.enabled = mode == 'on' or (mode == 'auto' and engine.dialect.name == 'sqlite')
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self.metrics = {'intents': 0, 'batches': 0, 'max_batch': 0, 'retried_batches': 0, 'failed': 0}
+
+    async def _execute_alone(self, intent: WriteIntent) -> Any:
+        async with async_session() as session:
+            result = await intent(session)
+            await session.commit()
+            return result
+
+    async def submit(self, intent: WriteIntent) -> Any:
+        """Выполняет намерение записи (в общей транзакции, если писатель запущен) и возвращает его результат"""
+        if self._writer is None:
+            return await self._execute_alone(intent)
+
+        # Намерение выполняется в задаче писателя: запросы записываем на обработчик, который его отправил
+        handler = current_handler.get()
+
+        async def attributed(session: AsyncSession) -> Any:
+            token = current_handler.set(handler)
+            try:
+                return await intent(session)
+            finally:
+                current_handler.reset(token)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((attributed, future))
+        return await future
+
+    async def _commit_batch(self, batch: List[Tuple[WriteIntent, asyncio.Future]]):
+        """Выполняет пачку намерений одной транзакцией и отдает результаты вызывающим"""
+        try:
+            results = []
+            async with async_session() as session:
+                for intent, _ in batch:
+                    results.append(await intent(session))
+                await session.commit()
+        except Exception as e:
+            if len(batch) == 1:
+                self.metrics['failed'] += 1
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+                return
+
+            # Откатили всю пачку: повторяем по одному, чтобы ошибка досталась только виновному
+            self.metrics['retried_batches'] += 1
+            logger.warning(f"Пачка из {len(batch)} намерений записи откатилась ({e}), выполняем по одному")
+            for item in batch:
+                await self._commit_batch([item])
+            return
+
+        for (_, future), result in zip(batch, results):
+            # Вызывающий мог быть отменен, пока пачка писалась
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = loop.time() + WRITE_QUEUE_BATCH_SECONDS
+            while len(batch) < WRITE_QUEUE_MAX_BATCH:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self.metrics['intents'] += len(batch)
+            self.metrics['batches'] += 1
+            self.metrics['max_batch'] = max(self.metrics['max_batch'], len(batch))
+            try:
+                await self._commit_batch(batch)
+            except Exception as e:
+                # Сюда попадают только сбои самого писателя: вызывающие не должны ждать вечно
+                logger.error(f"Ошибка очереди записи: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def start(self):
+        """Запускает писателя (только если очередь включена)"""
+        if self.enabled and self._writer is None:
+            self._queue = asyncio.Queue()
+            self._writer = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Дописывает намерения, которые уже в очереди, и останавливает писателя"""
+        if self._writer is not None:
+            # Новые намерения с этого момента выполняются сразу, мимо очереди
+            writer, self._writer = self._writer, None
+            self._queue.put_nowait(None)
+            await writer
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Счетчики писателя: намерений, коммитов и средний размер пачки"""
+        metrics = dict(self.metrics)
+        metrics['queue_depth'] = self._queue.qsize() if self._queue is not None else 0
+        metrics['avg_batch'] = metrics['intents'] / metrics['batches'] if metrics['batches'] else 0.0
+        return metrics
+
+
+# Создаем глобальный экземпляр сервиса
+write_queue_service = WriteQueueService()
@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Тесты работают с отдельной временной базой, а не с базой бота
+os.environ.setdefault(
+    "DATABASE_URL", "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(prefix="vocabulary_bot_tests_"), "test.db")
+)
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.models import Base
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    """Асинхронный движок пустой базы SQLite с текущей схемой (своя база у каждого теста)"""
+    path = tmp_path / "test.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+    return create_async_engine(f"sqlite+aiosqlite:///{path}")
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+import pytest
+
+from services.answer_archive_service import _block_rows, decode_block, encode_block
+
+
+def make_rows():
+    return [
+        {'id': None, 'session_id': 7, 'user_id': 3, 'word_id': 12, 'user_answer': 'е',
+         'is_correct': True, 'answered_at': datetime(2024, 1, 31, 23, 59, 59, 999999)},
+        {'id': 101, 'session_id': 5, 'user_id': 3, 'word_id': 40, 'user_answer': 'ударЕние',
+         'is_correct': False, 'answered_at': datetime(2024, 1, 2, 10, 0)},
+        {'id': 102, 'session_id': 5, 'user_id': 3, 'word_id': 41, 'user_answer': None,
+         'is_correct': True, 'answered_at': datetime(2024, 1, 2, 10, 0, 1)},
+        {'id': 250, 'session_id': 9, 'user_id': 8, 'word_id': 2 ** 31 - 1, 'user_answer': '',
+         'is_correct': False, 'answered_at': datetime(2024, 1, 1, 0, 0)},
+    ]
+
+
+def test_block_round_trip():
+    rows = make_rows()
+
+    block = decode_block(encode_block(rows))
+
+    assert _block_rows(block, range(len(rows))) == rows
+
+
+def test_block_round_trip_many_rows():
+    rows = [
+        {'id': 1000 + i, 'session_id': 1 + i // 10, 'user_id': 1 + i % 7, 'word_id': i % 500,
+         'user_answer': 'ответ' * (i % 3), 'is_correct': i % 3 == 0,
+         'answered_at': datetime(2024, 3, 1, 12, 0, i % 60, i)}
+        for i in range(1000)
+    ]
+
+    block = decode_block(encode_block(rows))
+
+    assert len(block['id']) == len(rows)
+    assert _block_rows(block, range(len(rows))) == rows
+
+
+def test_decode_rejects_damaged_block():
+    data = bytearray(encode_block(make_rows()))
+    data[:4] = b'XXXX'
+
+    with pytest.raises(ValueError):
+        decode_block(bytes(data))
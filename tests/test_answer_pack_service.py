@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import TrainingAnswer, TrainingAnswerPack, TrainingSession
+from services.answer_pack_service import AnswerPackService, decode_answers, encode_answers
+
+STARTED_AT = datetime(2024, 5, 1, 9, 30)
+
+
+def make_answers(count: int, first_word_id: int = 1, first_second: int = 1):
+    return [
+        {
+            'word_id': first_word_id + index * 997,
+            'is_correct': index % 3 != 0,
+            'answered_at': STARTED_AT + timedelta(seconds=first_second + 5 * index, milliseconds=index),
+            'user_answer': f"ответ {index}" if index % 3 == 0 else None,
+        }
+        for index in range(count)
+    ]
+
+
+def test_encode_decode_round_trip():
+    answers = make_answers(20)
+
+    assert decode_answers(encode_answers(answers, STARTED_AT), STARTED_AT) == answers
+
+
+def test_decode_keeps_order_for_answers_in_the_same_millisecond():
+    answers = make_answers(3)
+    for answer in answers:
+        answer['answered_at'] = STARTED_AT
+
+    decoded = decode_answers(encode_answers(answers, STARTED_AT), STARTED_AT)
+
+    assert [answer['word_id'] for answer in decoded] == [answer['word_id'] for answer in answers]
+    assert all(answer['answered_at'] == STARTED_AT for answer in decoded)
+
+
+def test_pack_sessions_moves_rows_into_one_pack(db_engine):
+    first, second = make_answers(9), make_answers(4, first_word_id=5, first_second=60)
+
+    async def run():
+        service = AnswerPackService('packed')
+        async with AsyncSession(db_engine) as session:
+            await session.execute(insert(TrainingSession).values(
+                id=1, user_id=1, session_type='new_words', started_at=STARTED_AT, completed_at=STARTED_AT
+            ))
+            await session.execute(insert(TrainingAnswer), [
+                {**answer, 'session_id': 1, 'user_answer': answer['user_answer'] or 'верно'} for answer in first
+            ])
+            packed_first = await service.pack_sessions(session, [1])
+
+            # Строки, дописанные после упаковки, добавляются к той же записи
+            await session.execute(insert(TrainingAnswer), [
+                {**answer, 'session_id': 1, 'user_answer': answer['user_answer'] or 'верно'} for answer in second
+            ])
+            packed_second = await service.pack_sessions(session, [1])
+            await session.commit()
+
+            rows_left = (await session.execute(select(func.count(TrainingAnswer.id)))).scalar()
+            pack = (await session.execute(select(TrainingAnswerPack))).scalar_one()
+            answers = await service.get_answers(session, 1)
+        await db_engine.dispose()
+        return packed_first, packed_second, rows_left, pack, answers
+
+    packed_first, packed_second, rows_left, pack, answers = asyncio.run(run())
+
+    assert (packed_first, packed_second, rows_left) == (9, 4, 0)
+    assert pack.answers_count == 13
+    assert pack.correct_count == sum(1 for answer in first + second if answer['is_correct'])
+    assert answers == first + second
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import database.migrations as migrations
+from database.database import BASELINE_SCHEMA_VERSION, SCHEMA_VERSION
+from database.models import MigrationCheckpoint, SchemaVersion, User
+
+USERS = 10
+BATCH_SIZE = 3
+
+
+def test_upgrade_resumes_batch_step_from_checkpoint(db_engine, monkeypatch):
+    processed = []
+    interrupt = {'after_batches': 2}
+
+    async def process_batch(connection, after_id: int, to_id: int):
+        if len(processed) == interrupt['after_batches']:
+            raise RuntimeError("сервер перезапущен")
+        await connection.execute(update(User).where(User.id > after_id, User.id <= to_id).values(level=User.level + 1))
+        processed.append((after_id, to_id))
+
+    async def bump_levels(ctx: migrations.MigrationContext):
+        await ctx.batches('users_level', User.id, process_batch)
+
+    monkeypatch.setattr(migrations, 'engine', db_engine)
+    monkeypatch.setattr(migrations, 'MIGRATIONS', [migrations.Migration(SCHEMA_VERSION, "Тестовая миграция", bump_levels)])
+
+    async def state():
+        async with AsyncSession(db_engine) as session:
+            version = (await session.execute(select(func.max(SchemaVersion.version)))).scalar()
+            checkpoints = (await session.execute(
+                select(MigrationCheckpoint.last_id, MigrationCheckpoint.rows_done)
+            )).all()
+            levels = (await session.execute(select(User.level).order_by(User.id))).scalars().all()
+        return version, [tuple(checkpoint) for checkpoint in checkpoints], levels
+
+    async def run():
+        async with AsyncSession(db_engine) as session:
+            await session.execute(insert(User), [{'telegram_id': 1000 + index, 'level': 1} for index in range(USERS)])
+            await session.commit()
+
+        # Первый запуск прерывается на третьей пачке: две пачки и контрольная точка уже зафиксированы
+        with pytest.raises(RuntimeError):
+            await migrations.upgrade(batch_size=BATCH_SIZE, progress=lambda *args: None)
+        interrupted = await state()
+
+        interrupt['after_batches'] = None
+        applied = await migrations.upgrade(batch_size=BATCH_SIZE, progress=lambda *args: None)
+        finished = await state()
+        await db_engine.dispose()
+        return interrupted, applied, finished
+
+    interrupted, applied, finished = asyncio.run(run())
+
+    # База уже с данными, но без учета версий: отсчет миграций с базовой версии
+    assert interrupted == (BASELINE_SCHEMA_VERSION, [(6, 6)], [2] * 6 + [1] * 4)
+    assert [item.version for item in applied] == [SCHEMA_VERSION]
+    # Второй запуск продолжил с id 6: каждая строка обработана ровно один раз
+    assert processed == [(0, 3), (3, 6), (6, 9), (9, 10)]
+    assert finished == (SCHEMA_VERSION, [], [2] * USERS)
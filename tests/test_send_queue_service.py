@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums import ParseMode
+from aiogram.methods import AnswerCallbackQuery, SendMessage
+
+from services.send_queue_service import CoalescedMessage, SendQueueService
+
+
+class FakeTelegram:
+    """Вместо запросов к Telegram запоминает отправленные методы"""
+
+    def __init__(self):
+        self.methods = []
+
+    async def make_request(self, bot, method):
+        self.methods.append(method)
+        return f"message-{len(self.methods)}"
+
+
+class CountingBucket:
+    def __init__(self):
+        self.acquired = 0
+
+    async def acquire(self):
+        self.acquired += 1
+
+
+def make_bot() -> Bot:
+    return Bot(token="42:TEST", default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+
+
+def test_concurrent_send_messages_are_coalesced():
+    async def run():
+        service = SendQueueService()
+        telegram = FakeTelegram()
+        bot = make_bot()
+        results = await asyncio.gather(
+            service(telegram.make_request, bot, SendMessage(chat_id=1, text="первое")),
+            service(telegram.make_request, bot, SendMessage(chat_id=1, text="второе")),
+        )
+        await bot.session.close()
+        return service, telegram, results
+
+    service, telegram, (first, second) = asyncio.run(run())
+
+    assert [method.text for method in telegram.methods] == ["первое\n\nвторое"]
+    assert first == "message-1"
+    # Второй отправитель не получает чужое сообщение, с которым можно что-то сделать
+    assert isinstance(second, CoalescedMessage)
+    assert second.message == "message-1"
+    with pytest.raises(RuntimeError):
+        second.edit_text("новый текст")
+    assert service.get_metrics()['coalesced'] == 1
+
+
+def test_requests_without_chat_use_global_bucket():
+    async def run():
+        service = SendQueueService()
+        service._global_bucket = CountingBucket()
+        telegram = FakeTelegram()
+        bot = make_bot()
+        result = await service(telegram.make_request, bot, AnswerCallbackQuery(callback_query_id="1"))
+        await bot.session.close()
+        return service, telegram, result
+
+    service, telegram, result = asyncio.run(run())
+
+    assert result == "message-1"
+    assert len(telegram.methods) == 1
+    assert service._global_bucket.acquired == 1
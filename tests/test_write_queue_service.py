@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+import services.write_queue_service as write_queue_module
+from database.models import User
+from services.write_queue_service import WriteQueueService
+
+
+def add_user(telegram_id: int):
+    async def intent(session: AsyncSession) -> int:
+        result = await session.execute(insert(User).values(telegram_id=telegram_id))
+        return result.inserted_primary_key[0]
+    return intent
+
+
+def test_failed_batch_is_retried_one_intent_at_a_time(db_engine, monkeypatch):
+    monkeypatch.setattr(
+        write_queue_module, 'async_session', sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    )
+
+    async def run():
+        service = WriteQueueService('on')
+        # Писатель не запущен: намерение выполняется сразу в своей транзакции
+        await service.submit(add_user(1))
+
+        service.start()
+        results = await asyncio.gather(
+            service.submit(add_user(2)),
+            service.submit(add_user(1)),  # повтор telegram_id - вся пачка откатится
+            service.submit(add_user(3)),
+            return_exceptions=True
+        )
+        await service.stop()
+
+        async with AsyncSession(db_engine) as session:
+            telegram_ids = (await session.execute(select(User.telegram_id).order_by(User.telegram_id))).scalars().all()
+        await db_engine.dispose()
+        return service, results, telegram_ids
+
+    service, (second, duplicate, third), telegram_ids = asyncio.run(run())
+
+    assert isinstance(duplicate, IntegrityError)
+    assert isinstance(second, int) and isinstance(third, int) and second != third
+    assert telegram_ids == [1, 2, 3]
+    metrics = service.get_metrics()
+    assert metrics['batches'] == 1
+    assert metrics['retried_batches'] == 1
+    assert metrics['failed'] == 1
+
+
+def test_cancelled_caller_does_not_break_the_batch(db_engine, monkeypatch):
+    monkeypatch.setattr(
+        write_queue_module, 'async_session', sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    )
+
+    async def run():
+        service = WriteQueueService('on')
+        service.start()
+        cancelled = asyncio.ensure_future(service.submit(add_user(10)))
+        kept = asyncio.ensure_future(service.submit(add_user(11)))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        result = await kept
+        await service.stop()
+
+        async with AsyncSession(db_engine) as session:
+            telegram_ids = (await session.execute(select(User.telegram_id).order_by(User.telegram_id))).scalars().all()
+        await db_engine.dispose()
+        return cancelled, result, telegram_ids
+
+    cancelled, result, telegram_ids = asyncio.run(run())
+
+    assert cancelled.cancelled()
+    assert isinstance(result, int)
+    # Намерение отмененного вызывающего уже в пачке: запись выполняется, результат просто никто не ждет
+    assert telegram_ids == [10, 11]
+    with pytest.raises(asyncio.CancelledError):
+        cancelled.result()
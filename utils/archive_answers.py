@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import engine, get_session
+from services.answer_archive_service import answer_archive_service, ARCHIVE_SESSIONS_PER_BATCH
+
+
+async def run_archive(days: int, batch_sessions: int):
+    """Переносит в архив ответы тренировок, завершенных раньше days дней назад"""
+    print(f"🗄️ Переносим в {answer_archive_service.archive_dir} ответы тренировок старше {days} дн...")
+    started = time.perf_counter()
+    async for session in get_session():
+        result = await answer_archive_service.archive(session, retention_days=days, batch_sessions=batch_sessions)
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ Тренировок: {result.sessions}, ответов: {result.answers} за {elapsed:.1f} с "
+          f"({result.answers / max(elapsed, 1e-9):.0f} ответов/с)")
+    if result.answers:
+        print(f"   💾 Записано {result.bytes_written / 1048576:.2f} МБ "
+              f"({result.bytes_written / result.answers:.1f} байт на ответ)")
+
+
+async def show_stats():
+    """Выводит размер архива"""
+    async for session in get_session():
+        stats = await answer_archive_service.get_stats(session)
+    print(f"🗄️ Архив ответов: {stats['answers']} ответов, {stats['months']} мес., "
+          f"{stats['segments']} блоков, {stats['bytes'] / 1048576:.2f} МБ")
+
+
+async def read_archive(user_id: int, since: str, until: str):
+    """Выводит архивные ответы пользователя"""
+    async for session in get_session():
+        rows = await answer_archive_service.read(
+            session, user_id=user_id,
+            since=datetime.fromisoformat(since) if since else None,
+            until=datetime.fromisoformat(until) if until else None
+        )
+    for row in rows:
+        mark = "✅" if row['is_correct'] else "❌"
+        print(f"  {row['answered_at']:%Y-%m-%d %H:%M:%S} {mark} тренировка {row['session_id']}, "
+              f"слово {row['word_id']}: {row['user_answer']}")
+    print(f"📋 Ответов: {len(rows)}")
+
+
+async def run(args):
+    # Вывод каждого SQL-запроса заглушает отчет
+    engine.sync_engine.echo = False
+    try:
+        if args.command == "run":
+            await run_archive(args.days, args.batch_sessions)
+        elif args.command == "stats":
+            await show_stats()
+        else:
+            await read_archive(args.user_id, args.since, args.until)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Архив старых ответов тренировок")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="перенести старые ответы в архив")
+    run_parser.add_argument("--days", type=int, default=answer_archive_service.retention_days or 180,
+                            help="архивировать тренировки, завершенные раньше стольких дней назад")
+    run_parser.add_argument("--batch-sessions", type=int, default=ARCHIVE_SESSIONS_PER_BATCH,
+                            help="тренировок в одной транзакции")
+    subparsers.add_parser("stats", help="размер архива")
+    read_parser = subparsers.add_parser("read", help="архивные ответы пользователя")
+    read_parser.add_argument("user_id", type=int, help="id пользователя в таблице users")
+    read_parser.add_argument("--since", help="с даты (YYYY-MM-DD)")
+    read_parser.add_argument("--until", help="до даты (YYYY-MM-DD, не включая)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, func, update
+from database.database import get_session, init_db
+from database.models import TrainingSession, User, UserWord, UserDailyStats
+from services.daily_stats_service import daily_stats_service
+
+def to_date(value) -> date:
+    """SQLite возвращает date() строкой, PostgreSQL - датой"""
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+async def session_rows(session, user_ids: list) -> list:
+    """Строки сводки по завершенным тренировкам пользователей user_ids"""
+    day = func.date(TrainingSession.completed_at)
+    aggregate_query = select(
+        TrainingSession.user_id,
+        day,
+        func.count(TrainingSession.id),
+        func.sum(TrainingSession.words_total),
+        func.sum(TrainingSession.words_correct)
+    ).where(
+        TrainingSession.user_id.in_(user_ids),
+        TrainingSession.completed_at.isnot(None)
+    ).group_by(TrainingSession.user_id, day)
+    aggregate_result = await session.execute(aggregate_query)
+    
+    return [
+        {
+            'user_id': user_id,
+            'day': to_date(training_day),
+            'sessions_count': sessions_count,
+            'words_trained': words_trained or 0,
+            'words_correct': words_correct or 0,
+            'words_learned': 0,
+            'experience_gained': 0
+        }
+        for user_id, training_day, sessions_count, words_trained, words_correct in aggregate_result.all()
+    ]
+
+async def learned_rows(session, user_ids: list) -> list:
+    """
+    Строки сводки по выученным словам пользователей user_ids. Отдельной даты изучения
+    в user_words нет, поэтому берем дату последнего повторения - после него слово больше не повторяется.
+    """
+    day = func.date(UserWord.last_reviewed)
+    aggregate_query = select(
+        UserWord.user_id,
+        day,
+        func.count(UserWord.id)
+    ).where(
+        UserWord.user_id.in_(user_ids),
+        UserWord.is_learned == True,
+        UserWord.last_reviewed.isnot(None)
+    ).group_by(UserWord.user_id, day)
+    aggregate_result = await session.execute(aggregate_query)
+    
+    return [
+        {
+            'user_id': user_id,
+            'day': to_date(learned_day),
+            'sessions_count': 0,
+            'words_trained': 0,
+            'words_correct': 0,
+            'words_learned': learned_count,
+            'experience_gained': 0
+        }
+        for user_id, learned_day, learned_count in aggregate_result.all()
+    ]
+
+async def backfill_users(session, batch_size: int) -> dict:
+    """
+    Пересчитывает сводку пачками пользователей. Обнуление счетчиков пачки и их пересчет
+    идут в одной транзакции: сводка пользователя никогда не видна обнуленной,
+    а тренировка, завершенная во время заполнения, учитывается ровно один раз.
+    """
+    last_id = 0
+    totals = {'users': 0, 'sessions': 0, 'learned': 0}
+    
+    while True:
+        # Границы очередной пачки по первичному ключу (keyset-пагинация)
+        ids_query = select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+        ids_result = await session.execute(ids_query)
+        user_ids = ids_result.scalars().all()
+        
+        if not user_ids:
+            break
+        
+        # Опыт восстановить из истории нельзя, поэтому строки не удаляем, а обнуляем счетчики
+        await session.execute(update(UserDailyStats).where(UserDailyStats.user_id.in_(user_ids)).values(
+            sessions_count=0,
+            words_trained=0,
+            words_correct=0,
+            words_learned=0
+        ))
+        sessions = await session_rows(session, user_ids)
+        learned = await learned_rows(session, user_ids)
+        await daily_stats_service.record_days(session, sessions)
+        await daily_stats_service.record_days(session, learned)
+        await session.commit()
+        
+        totals['users'] += len(user_ids)
+        totals['sessions'] += sum(row['sessions_count'] for row in sessions)
+        totals['learned'] += sum(row['words_learned'] for row in learned)
+        last_id = user_ids[-1]
+        print(f"  🔄 Пользователей обработано: {totals['users']} (до id {last_id})")
+    
+    return totals
+
+async def backfill_daily_stats(batch_size: int):
+    """Пересобирает таблицу user_daily_stats из истории тренировок"""
+    
+    print("📊 Заполнение дневной сводки статистики...\n")
+    print("⚠️ Счетчики тренировок в user_daily_stats будут пересчитаны с нуля")
+    print("   (по пачкам пользователей, каждая пачка - одной транзакцией).\n")
+    
+    # Создаем таблицу, если ее еще нет
+    await init_db()
+    
+    async for session in get_session():
+        totals = await backfill_users(session, batch_size)
+        
+        rows_result = await session.execute(select(func.count(UserDailyStats.id)))
+        rows_count = rows_result.scalar()
+    
+    print("\n✅ Готово!")
+    print(f"   👥 Пользователей: {totals['users']}")
+    print(f"   🎮 Тренировок: {totals['sessions']}")
+    print(f"   📚 Выученных слов: {totals['learned']}")
+    print(f"   📅 Строк в сводке: {rows_count}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Заполнение таблицы user_daily_stats из истории")
+    parser.add_argument("--batch-size", type=int, default=500, help="пользователей в одной пачке")
+    args = parser.parse_args()
+    
+    asyncio.run(backfill_daily_stats(args.batch_size))
+
+if __name__ == "__main__":
+    main()
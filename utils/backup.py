@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.backup_service import backup_service, sqlite_path
+
+
+def create_backup():
+    """Снимает резервную копию работающей базы"""
+    print(f"💾 Резервное копирование {sqlite_path()} в {backup_service.backup_dir}...")
+    result = asyncio.run(backup_service.create_backup())
+    print(f"✅ Снимок {result.path}")
+    print(f"   📄 Страниц: {result.pages}, база {result.database_bytes / 1048576:.1f} МБ, "
+          f"снимок {result.snapshot_bytes / 1048576:.1f} МБ за {result.seconds:.1f} с")
+
+
+def list_snapshots():
+    """Выводит снимки от новых к старым"""
+    snapshots = backup_service.list_snapshots()
+    if not snapshots:
+        print("📭 Снимков нет")
+        return
+    for path in snapshots:
+        modified = datetime.fromtimestamp(os.path.getmtime(path))
+        print(f"  📦 {path}  {os.path.getsize(path) / 1048576:.1f} МБ  {modified:%Y-%m-%d %H:%M:%S}")
+
+
+def verify_snapshot(snapshot: str) -> bool:
+    """Проверяет целостность снимка"""
+    print(f"🔍 Проверяем {snapshot}...")
+    problems = backup_service.verify(snapshot)
+    if problems:
+        print("❌ Снимок поврежден:")
+        for problem in problems[:20]:
+            print(f"   • {problem}")
+        return False
+    print("✅ integrity_check: ok")
+    return True
+
+
+def restore_snapshot(snapshot: str, target: str, confirmed: bool):
+    """Восстанавливает базу из снимка"""
+    target = target or sqlite_path()
+    print(f"♻️ Восстановление {target} из {snapshot}")
+    print("⚠️ Текущее содержимое базы будет заменено. Остановите бота перед восстановлением.")
+    if not confirmed and input("Продолжить? (y/N): ").lower() != 'y':
+        print("Восстановление отменено.")
+        return
+    pages = backup_service.restore(snapshot, target)
+    print(f"✅ База восстановлена ({pages} страниц)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Резервные копии базы SQLite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("create", help="снять резервную копию (бот может работать)")
+    subparsers.add_parser("list", help="список снимков")
+    verify_parser = subparsers.add_parser("verify", help="проверить целостность снимка")
+    verify_parser.add_argument("snapshot")
+    restore_parser = subparsers.add_parser("restore", help="восстановить базу из снимка")
+    restore_parser.add_argument("snapshot")
+    restore_parser.add_argument("--target", help="файл базы (по умолчанию из DATABASE_URL)")
+    restore_parser.add_argument("--yes", action="store_true", help="не спрашивать подтверждение")
+    args = parser.parse_args()
+
+    if sqlite_path() is None and not getattr(args, 'target', None):
+        print("❌ DATABASE_URL указывает не на файл SQLite")
+        sys.exit(1)
+
+    if args.command == "create":
+        create_backup()
+    elif args.command == "list":
+        list_snapshots()
+    elif args.command == "verify":
+        if not verify_snapshot(args.snapshot):
+            sys.exit(1)
+    else:
+        restore_snapshot(args.snapshot, args.target, args.yes)
+
+
+if __name__ == "__main__":
+    main()
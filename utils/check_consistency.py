@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import engine
+from services.consistency_service import (
+    consistency_service, ConsistencyReport, CHECKS, CONSISTENCY_CHUNK_SIZE, CONSISTENCY_WORKERS
+)
+
+
+async def check_consistency(names, repair: bool, chunk_size: int, workers: int, show: int) -> int:
+    """Проверяет целостность данных, возвращает количество найденных нарушений"""
+    # Вывод каждого SQL-запроса заглушает найденные нарушения
+    engine.sync_engine.echo = False
+
+    mode = "проверка с исправлением" if repair else "только проверка"
+    print(f"🔍 Проверка целостности данных ({mode}, диапазоны по {chunk_size} id, потоков: {workers})\n")
+
+    report = ConsistencyReport()
+    shown = Counter()
+    started = time.perf_counter()
+    try:
+        async for finding in consistency_service.check(names, repair, chunk_size, workers, report):
+            shown[finding.check] += 1
+            if shown[finding.check] <= show:
+                print(f"  ⚠️ {finding.check} [{finding.key}]: {finding.details}")
+            elif shown[finding.check] == show + 1:
+                print(f"  … {finding.check}: остальные нарушения не выводятся")
+    finally:
+        await engine.dispose()
+
+    print(f"\n📋 Проверено диапазонов: {report.chunks} за {time.perf_counter() - started:.1f} с")
+    for name in names or CHECKS:
+        found = report.found[name]
+        line = f"  {'✅' if not found else '❌'} {CHECKS[name].description}: {found}"
+        if repair and found:
+            line += f", исправлено строк: {report.repaired[name]}"
+        print(line)
+
+    return sum(report.found.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка целостности базы данных")
+    parser.add_argument("--check", action="append", choices=list(CHECKS),
+                        help="выполнить только эту проверку (можно указать несколько раз)")
+    parser.add_argument("--repair", action="store_true", help="исправить найденные нарушения")
+    parser.add_argument("--chunk-size", type=int, default=CONSISTENCY_CHUNK_SIZE, help="ширина диапазона id")
+    parser.add_argument("--workers", type=int, default=CONSISTENCY_WORKERS, help="диапазонов одновременно")
+    parser.add_argument("--show", type=int, default=20, help="сколько нарушений каждой проверки выводить")
+    args = parser.parse_args()
+
+    found = asyncio.run(check_consistency(args.check, args.repair, args.chunk_size, args.workers, args.show))
+    # Для запуска по расписанию: ненулевой код, если остались неисправленные нарушения
+    if found and not args.repair:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
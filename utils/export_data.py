@@ -0,0 +1,45 @@
+import argparse
+import asyncio
+import os
+import sys
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import get_session
+from services.export_service import export_service, available_formats, EXPORT_QUERIES, EXPORT_CHUNK_SIZE
+
+async def export_data(tables: list, file_format: str, output_dir: str, compress: bool, chunk_size: int):
+    """Выгружает таблицы в файлы порциями по chunk_size строк"""
+    
+    os.makedirs(output_dir, exist_ok=True)
+    
+    async for session in get_session():
+        for table in tables:
+            path = os.path.join(output_dir, export_service.file_name(table, file_format, compress))
+            print(f"📤 Выгружаем {table} в {path}...")
+            rows_total = await export_service.export_table(
+                session, table, path, file_format, compress=compress, chunk_size=chunk_size
+            )
+            print(f"✅ {table}: {rows_total} строк, {os.path.getsize(path) / 1024:.1f} КБ")
+    
+    print("🎉 Выгрузка завершена!")
+
+def main():
+    parser = argparse.ArgumentParser(description="Выгрузка таблиц в CSV / JSONL / Parquet")
+    parser.add_argument("tables", nargs="*", default=list(EXPORT_QUERIES),
+                        help=f"таблицы для выгрузки ({', '.join(EXPORT_QUERIES)}), по умолчанию все")
+    parser.add_argument("--format", choices=available_formats(), default="csv", help="формат файла")
+    parser.add_argument("--output", default="export", help="папка для файлов")
+    parser.add_argument("--gzip", action="store_true", help="сжать CSV / JSONL в gzip")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="строк в одной порции")
+    args = parser.parse_args()
+    
+    unknown = [table for table in args.tables if table not in EXPORT_QUERIES]
+    if unknown:
+        parser.error(f"неизвестные таблицы: {', '.join(unknown)}")
+    
+    asyncio.run(export_data(args.tables, args.format, args.output, args.gzip, args.chunk_size))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import csv
+import os
+import sys
+from datetime import timedelta
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import get_session
+from services.forecast_service import forecast_service
+
+async def forecast_reviews(days: int, algorithm: str = None, seed: int = None, csv_path: str = None):
+    """Выводит прогноз количества повторений по часам и по дням"""
+    
+    async for session in get_session():
+        print(f"🔮 Прогноз повторений на {days} дн.\n")
+        forecast = await forecast_service.forecast(session, days, algorithm=algorithm, seed=seed)
+    
+    hourly = forecast.hourly
+    print(f"📚 Слов в изучении: {forecast.words_total}")
+    print(f"🔁 Всего повторений: {int(hourly.sum())}")
+    print(f"👥 Пользователей с повторениями: {len(forecast.user_ids)}\n")
+    
+    print("📅 По дням:")
+    for day, count in enumerate(forecast.daily, 1):
+        print(f"  День {day}: {int(count)}")
+    
+    print("\n⏰ По часам (UTC):")
+    peak = max(int(hourly.max()), 1)
+    for hour, count in enumerate(hourly):
+        hour_start = forecast.start + timedelta(hours=hour)
+        bar = "█" * int(40 * count / peak)
+        print(f"  {hour_start.strftime('%d.%m %H:00')} {int(count):>8} {bar}")
+    
+    print("\n👤 Самая большая нагрузка:")
+    for user_id, count in forecast.top_users(10):
+        print(f"  ID {user_id}: {count}")
+    
+    if csv_path:
+        with open(csv_path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["hour_start", "reviews"])
+            for hour, count in enumerate(hourly):
+                writer.writerow([(forecast.start + timedelta(hours=hour)).isoformat(), int(count)])
+        print(f"\n💾 Почасовой прогноз сохранен: {csv_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Прогноз нагрузки повторений")
+    parser.add_argument("--days", type=int, default=1, help="горизонт прогноза в днях")
+    parser.add_argument("--algorithm", default=None, help="алгоритм повторений (ladder, sm2, fsrs)")
+    parser.add_argument("--seed", type=int, default=None, help="seed для воспроизводимости")
+    parser.add_argument("--csv", default=None, help="сохранить почасовой прогноз в CSV")
+    args = parser.parse_args()
+    
+    asyncio.run(forecast_reviews(args.days, args.algorithm, args.seed, args.csv))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import os
+import sys
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import get_session
+from services.word_import_service import word_import_service, IMPORT_BATCH_SIZE, IMPORT_FORMATS
+
+async def import_words(path: str, file_format: str = None, batch_size: int = IMPORT_BATCH_SIZE,
+                       update_existing: bool = False, report_path: str = None):
+    """Загружает слова из CSV / TSV / JSONL файла"""
+    
+    if not os.path.exists(path):
+        print(f"❌ Файл не найден: {path}")
+        return
+    
+    async for session in get_session():
+        print(f"📥 Загружаем слова из {path} пачками по {batch_size}...")
+        try:
+            report = await word_import_service.import_file(
+                session, path, file_format, batch_size=batch_size, update_existing=update_existing
+            )
+        except (UnicodeDecodeError, ValueError) as e:
+            print(f"❌ Не удалось прочитать файл: {e}")
+            return
+    
+    print(f"📄 Строк в файле: {report.total}")
+    print(f"➕ Добавлено слов: {report.inserted}")
+    if update_existing:
+        print(f"♻️ Обновлено: {report.updated}")
+    else:
+        print(f"⏭ Уже были в базе: {report.skipped}")
+    print(f"❌ Ошибок: {len(report.errors)}")
+    
+    if report.errors:
+        if report_path:
+            with open(report_path, "w", encoding="utf-8") as file:
+                file.write(report.format_errors())
+            print(f"📋 Отчет об ошибках сохранен: {report_path}")
+        else:
+            print("\n📋 Ошибки:")
+            for error in report.errors:
+                print(f"  строка {error.line} ({error.word}): {error.message}")
+    
+    print("✅ Загрузка завершена!")
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетная загрузка слов из файла")
+    parser.add_argument("path", help="путь к файлу CSV, TSV или JSONL")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None, help="формат файла (по умолчанию - по расширению)")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="строк в одной пачке")
+    parser.add_argument("--update", action="store_true", help="обновлять уже существующие слова")
+    parser.add_argument("--report", default=None, help="сохранить ошибки по строкам в файл")
+    args = parser.parse_args()
+    
+    asyncio.run(import_words(args.path, args.format, args.batch_size, args.update, args.report))
+
+if __name__ == "__main__":
+    main()
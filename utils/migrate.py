@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import os
+import sys
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import engine, get_schema_version, SCHEMA_VERSION
+from database.migrations import MIGRATION_BATCH_SIZE, get_checkpoints, pending_migrations, upgrade
+
+
+def print_progress(step: str, rows_done: int, rows_per_second: float):
+    print(f"  🔄 {step}: {rows_done} строк ({rows_per_second:.0f} строк/с)")
+
+
+async def show_status():
+    """Выводит версию схемы базы, ожидающие миграции и незавершенные пакетные шаги"""
+    version = await get_schema_version()
+    print(f"📦 Версия схемы в базе: {version if version is not None else 'не записана'}, в коде: {SCHEMA_VERSION}")
+
+    pending = pending_migrations(version)
+    if not pending:
+        print("✅ Схема актуальна")
+    for item in pending:
+        print(f"  ⏳ {item.version}: {item.description}")
+
+    for checkpoint in await get_checkpoints():
+        print(f"  ⏸️ Прерван шаг «{checkpoint.step}» миграции {checkpoint.version}: "
+              f"обработано {checkpoint.rows_done} строк, до id {checkpoint.last_id}")
+
+
+async def run_upgrade(target: int, batch_size: int):
+    """Применяет миграции до версии target"""
+    print(f"🔄 Обновляем схему до версии {target or SCHEMA_VERSION} (пачки по {batch_size} строк)...")
+    applied = await upgrade(
+        target or None, batch_size=batch_size, progress=print_progress,
+        on_migration=lambda item: print(f"➕ {item.version}: {item.description}")
+    )
+    if applied:
+        print(f"✅ Применено миграций: {len(applied)}")
+    else:
+        print("✅ Схема уже актуальна")
+
+
+async def run(command: str, target: int, batch_size: int):
+    # Вывод каждого SQL-запроса заглушает отчет о ходе миграции
+    engine.sync_engine.echo = False
+    try:
+        if command == 'status':
+            await show_status()
+        else:
+            await run_upgrade(target, batch_size)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Версионные миграции базы данных")
+    parser.add_argument("command", choices=["status", "upgrade"], nargs="?", default="status",
+                        help="status - версия схемы и ожидающие миграции, upgrade - применить миграции")
+    parser.add_argument("--to", type=int, default=0, help="обновить только до указанной версии")
+    parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE, help="строк в одной пачке")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args.command, args.to, args.batch_size))
+    except KeyboardInterrupt:
+        print("\n⏸️ Миграция прервана: повторный запуск upgrade продолжит с последней контрольной точки")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import engine, get_session
+from services.answer_pack_service import answer_pack_service, PACK_SESSIONS_PER_BATCH
+
+
+async def pack(batch_sessions: int):
+    """Упаковывает ответы всех завершенных тренировок"""
+    print("📦 Упаковываем ответы завершенных тренировок...")
+    started = time.perf_counter()
+    async for session in get_session():
+        sessions, answers = await answer_pack_service.pack_completed(session, batch_sessions=batch_sessions)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Тренировок: {sessions}, ответов: {answers} за {elapsed:.1f} с "
+          f"({answers / max(elapsed, 1e-9):.0f} ответов/с)")
+    if not answer_pack_service.enabled:
+        print("⚠️ ANSWER_STORAGE не равно packed: новые тренировки будут храниться строками")
+
+
+async def unpack(batch_sessions: int):
+    """Разворачивает упакованные тренировки обратно в строки"""
+    print("📂 Разворачиваем упакованные тренировки в training_answers...")
+    async for session in get_session():
+        restored = await answer_pack_service.unpack_all(session, batch_sessions=batch_sessions)
+    print(f"✅ Восстановлено ответов: {restored}")
+    if answer_pack_service.enabled:
+        print("⚠️ ANSWER_STORAGE=packed: новые тренировки по-прежнему будут упаковываться")
+
+
+async def show_stats():
+    """Выводит размер упакованных ответов"""
+    async for session in get_session():
+        stats = await answer_pack_service.get_stats(session)
+    per_answer = stats['bytes'] / stats['answers'] if stats['answers'] else 0
+    print(f"📦 Упаковано тренировок: {stats['sessions']}, ответов: {stats['answers']}, "
+          f"{stats['bytes'] / 1048576:.2f} МБ ({per_answer:.1f} байт на ответ)")
+
+
+async def run(args):
+    # Вывод каждого SQL-запроса заглушает отчет
+    engine.sync_engine.echo = False
+    try:
+        if args.command == "pack":
+            await pack(args.batch_sessions)
+        elif args.command == "unpack":
+            await unpack(args.batch_sessions)
+        else:
+            await show_stats()
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Компактное хранение ответов тренировок")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in (("pack", "упаковать ответы завершенных тренировок"),
+                               ("unpack", "развернуть упакованные ответы обратно в строки")):
+        command_parser = subparsers.add_parser(command, help=help_text)
+        command_parser.add_argument("--batch-sessions", type=int, default=PACK_SESSIONS_PER_BATCH,
+                                    help="тренировок в одной транзакции")
+    subparsers.add_parser("stats", help="размер упакованных ответов")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import asyncio
+import os
+import sys
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import get_session
+from services.leveling_service import leveling_service, RELEVEL_BATCH_SIZE
+
+async def relevel_users(batch_size: int, dry_run: bool = False):
+    """Пересчитывает уровни всех пользователей по текущей таблице уровней"""
+    
+    async for session in get_session():
+        if dry_run:
+            print("🔍 Проверяем уровни пользователей (без записи в базу)...")
+        else:
+            print(f"🔄 Пересчитываем уровни пользователей пачками по {batch_size}...")
+        
+        checked, changed = await leveling_service.relevel_users(
+            session, batch_size=batch_size, dry_run=dry_run
+        )
+    
+    print(f"👥 Проверено пользователей: {checked}")
+    if dry_run:
+        print(f"✏️ Уровень изменится у: {changed}")
+    else:
+        print(f"✏️ Изменено уровней: {changed}")
+        print("✅ Пересчет уровней завершен!")
+
+def main():
+    parser = argparse.ArgumentParser(description="Пересчет уровней всех пользователей после изменения кривой опыта")
+    parser.add_argument("--batch-size", type=int, default=RELEVEL_BATCH_SIZE, help="пользователей в одной пачке")
+    parser.add_argument("--dry-run", action="store_true", help="только посчитать изменения, не записывая их")
+    args = parser.parse_args()
+    
+    asyncio.run(relevel_users(args.batch_size, args.dry_run))
+
+if __name__ == "__main__":
+    main()
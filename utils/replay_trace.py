@@ -0,0 +1,215 @@
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, get_args
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram import Bot, Dispatcher, BaseMiddleware
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import Message, Update, User
+
+# Telegram id воспроизводимых пользователей: база + номер пользователя в трассе
+# (100000 + n совпадает с пользователями синтетической базы benchmarks/)
+DEFAULT_USER_BASE = 100000
+
+# Токен бота при воспроизведении (запросы в сеть не уходят)
+REPLAY_TOKEN = "42:REPLAY"
+
+# Допустимые скорости воспроизведения, 'max' - без пауз между обновлениями
+SPEEDS = ('1', '10', 'max')
+
+
+class FakeTelegramSession(BaseSession):
+    """Сессия бота без сети: на любой метод сразу возвращает правдоподобный ответ"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        super().__init__()
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self._message_ids = itertools.count(1)
+
+    async def close(self):
+        pass
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None) -> Any:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        returning = method.__returning__
+        returning_types = get_args(returning) or (returning,)
+        if Message in returning_types and getattr(method, 'chat_id', None) is not None:
+            return Message.model_validate({
+                'message_id': next(self._message_ids),
+                'date': int(time.time()),
+                'chat': {'id': method.chat_id, 'type': 'private'},
+                'text': getattr(method, 'text', None),
+            }, context={'bot': bot})
+        if User in returning_types:
+            return User(id=bot.id, is_bot=True, first_name="Replay")
+        if bool in returning_types:
+            return True
+        return None
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+
+class LatencyMiddleware(BaseMiddleware):
+    """Время выполнения обработчиков по именам"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def __call__(self, handler, event, data):
+        callback = getattr(data.get('handler'), 'callback', None)
+        name = getattr(callback, '__name__', 'unknown')
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            self.errors[name] += 1
+            raise
+        finally:
+            self.latencies[name].append(time.perf_counter() - started)
+
+
+def build_update(record: Dict, update_id: int, telegram_id: int) -> Optional[Dict]:
+    """Собирает обновление Telegram по записи трассы (None - обновление не воспроизводится)"""
+    user = {'id': telegram_id, 'is_bot': False, 'first_name': f"Replay {telegram_id}"}
+    chat = {'id': telegram_id, 'type': 'private'}
+    now = int(time.time())
+
+    if record['k'] == 'message':
+        if record.get('ct', 'text') != 'text':
+            return None
+        # Свободный текст (ответы на задания) в трассе не хранится, подставляем текст той же длины
+        text = record.get('text') or 'а' * max(record.get('len', 1), 1)
+        return {
+            'update_id': update_id,
+            'message': {'message_id': update_id, 'date': now, 'chat': chat, 'from': user, 'text': text},
+        }
+
+    if record['k'] == 'callback_query':
+        return {
+            'update_id': update_id,
+            'callback_query': {
+                'id': str(update_id),
+                'from': user,
+                'chat_instance': str(telegram_id),
+                'data': record['data'].replace("{user}", str(telegram_id)),
+                'message': {'message_id': update_id, 'date': now, 'chat': chat, 'text': "..."},
+            },
+        }
+
+    return None
+
+
+def percentile(values: List[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))]
+
+
+async def replay(trace_path: str, speed: str, user_base: int, api_latency_ms: float, limit: Optional[int]):
+    """Воспроизводит трассу через диспетчер с обработчиками бота"""
+    from database.database import engine, init_db
+    from handlers import training_handler, basic_handlers, admin_handler, stats_handler
+    from services.answer_log_service import answer_log_service
+    from services.trace_service import read_trace
+
+    # Вывод SQL и журнал каждого обновления в консоль искажают задержки
+    engine.sync_engine.echo = False
+    logging.getLogger("aiogram.event").setLevel(logging.WARNING)
+    await init_db()
+    answer_log_service.start()
+
+    session = FakeTelegramSession(api_latency_ms)
+    bot = Bot(token=REPLAY_TOKEN, session=session)
+    dp = Dispatcher()
+    latency = LatencyMiddleware()
+    dp.message.middleware(latency)
+    dp.callback_query.middleware(latency)
+    dp.include_router(basic_handlers.router)
+    dp.include_router(training_handler.router)
+    dp.include_router(admin_handler.router)
+    dp.include_router(stats_handler.router)
+
+    speedup = None if speed == 'max' else float(speed)
+    tasks = []
+    skipped = 0
+    failed = 0
+    trace_time = 0.0
+    started = time.perf_counter()
+
+    async def feed(update: Update):
+        nonlocal failed
+        try:
+            await dp.feed_update(bot, update)
+        except Exception:
+            failed += 1
+
+    for update_id, record in enumerate(read_trace(trace_path), 1):
+        if limit is not None and update_id > limit:
+            break
+
+        if speedup is not None:
+            trace_time += record.get('t', 0) / 1000 / speedup
+            delay = started + trace_time - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        update_data = build_update(record, update_id, user_base + record['u'])
+        if update_data is None:
+            skipped += 1
+            continue
+        # Обновления обрабатываются параллельно, как при polling с handle_as_tasks
+        tasks.append(asyncio.create_task(feed(Update.model_validate(update_data, context={'bot': bot}))))
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    await answer_log_service.stop()
+    await engine.dispose()
+
+    print(f"\n📼 Воспроизведено обновлений: {len(tasks)} за {elapsed:.1f} с "
+          f"({len(tasks) / elapsed:.1f} в секунду), пропущено: {skipped}, с ошибкой: {failed}")
+    print(f"📤 Запросов к Bot API: {session.requests}\n")
+    print(f"{'обработчик':<36}{'вызовов':>8}{'p50, мс':>10}{'p90, мс':>10}{'p99, мс':>10}{'max, мс':>10}{'ошибок':>8}")
+    for name, values in sorted(latency.latencies.items(), key=lambda item: -statistics.fmean(item[1]) * len(item[1])):
+        values_ms = [value * 1000 for value in values]
+        print(f"{name:<36}{len(values_ms):>8}{percentile(values_ms, 0.5):>10.1f}{percentile(values_ms, 0.9):>10.1f}"
+              f"{percentile(values_ms, 0.99):>10.1f}{max(values_ms):>10.1f}{latency.errors.get(name, 0):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Воспроизведение трассы обновлений с замером задержек обработчиков")
+    parser.add_argument("trace", help="файл трассы (TRACE_RECORD_PATH)")
+    parser.add_argument("--db", required=True,
+                        help="файл SQLite для воспроизведения (база изменяется: используйте копию "
+                             "или базу из benchmarks/)")
+    parser.add_argument("--speed", choices=SPEEDS, default='1', help="скорость: 1x, 10x или без пауз")
+    parser.add_argument("--user-base", type=int, default=DEFAULT_USER_BASE, help="telegram id = база + номер пользователя")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="имитация задержки Bot API, мс")
+    parser.add_argument("--limit", type=int, help="воспроизвести только первые N обновлений")
+    args = parser.parse_args()
+
+    # Движок базы создается при импорте database.database, поэтому база выбирается до импорта модулей бота
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.abspath(args.db)}"
+    # Обработчики импортируют main (клавиатура), а он создает бота с токеном из окружения
+    os.environ.setdefault("BOT_TOKEN", REPLAY_TOKEN)
+    print(f"▶️ Воспроизводим {args.trace} на скорости {args.speed} против {args.db}")
+
+    asyncio.run(replay(args.trace, args.speed, args.user_base, args.api_latency, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import asyncio
 import os
 import sys
+from datetime import datetime
 
 # Добавляем корневую директорию в путь Python
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -37,7 +38,8 @@ async def update_existing_words():
                 update_query = update(Word).where(Word.id == word.id).values(
                     definition=basic_definition,
                     morpheme_type='roots',  # Устанавливаем тип морфемы "Корни"
-                    explanation=''  # Пустое пояснение
+                    explanation='',  # Пустое пояснение
+                    updated_at=datetime.utcnow()
                 )
                 await session.execute(update_query)
                 updated_count += 1